@@ -0,0 +1,110 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Baseline comparison and command line handling shared by the benchmarks.
+
+Every benchmark produces a json object with a 'results' list. Each result has a 'benchmark'
+name, an optional 'stage' and metrics such as 'wall_time_seconds'.
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare_results(baseline, current, max_regression, metrics=('wall_time_seconds',),
+                    min_deltas=None):
+  """Compares two sets of results.
+
+  Args:
+    baseline: the baseline results.
+    current: the current results.
+    max_regression: the allowed regression, as a fraction, e.g. 0.2 for 20%.
+    metrics: the names of the compared metrics. Lower values are better.
+    min_deltas: optional dict of metric name to the smallest absolute increase which counts as
+        a regression, to ignore noise in very small values.
+
+  Returns:
+    A list of human readable descriptions of the results which regressed.
+  """
+  min_deltas = min_deltas or {}
+  baseline_results = {(x['benchmark'], x.get('stage')): x for x in baseline['results']}
+  regressions = []
+  for result in current['results']:
+    key = (result['benchmark'], result.get('stage'))
+    baseline_result = baseline_results.get(key)
+    if baseline_result is None:
+      continue
+    for metric in metrics:
+      old_value = baseline_result.get(metric)
+      new_value = result.get(metric)
+      if not old_value or new_value is None:
+        continue
+      if new_value > old_value * (1 + max_regression) and new_value - old_value > min_deltas.get(metric, 0):
+        regressions.append('%s: %s regressed from %s to %s (+%.0f%%)' % (
+            '/'.join(x for x in key if x is not None), metric, old_value, new_value,
+            (new_value / old_value - 1) * 100))
+  return regressions
+
+
+def make_argument_parser(benchmark_names, description=None):
+  """Creates a parser with the arguments common to all the benchmarks.
+
+  The benchmarks add their own arguments to it.
+  """
+  parser = argparse.ArgumentParser(description=description)
+  parser.add_argument('--benchmark',
+                      type=str,
+                      action='append',
+                      choices=benchmark_names,
+                      help='The benchmark to run. Can be repeated. Default: all.')
+  parser.add_argument('--output',
+                      type=str,
+                      help='local path to the output json file. Default: stdout.')
+  parser.add_argument('--baseline',
+                      type=str,
+                      help='local path to a json file with the baseline results.')
+  parser.add_argument('--max-regression',
+                      type=float,
+                      default=0.2,
+                      help='Allowed regression against the baseline, as a fraction.')
+  return parser
+
+
+def report_results(results, args, failures=None, metrics=('wall_time_seconds',), min_deltas=None):
+  """Writes the results and exits with a non-zero code on failures or regressions.
+
+  Args:
+    results: the results of the benchmarks.
+    args: the parsed arguments of make_argument_parser.
+    failures: optional list of the failures found by the benchmark itself.
+    metrics: the metrics compared against the baseline.
+    min_deltas: see compare_results.
+  """
+  results_text = json.dumps(results, indent=2, sort_keys=True)
+  if args.output:
+    with open(args.output, 'w') as f:
+      f.write(results_text)
+  else:
+    print(results_text)
+
+  failures = list(failures or [])
+  if args.baseline:
+    with open(args.baseline, 'r') as f:
+      baseline = json.load(f)
+    failures.extend(compare_results(baseline, results, args.max_regression, metrics, min_deltas))
+  for failure in failures:
+    print(failure, file=sys.stderr)
+  if failures:
+    sys.exit(1)
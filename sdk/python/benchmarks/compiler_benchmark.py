@@ -0,0 +1,265 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compiler benchmarks.
+
+Generates synthetic pipelines with parameterized shapes and measures the wall time and the
+peak memory of each compilation stage: Compiler._compile, the yaml and json dumps and
+writing the tar.gz package. Results are written as json so that they can be compared against a baseline:
+
+  python3 benchmarks/compiler_benchmark.py --output baseline.json
+  python3 benchmarks/compiler_benchmark.py --baseline baseline.json --max-regression 0.2
+
+The command exits with a non-zero code if any stage regressed by more than --max-regression.
+"""
+
+import gc
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import kfp.dsl as dsl
+import kfp.compiler
+from kubernetes import client as k8s_client
+
+import benchmark_utils
+
+
+def _producer_op(name):
+  return dsl.ContainerOp(
+      name=name,
+      image='library/bash',
+      command=['sh', '-c'],
+      arguments=['echo %s | tee /tmp/out.txt' % name],
+      file_outputs={'out': '/tmp/out.txt'})
+
+
+def _consumer_op(name, *inputs):
+  return dsl.ContainerOp(
+      name=name,
+      image='library/bash',
+      command=['sh', '-c'],
+      arguments=['echo ' + ' '.join(str(x) for x in inputs) + ' | tee /tmp/out.txt'],
+      file_outputs={'out': '/tmp/out.txt'})
+
+
+def fan_out_pipeline(width):
+  """One producer op consumed by width parallel ops."""
+  @dsl.pipeline(name='Fan out', description='')
+  def pipeline(message='message'):
+    producer = _producer_op('producer')
+    for i in range(width):
+      _consumer_op('consumer', producer.output, message)
+  return pipeline
+
+
+def chain_pipeline(depth):
+  """A chain of depth ops, each one consuming the output of the previous one."""
+  @dsl.pipeline(name='Chain', description='')
+  def pipeline(message='message'):
+    op = _producer_op('step')
+    for i in range(depth - 1):
+      op = _consumer_op('step', op.output, message)
+  return pipeline
+
+
+def nested_groups_pipeline(num_levels, ops_per_group):
+  """An ExitHandler wrapping num_levels nested Conditions with ops_per_group ops in each one."""
+  @dsl.pipeline(name='Nested groups', description='')
+  def pipeline(flag='heads'):
+    def _add_level(level, upstream_op):
+      if level == num_levels:
+        return
+      with dsl.Condition(flag == 'heads'):
+        for i in range(ops_per_group):
+          _consumer_op('level-%d' % level, upstream_op.output, flag)
+        _add_level(level + 1, _consumer_op('level-%d-last' % level, upstream_op.output))
+
+    exit_op = dsl.ContainerOp(name='exit', image='library/bash', command=['echo', 'exit'])
+    with dsl.ExitHandler(exit_op):
+      _add_level(0, _producer_op('root'))
+  return pipeline
+
+
+def condition_chain_pipeline(num_conditions, ops_per_condition):
+  """A chain of num_conditions Conditions with ops_per_condition ops in each one.
+
+  The ops consume the output of the last op of the previous Condition, so the number of
+  dependencies across groups grows with both parameters.
+  """
+  @dsl.pipeline(name='Condition chain', description='')
+  def pipeline(flag='heads'):
+    upstream_op = _producer_op('root')
+    for i in range(num_conditions):
+      with dsl.Condition(flag == 'heads'):
+        for j in range(ops_per_condition):
+          op = _consumer_op('step-%d' % i, upstream_op.output)
+      upstream_op = op
+  return pipeline
+
+
+def volumes_and_env_pipeline(num_ops, num_volumes, num_env_vars):
+  """num_ops independent ops, each one with num_volumes volumes and num_env_vars env vars."""
+  @dsl.pipeline(name='Volumes and env', description='')
+  def pipeline():
+    for i in range(num_ops):
+      op = _producer_op('op')
+      for j in range(num_volumes):
+        volume_name = 'volume-%d' % j
+        op.add_volume(k8s_client.V1Volume(
+            name=volume_name,
+            secret=k8s_client.V1SecretVolumeSource(secret_name=volume_name)))
+        op.add_volume_mount(k8s_client.V1VolumeMount(
+            mount_path='/mnt/' + volume_name, name=volume_name))
+      for j in range(num_env_vars):
+        op.add_env_variable(k8s_client.V1EnvVar(name='ENV_%d' % j, value=str(j)))
+  return pipeline
+
+
+# Each benchmark is (name, pipeline generator, generator parameters). The sizes are multiplied
+# by --scale.
+BENCHMARKS = [
+  ('fan_out', fan_out_pipeline, {'width': 2000}),
+  ('chain', chain_pipeline, {'depth': 2000}),
+  ('nested_groups', nested_groups_pipeline, {'num_levels': 20, 'ops_per_group': 50}),
+  ('condition_chain', condition_chain_pipeline, {'num_conditions': 50, 'ops_per_condition': 40}),
+  ('volumes_and_env', volumes_and_env_pipeline, {'num_ops': 200, 'num_volumes': 10, 'num_env_vars': 20}),
+]
+
+# Metrics compared against the baseline.
+METRICS = ['wall_time_seconds', 'peak_memory_bytes', 'workflow_size_bytes']
+
+# Parameters which define the shape rather than the size of a pipeline are not scaled.
+_UNSCALED_PARAMS = {'num_levels', 'num_volumes', 'num_env_vars'}
+
+
+def _scale_params(params, scale):
+  return {name: value if name in _UNSCALED_PARAMS else max(1, int(value * scale))
+          for name, value in params.items()}
+
+
+def _measure(func, repeats, trace_memory):
+  """Runs func repeats times and returns (result, best wall time, peak traced memory).
+
+  The memory is traced in a separate run, so the timings are not skewed by tracemalloc.
+  """
+  wall_times = []
+  result = None
+  for _ in range(repeats):
+    gc.collect()
+    start_time = time.perf_counter()
+    result = func()
+    wall_times.append(time.perf_counter() - start_time)
+  peak_memory = None
+  if trace_memory:
+    gc.collect()
+    tracemalloc.start()
+    try:
+      func()
+      _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+      tracemalloc.stop()
+  return result, min(wall_times), peak_memory
+
+
+def run_benchmark(name, generator, params, repeats=3, trace_memory=True):
+  """Compiles one generated pipeline and measures every stage.
+
+  Returns:
+    A list of dicts, one per stage, with the wall time in seconds and the peak memory in bytes.
+  """
+  pipeline_func = generator(**params)
+  compiler = kfp.compiler.Compiler()
+  tmpdir = tempfile.mkdtemp()
+  package_path = os.path.join(tmpdir, 'pipeline.tar.gz')
+  try:
+    stages = [
+      ('compile', lambda: compiler._compile(pipeline_func)),
+      ('yaml_dump', lambda: compiler._dump_workflow(workflow)),
+      ('json_dump', lambda: compiler._dump_workflow(workflow, output_format='json')),
+      ('write_package', lambda: compiler._write_workflow(workflow, package_path)),
+    ]
+    results = []
+    for stage, func in stages:
+      result, wall_time, peak_memory = _measure(func, repeats, trace_memory)
+      if stage == 'compile':
+        workflow = result
+      elif stage == 'yaml_dump':
+        yaml_text = result
+      results.append({
+        'benchmark': name,
+        'params': params,
+        'stage': stage,
+        'wall_time_seconds': wall_time,
+        'peak_memory_bytes': peak_memory,
+      })
+    results.append({
+      'benchmark': name,
+      'params': params,
+      'stage': 'package_size',
+      'package_size_bytes': os.path.getsize(package_path),
+      'workflow_size_bytes': len(yaml_text.encode()),
+    })
+    return results
+  finally:
+    shutil.rmtree(tmpdir)
+    # Do not let the generated pipelines pile up in the registry.
+    dsl.Pipeline.get_pipeline_functions().pop(pipeline_func, None)
+
+
+def run_benchmarks(names=None, scale=1.0, repeats=3, trace_memory=True):
+  results = []
+  for name, generator, params in BENCHMARKS:
+    if names and name not in names:
+      continue
+    results.extend(run_benchmark(name, generator, _scale_params(params, scale), repeats, trace_memory))
+  return {
+    'python_version': platform.python_version(),
+    'platform': platform.platform(),
+    'scale': scale,
+    'results': results,
+  }
+
+
+def parse_arguments():
+  """Parse command line arguments."""
+
+  parser = benchmark_utils.make_argument_parser([x[0] for x in BENCHMARKS])
+  parser.add_argument('--scale',
+                      type=float,
+                      default=1.0,
+                      help='Multiplier for the size of the generated pipelines.')
+  parser.add_argument('--repeats',
+                      type=int,
+                      default=3,
+                      help='Number of timed runs of every stage. The best one is reported.')
+  parser.add_argument('--no-memory',
+                      action='store_true',
+                      help='Do not measure the peak memory.')
+
+  args = parser.parse_args()
+  return args
+
+
+def main():
+  args = parse_arguments()
+  results = run_benchmarks(args.benchmark, args.scale, args.repeats, not args.no_memory)
+  benchmark_utils.report_results(results, args, metrics=METRICS)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,131 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Import time benchmarks.
+
+Measures the cold import time of the kfp packages, each one in a fresh interpreter, and
+checks that the heavy dependencies are not imported eagerly. Results are written as json so
+that they can be compared against a baseline:
+
+  python3 benchmarks/import_benchmark.py --output baseline.json
+  python3 benchmarks/import_benchmark.py --baseline baseline.json --max-regression 0.2
+
+The command exits with a non-zero code if a heavy dependency is imported eagerly, or if any
+import regressed by more than --max-regression and MIN_DELTAS against the baseline. The
+import times are not checked against an absolute budget, which would depend on the machine.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+
+import benchmark_utils
+
+# Modules which take tens to hundreds of milliseconds to import.
+_HEAVY_MODULES = ['kubernetes', 'requests', 'google.auth', 'yaml', 'kfp.compiler.compiler']
+
+# Each benchmark is (name, statement, modules the statement must not import).
+BENCHMARKS = [
+  ('kfp', 'import kfp', _HEAVY_MODULES),
+  ('kfp.dsl', 'import kfp.dsl', _HEAVY_MODULES),
+  ('kfp.compiler', 'import kfp.compiler', _HEAVY_MODULES),
+  ('kfp.components', 'import kfp.components', _HEAVY_MODULES),
+  ('kfp.Client', 'import kfp; kfp.Client', ['kubernetes', 'google.auth', 'kfp.compiler.compiler']),
+]
+
+# Differences below these are noise, however large they are relative to the baseline.
+MIN_DELTAS = {'wall_time_seconds': 0.01}
+
+_CHILD_CODE = '''
+import json
+import sys
+import time
+start_time = time.perf_counter()
+exec(%r)
+wall_time = time.perf_counter() - start_time
+print(json.dumps({'wall_time_seconds': wall_time, 'modules': [
+    x for x in %r if x in sys.modules]}))
+'''
+
+
+def run_benchmark(name, statement, lazy_modules, repeats=5):
+  """Runs the import statement in repeats fresh interpreters.
+
+  Returns:
+    A dict with the best wall time in seconds and the lazy modules which got imported.
+  """
+  wall_times = []
+  for _ in range(repeats):
+    output = subprocess.check_output(
+        [sys.executable, '-c', _CHILD_CODE % (statement, lazy_modules)])
+    result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+    wall_times.append(result['wall_time_seconds'])
+  return {
+    'benchmark': name,
+    'stage': 'import',
+    'wall_time_seconds': min(wall_times),
+    'eagerly_imported_modules': result['modules'],
+  }
+
+
+def run_benchmarks(names=None, repeats=5):
+  results = []
+  for name, statement, lazy_modules in BENCHMARKS:
+    if names and name not in names:
+      continue
+    results.append(run_benchmark(name, statement, lazy_modules, repeats))
+  return {
+    'python_version': platform.python_version(),
+    'platform': platform.platform(),
+    'results': results,
+  }
+
+
+def check_results(results):
+  """Checks that no heavy dependency is imported eagerly.
+
+  Returns:
+    A list of human readable descriptions of the imports which loaded a heavy dependency.
+  """
+  violations = []
+  for result in results['results']:
+    if result['eagerly_imported_modules']:
+      violations.append('%s: eagerly imports %s' % (
+          result['benchmark'], ', '.join(result['eagerly_imported_modules'])))
+  return violations
+
+
+def parse_arguments():
+  """Parse command line arguments."""
+
+  parser = benchmark_utils.make_argument_parser([x[0] for x in BENCHMARKS])
+  parser.add_argument('--repeats',
+                      type=int,
+                      default=5,
+                      help='Number of timed imports. The best one is reported.')
+
+  args = parser.parse_args()
+  return args
+
+
+def main():
+  args = parse_arguments()
+  results = run_benchmarks(args.benchmark, args.repeats)
+  benchmark_utils.report_results(results, args, check_results(results),
+                                 min_deltas=MIN_DELTAS)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,127 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Component yaml benchmarks.
+
+Measures the time to load and dump component files with the ordered yaml loader and dumper
+of kfp.components, and with their pure python equivalents for reference. By default all the
+component.yaml files of the repository are used. Results are written as json so that they
+can be compared against a baseline:
+
+  python3 benchmarks/yaml_benchmark.py --output baseline.json
+  python3 benchmarks/yaml_benchmark.py --baseline baseline.json --max-regression 0.2
+
+The command exits with a non-zero code if any stage regressed by more than --max-regression.
+"""
+
+import gc
+import os
+import platform
+import time
+
+import yaml
+
+from kfp.components._yaml_utils import _OrderedLoader, _OrderedDumper, _make_ordered_loader, _make_ordered_dumper
+
+import benchmark_utils
+
+_REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+
+# Each benchmark is (name, loader, dumper).
+BENCHMARKS = [
+  ('kfp', _OrderedLoader, _OrderedDumper),
+  ('pure_python', _make_ordered_loader(yaml.Loader), _make_ordered_dumper(yaml.Dumper)),
+]
+
+
+def find_component_files(directory):
+  component_files = []
+  for root, _, file_names in os.walk(directory):
+    for file_name in file_names:
+      if file_name == 'component.yaml' or file_name.endswith('.component.yaml'):
+        component_files.append(os.path.join(root, file_name))
+  return sorted(component_files)
+
+
+def _measure(func, repeats):
+  """Runs func repeats times and returns (result, best wall time)."""
+  wall_times = []
+  result = None
+  for _ in range(repeats):
+    gc.collect()
+    start_time = time.perf_counter()
+    result = func()
+    wall_times.append(time.perf_counter() - start_time)
+  return result, min(wall_times)
+
+
+def run_benchmark(name, loader, dumper, texts, repeats=3):
+  """Loads and dumps all the texts.
+
+  Returns:
+    A list of dicts, one per stage, with the wall time in seconds.
+  """
+  results = []
+  data, wall_time = _measure(lambda: [yaml.load(text, loader) for text in texts], repeats)
+  results.append({'benchmark': name, 'stage': 'load', 'wall_time_seconds': wall_time})
+  _, wall_time = _measure(lambda: [yaml.dump(x, Dumper=dumper) for x in data], repeats)
+  results.append({'benchmark': name, 'stage': 'dump', 'wall_time_seconds': wall_time})
+  return results
+
+
+def run_benchmarks(component_files, names=None, repeats=3):
+  texts = []
+  for component_file in component_files:
+    with open(component_file, 'r') as f:
+      texts.append(f.read())
+  results = []
+  for name, loader, dumper in BENCHMARKS:
+    if names and name not in names:
+      continue
+    results.extend(run_benchmark(name, loader, dumper, texts, repeats))
+  return {
+    'python_version': platform.python_version(),
+    'platform': platform.platform(),
+    'libyaml': hasattr(yaml, 'CSafeLoader'),
+    'num_files': len(texts),
+    'num_bytes': sum(len(text.encode()) for text in texts),
+    'results': results,
+  }
+
+
+def parse_arguments():
+  """Parse command line arguments."""
+
+  parser = benchmark_utils.make_argument_parser([x[0] for x in BENCHMARKS])
+  parser.add_argument('--components-dir',
+                      type=str,
+                      default=os.path.join(_REPO_ROOT, 'components'),
+                      help='local path to the directory with the component files.')
+  parser.add_argument('--repeats',
+                      type=int,
+                      default=3,
+                      help='Number of timed runs of every stage. The best one is reported.')
+
+  args = parser.parse_args()
+  return args
+
+
+def main():
+  args = parse_arguments()
+  results = run_benchmarks(find_component_files(args.components_dir), args.benchmark, args.repeats)
+  benchmark_utils.report_results(results, args)
+
+
+if __name__ == '__main__':
+  main()
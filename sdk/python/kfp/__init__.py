@@ -13,5 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ._client import Client
-from ._config import *
\ No newline at end of file
+from ._config import *
+from ._lazy_module import make_lazy_module
+
+# The clients and the subpackages are imported on first use, so that `import kfp` does not
+# load the compiler, kubernetes and the API clients.
+make_lazy_module(__name__, {
+  'Client': ('._client', 'Client'),
+  'AsyncClient': ('._async_client', 'AsyncClient'),
+  'compiler': ('.compiler', None),
+  'components': ('.components', None),
+  'dsl': ('.dsl', None),
+})
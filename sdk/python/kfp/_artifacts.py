@@ -0,0 +1,263 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+import hashlib
+import hmac
+import os
+import tarfile
+import tempfile
+
+import urllib3
+
+Artifact = namedtuple('Artifact', ['node_id', 'step_name', 'name', 'endpoint', 'bucket', 'key'])
+
+_EMPTY_PAYLOAD_HASH = hashlib.sha256(b'').hexdigest()
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _extract_tar(tar, directory):
+  """Extracts the members of the tar file one by one, which also works for streams.
+
+  Raises:
+    ValueError: a member would be written outside of the directory, e.g. its name has '..'
+        or is absolute, or it links outside of the directory.
+  """
+  root = os.path.realpath(directory)
+  def _check_inside(path, member):
+    real_path = os.path.realpath(os.path.join(root, path))
+    if real_path != root and not real_path.startswith(root + os.sep):
+      raise ValueError('The archive member %s resolves outside of %s.' % (member.name, directory))
+  for member in tar:
+    _check_inside(member.name, member)
+    if member.issym():
+      _check_inside(os.path.join(os.path.dirname(member.name), member.linkname), member)
+    elif member.islnk():
+      _check_inside(member.linkname, member)
+    tar.extract(member, directory)
+
+
+def resolve_artifacts(workflow):
+  """Lists the S3 artifacts of all the steps of an Argo workflow in one pass over its nodes.
+
+  Args:
+    workflow: the workflow dict, e.g. the parsed workflow manifest of a run.
+
+  Returns:
+    A list of Artifact, ordered by step name and artifact name.
+  """
+  artifacts = []
+  for node_id, node in workflow.get('status', {}).get('nodes', {}).items():
+    for artifact in (node.get('outputs') or {}).get('artifacts') or []:
+      s3 = artifact.get('s3')
+      if not s3:
+        continue
+      artifacts.append(Artifact(
+          node_id=node_id,
+          step_name=node.get('displayName') or node.get('name') or node_id,
+          name=artifact['name'],
+          endpoint=s3.get('endpoint'),
+          bucket=s3['bucket'],
+          key=s3['key']))
+  return sorted(artifacts, key=lambda x: (x.step_name, x.name, x.node_id))
+
+
+def _hmac_sha256(key, message):
+  return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _sign_request(method, host, path, access_key, secret_key, region, now):
+  """Returns the headers of an S3 request with an empty payload, signed with AWS SigV4."""
+  amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+  date_stamp = now.strftime('%Y%m%d')
+  headers = OrderedDict([
+    ('host', host),
+    ('x-amz-content-sha256', _EMPTY_PAYLOAD_HASH),
+    ('x-amz-date', amz_date),
+  ])
+  signed_headers = ';'.join(headers)
+  canonical_request = '\n'.join([
+    method,
+    path,
+    '',
+    ''.join('%s:%s\n' % (k, v) for k, v in headers.items()),
+    signed_headers,
+    _EMPTY_PAYLOAD_HASH,
+  ])
+  scope = '%s/%s/s3/aws4_request' % (date_stamp, region)
+  string_to_sign = '\n'.join([
+    'AWS4-HMAC-SHA256',
+    amz_date,
+    scope,
+    hashlib.sha256(canonical_request.encode('utf-8')).hexdigest(),
+  ])
+  signing_key = ('AWS4' + secret_key).encode('utf-8')
+  for message in [date_stamp, region, 's3', 'aws4_request']:
+    signing_key = _hmac_sha256(signing_key, message)
+  signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+  headers['Authorization'] = 'AWS4-HMAC-SHA256 Credential=%s/%s, SignedHeaders=%s, Signature=%s' % (
+      access_key, scope, signed_headers, signature)
+  return headers
+
+
+class ArtifactDownloader(object):
+  """Downloads artifacts from Minio or S3 through a shared pool of keep-alive connections.
+
+  Artifacts larger than part_size are downloaded in parts, with concurrent range requests.
+
+  Example:
+  ```python
+  downloader = ArtifactDownloader(endpoint='localhost:9000')
+  paths = downloader.download(resolve_artifacts(workflow), 'outputs', untar=True)
+  ```
+
+  Args:
+    endpoint: host:port of the object store. If not set, the endpoint recorded in every
+        artifact is used, which usually is only reachable from inside the cluster.
+    access_key: the access key of the object store.
+    secret_key: the secret key of the object store.
+    secure: whether to use https.
+    region: the region used to sign the requests.
+    max_workers: the maximum number of concurrent requests and pooled connections per host.
+    part_size: the size in bytes of the parts of large artifacts.
+  """
+
+  def __init__(self, endpoint=None, access_key='minio', secret_key='minio123', secure=False,
+               region='us-east-1', max_workers=10, part_size=16 * 1024 * 1024):
+    self.endpoint = endpoint
+    self.access_key = access_key
+    self.secret_key = secret_key
+    self.region = region
+    self.max_workers = max_workers
+    self.part_size = part_size
+    self._scheme = 'https' if secure else 'http'
+    self._http = urllib3.PoolManager(maxsize=max_workers, block=True)
+
+  def _request(self, method, artifact, start=None, end=None):
+    host = self.endpoint or artifact.endpoint
+    if not host:
+      raise ValueError('The artifact %s of step %s has no endpoint.' % (artifact.name, artifact.step_name))
+    path = quote('/%s/%s' % (artifact.bucket, artifact.key), safe='/~')
+    headers = _sign_request(method, host, path, self.access_key, self.secret_key, self.region,
+                            datetime.utcnow())
+    if start is not None or end is not None:
+      headers['Range'] = 'bytes=%s-%s' % ('' if start is None else start, '' if end is None else end)
+    response = self._http.request(method, '%s://%s%s' % (self._scheme, host, path),
+                                  headers=headers, preload_content=False)
+    if response.status >= 400:
+      body = response.data
+      response.release_conn()
+      raise RuntimeError('Failed to download s3://%s/%s: %d %s %s' % (
+          artifact.bucket, artifact.key, response.status, response.reason,
+          body.decode('utf-8', 'replace')))
+    return response
+
+  def get_size(self, artifact):
+    """Returns the size of the artifact in bytes."""
+    response = self._request('HEAD', artifact)
+    response.release_conn()
+    return int(response.headers['Content-Length'])
+
+  def read(self, artifact, start=None, end=None):
+    """Reads the artifact, or the range of bytes from start to end, both inclusive."""
+    response = self._request('GET', artifact, start, end)
+    try:
+      return response.data
+    finally:
+      response.release_conn()
+
+  def _download_part(self, artifact, path, start, end):
+    response = self._request('GET', artifact, start, end)
+    try:
+      with open(path, 'r+b') as f:
+        f.seek(start)
+        for chunk in response.stream(_CHUNK_SIZE):
+          f.write(chunk)
+    finally:
+      response.release_conn()
+
+  def _extract_stream(self, artifact, directory):
+    # Small archives are extracted while they are downloaded, without a temporary file.
+    response = self._request('GET', artifact)
+    try:
+      with tarfile.open(fileobj=response, mode='r|gz') as tar:
+        _extract_tar(tar, directory)
+    finally:
+      response.release_conn()
+
+  def download(self, artifacts, output_dir, untar=False):
+    """Downloads the artifacts concurrently.
+
+    Every artifact is saved as output_dir/<step name>/<file name of its key>. The node id is
+    used instead of the step name when several steps have the same name, e.g. in loops.
+
+    Args:
+      artifacts: list of Artifact, e.g. returned by resolve_artifacts.
+      output_dir: local directory to download the artifacts to.
+      untar: whether to extract the artifacts, which Argo stores as .tgz archives, into
+          output_dir/<step name>/<artifact name>/ instead of saving the archives.
+
+    Returns:
+      An OrderedDict of every artifact to its local path.
+
+    Raises:
+      ValueError: an archive has a member which would be extracted outside of its directory.
+    """
+    step_node_ids = {}
+    for artifact in artifacts:
+      step_node_ids.setdefault(artifact.step_name, set()).add(artifact.node_id)
+    paths = OrderedDict()
+    for artifact in artifacts:
+      step_dir = artifact.step_name if len(step_node_ids[artifact.step_name]) == 1 else artifact.node_id
+      if untar:
+        paths[artifact] = os.path.join(output_dir, step_dir, artifact.name)
+      else:
+        paths[artifact] = os.path.join(output_dir, step_dir, os.path.basename(artifact.key))
+      os.makedirs(os.path.dirname(paths[artifact]), exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      sizes = dict(zip(artifacts, executor.map(self.get_size, artifacts)))
+      futures = []
+      archive_paths = {}
+      for artifact in artifacts:
+        if untar and sizes[artifact] == 0:
+          # An empty object is not a valid gzip stream. It is extracted as an empty directory.
+          os.makedirs(paths[artifact], exist_ok=True)
+          continue
+        if untar and sizes[artifact] <= self.part_size:
+          futures.append(executor.submit(self._extract_stream, artifact, paths[artifact]))
+          continue
+        if untar:
+          fd, archive_paths[artifact] = tempfile.mkstemp(suffix='.tgz', dir=output_dir)
+          os.close(fd)
+        path = archive_paths.get(artifact, paths[artifact])
+        with open(path, 'wb') as f:
+          f.truncate(sizes[artifact])
+        for start in range(0, sizes[artifact], self.part_size):
+          end = min(start + self.part_size, sizes[artifact]) - 1
+          futures.append(executor.submit(self._download_part, artifact, path, start, end))
+      for future in futures:
+        future.result()
+
+    for artifact, archive_path in archive_paths.items():
+      try:
+        with tarfile.open(archive_path, 'r:gz') as tar:
+          _extract_tar(tar, paths[artifact])
+      finally:
+        os.remove(archive_path)
+    return paths
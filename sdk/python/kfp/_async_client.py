@@ -0,0 +1,225 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import urllib3
+
+from ._client import Client, _TERMINAL_RUN_STATUSES, _make_name_filter
+from .compiler import _k8s_helper
+
+_API_PREFIX = '/apis/v1beta1'
+
+
+class ApiException(Exception):
+  """Error returned by the Kubeflow Pipelines API server."""
+
+  def __init__(self, status, reason, body):
+    super(ApiException, self).__init__('({}) {}: {}'.format(status, reason, body))
+    self.status = status
+    self.reason = reason
+    self.body = body
+
+
+class AsyncClient(object):
+  """Asyncio API client for Kubeflow Pipelines.
+
+  It has the same methods as kfp.Client, as coroutines. The API objects are returned as
+  dicts of their json representation, e.g. run['id'].
+
+  All the requests share one pool of keep-alive connections. The blocking I/O runs on a
+  thread pool with one thread per connection, so up to max_connections requests, such as
+  several paginations, are in flight at the same time without blocking the event loop:
+  ```python
+  client = AsyncClient(host)
+  experiment = await client.create_experiment('sweep')
+  runs = await asyncio.gather(*[
+      client.run_pipeline(experiment['id'], 'run-%d' % i, 'pipeline.tar.gz', {'lr': lr})
+      for i, lr in enumerate(learning_rates)])
+  ```
+  """
+
+  def __init__(self, host=None, client_id=None, max_connections=10):
+    """Create a new instance of the async kfp client.
+
+    Args:
+      host: the host name to use to talk to Kubeflow Pipelines. If not set, the in-cluster
+          service DNS name will be used. See kfp.Client.
+      client_id: The client ID used by Identity-Aware Proxy.
+      max_connections: the maximum number of concurrent requests and pooled connections.
+    """
+    self._host = host
+    host = host if host else Client.IN_CLUSTER_DNS_NAME
+    if not host.startswith('http://') and not host.startswith('https://'):
+      host = 'http://' + host
+    self._base_url = host.rstrip('/') + _API_PREFIX
+    self._headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+    if self._host and client_id:
+      from ._auth import get_auth_token
+      self._headers['Authorization'] = 'Bearer ' + get_auth_token(client_id)
+    self._http = urllib3.PoolManager(num_pools=1, maxsize=max_connections, block=True)
+    # Set to False when the backend rejects list filters, like in kfp.Client.
+    self._supports_list_filter = True
+    self._executor = ThreadPoolExecutor(max_workers=max_connections)
+
+  # The package reading is shared with the synchronous client.
+  _read_pipeline_file = Client._read_pipeline_file
+  _extract_pipeline_manifest = Client._extract_pipeline_manifest
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def close(self):
+    """Close the pooled connections."""
+    self._executor.shutdown(wait=False)
+    self._http.clear()
+
+  def _run_in_executor(self, func, *args):
+    return asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+  def _request_sync(self, method, path, query=None, body=None):
+    url = self._base_url + path
+    if query:
+      url += '?' + urlencode([(k, v) for k, v in query.items() if v is not None])
+    response = self._http.request(method, url, headers=self._headers,
+                                  body=json.dumps(body) if body is not None else None)
+    data = response.data.decode('utf-8')
+    if response.status >= 400:
+      raise ApiException(response.status, response.reason, data)
+    return json.loads(data) if data else {}
+
+  async def _request(self, method, path, query=None, body=None):
+    return await self._run_in_executor(self._request_sync, method, path, query, body)
+
+  async def create_experiment(self, name):
+    """Create a new experiment, or get the existing experiment with the same name.
+
+    Returns:
+      The experiment. Most important field is 'id'.
+    """
+    try:
+      return await self.get_experiment(experiment_name=name)
+    except ValueError:
+      pass
+    logging.info('Creating experiment {}.'.format(name))
+    return await self._request('POST', '/experiments', body={'name': name})
+
+  async def list_experiments(self, page_token='', page_size=10, sort_by='', filter=None):
+    """List experiments.
+
+    Returns:
+      A dict with the 'experiments' list and the 'next_page_token'.
+    """
+    return await self._request('GET', '/experiments', query={
+        'page_token': page_token, 'page_size': page_size, 'sort_by': sort_by, 'filter': filter})
+
+  async def get_experiment(self, experiment_id=None, experiment_name=None):
+    """Get an experiment by id or by name.
+
+    Throws:
+      ValueError if no experiment has the name, ApiException if no experiment has the id.
+    """
+    if experiment_id is None and experiment_name is None:
+      raise ValueError('Either experiment_id or experiment_name is required')
+    if experiment_id is not None:
+      return await self._request('GET', '/experiments/' + experiment_id)
+    name_filter = _make_name_filter(experiment_name) if self._supports_list_filter else None
+    next_page_token = ''
+    while True:
+      try:
+        response = await self.list_experiments(
+            page_token=next_page_token, page_size=100, filter=name_filter)
+      except ApiException as e:
+        if e.status != 400 or name_filter is None:
+          raise
+        # The backend rejected the filter. Fall back to scanning all the experiments.
+        self._supports_list_filter = False
+        name_filter = None
+        continue
+      for experiment in response.get('experiments', []):
+        if experiment['name'] == experiment_name:
+          return experiment
+      next_page_token = response.get('next_page_token')
+      if not next_page_token:
+        break
+    raise ValueError('No experiment is found with name {}.'.format(experiment_name))
+
+  async def run_pipeline(self, experiment_id, job_name, pipeline_package_path, params={}):
+    """Run a specified pipeline.
+
+    Returns:
+      The run. Most important field is 'id'.
+    """
+    pipeline_json_string = await self._run_in_executor(
+        self._extract_pipeline_manifest, pipeline_package_path)
+    run_body = {
+      'name': job_name,
+      'pipeline_spec': {
+        'workflow_manifest': pipeline_json_string,
+        'parameters': [{'name': _k8s_helper.K8sHelper.sanitize_k8s_name(k), 'value': str(v)}
+                       for k, v in params.items()],
+      },
+      'resource_references': [{
+        'key': {'type': 'EXPERIMENT', 'id': experiment_id},
+        'relationship': 'OWNER',
+      }],
+    }
+    response = await self._request('POST', '/runs', body=run_body)
+    return response['run']
+
+  async def list_runs(self, page_token='', page_size=10, sort_by='', experiment_id=None):
+    """List runs, optionally only the runs of an experiment.
+
+    Returns:
+      A dict with the 'runs' list and the 'next_page_token'.
+    """
+    query = {'page_token': page_token, 'page_size': page_size, 'sort_by': sort_by}
+    if experiment_id is not None:
+      query['resource_reference_key.type'] = 'EXPERIMENT'
+      query['resource_reference_key.id'] = experiment_id
+    return await self._request('GET', '/runs', query=query)
+
+  async def get_run(self, run_id):
+    """Get run details.
+
+    Returns:
+      A dict with the 'run' and the 'pipeline_runtime' including the workflow manifest.
+    """
+    return await self._request('GET', '/runs/' + run_id)
+
+  async def wait_for_run_completion(self, run_id, timeout, poll_interval=5):
+    """Wait for a run to complete.
+
+    Returns:
+      The run details. See get_run.
+    """
+    start_time = time.time()
+    while True:
+      run_detail = await self.get_run(run_id)
+      status = run_detail['run'].get('status')
+      if status is not None and status.lower() in _TERMINAL_RUN_STATUSES:
+        return run_detail
+      if time.time() - start_time > timeout:
+        raise TimeoutError('Run timeout')
+      logging.info('Waiting for the job to complete...')
+      await asyncio.sleep(poll_interval)
@@ -0,0 +1,210 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import time
+import uuid
+
+_API_PREFIX = '/apis/v1beta1'
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+  daemon_threads = True
+
+
+class FakeApiServer(object):
+  """In-memory Kubeflow Pipelines API server for tests.
+
+  It implements the experiment, pipeline and run endpoints used by the clients. Runs are 'Running'
+  for run_duration seconds after they are created and then get run_final_status. With
+  supports_list_filter=False, list requests with a filter fail with 400, like older backends.
+
+  Example:
+  ```python
+  with FakeApiServer() as server:
+    client = AsyncClient(server.host)
+  ```
+
+  Attributes:
+    host: the host:port the server listens on.
+    experiments: list of the experiment dicts.
+    pipelines: list of the uploaded pipeline dicts.
+    runs: list of the run detail dicts.
+    requests: list of (method, path) of all the handled requests.
+  """
+
+  def __init__(self, run_duration=0, run_final_status='Succeeded', port=0,
+               supports_list_filter=True):
+    self.run_duration = run_duration
+    self.run_final_status = run_final_status
+    self.supports_list_filter = supports_list_filter
+    self.experiments = []
+    self.pipelines = []
+    self.runs = []
+    self.requests = []
+    self._lock = threading.Lock()
+    self._run_start_times = {}
+    self._server = _ThreadingHTTPServer(('localhost', port), self._make_handler())
+    self.host = 'localhost:%d' % self._server.server_address[1]
+    self._thread = None
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def start(self):
+    self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._server.shutdown()
+    self._server.server_close()
+    self._thread.join()
+
+  def _make_handler(self):
+    server = self
+
+    class _Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def log_message(self, format, *args):
+        pass
+
+      def _handle(self, method):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+          data = self.rfile.read(length)
+          # Uploaded pipeline packages are multipart forms, which are not parsed.
+          if self.headers.get('Content-Type', '').startswith('application/json'):
+            body = json.loads(data.decode('utf-8'))
+        with server._lock:
+          server.requests.append((method, url.path))
+          status, response = server._dispatch(method, url.path[len(_API_PREFIX):], query, body)
+        data = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+      def do_GET(self):
+        self._handle('GET')
+
+      def do_POST(self):
+        self._handle('POST')
+
+    return _Handler
+
+  def _dispatch(self, method, path, query, body):
+    parts = path.strip('/').split('/')
+    if parts[0] == 'experiments':
+      if len(parts) == 1 and method == 'POST':
+        return self._create_experiment(body)
+      if len(parts) == 1 and method == 'GET':
+        return self._list(self.experiments, query, 'experiments')
+      if len(parts) == 2 and method == 'GET':
+        return self._get(self.experiments, parts[1], lambda x: x['id'])
+    if parts[0] == 'pipelines':
+      if parts[1:] == ['upload'] and method == 'POST':
+        return self._upload_pipeline(query)
+      if len(parts) == 1 and method == 'GET':
+        return self._list(self.pipelines, query, 'pipelines')
+      if len(parts) == 2 and method == 'GET':
+        return self._get(self.pipelines, parts[1], lambda x: x['id'])
+    if parts[0] == 'runs':
+      if len(parts) == 1 and method == 'POST':
+        return self._create_run(body)
+      if len(parts) == 1 and method == 'GET':
+        return self._list([self._update_run_status(x)['run'] for x in self.runs], query, 'runs')
+      if len(parts) == 2 and method == 'GET':
+        status, run_detail = self._get(self.runs, parts[1], lambda x: x['run']['id'])
+        if status == 200:
+          self._update_run_status(run_detail)
+        return status, run_detail
+    return 404, {'error': 'Not found: %s %s' % (method, path), 'code': 5}
+
+  def _get(self, items, item_id, get_id):
+    for item in items:
+      if get_id(item) == item_id:
+        return 200, item
+    return 404, {'error': 'Not found: %s' % item_id, 'code': 5}
+
+  def _list(self, items, query, field_name):
+    if query.get('filter'):
+      if not self.supports_list_filter:
+        return 400, {'error': 'Invalid input error: filter is not supported', 'code': 3}
+      for predicate in json.loads(query['filter'])['predicates']:
+        if predicate['op'] not in [1, 'EQUALS']:
+          return 400, {'error': 'Unsupported filter operation', 'code': 3}
+        value = predicate.get('string_value', predicate.get('stringValue'))
+        items = [x for x in items if x.get(predicate['key']) == value]
+    if 'resource_reference_key.id' in query:
+      items = [x for x in items
+               if any(r['key']['id'] == query['resource_reference_key.id']
+                      for r in x['resource_references'])]
+    offset = int(query.get('page_token') or 0)
+    page_size = int(query.get('page_size') or 10)
+    response = {field_name: items[offset:offset + page_size], 'total_size': len(items)}
+    if offset + page_size < len(items):
+      response['next_page_token'] = str(offset + page_size)
+    return 200, response
+
+  def _create_experiment(self, body):
+    if any(x['name'] == body['name'] for x in self.experiments):
+      return 409, {'error': 'Experiment %s already exists' % body['name'], 'code': 6}
+    experiment = dict(body, id=str(uuid.uuid4()), created_at=datetime.utcnow().isoformat() + 'Z')
+    self.experiments.append(experiment)
+    return 200, experiment
+
+  def _upload_pipeline(self, query):
+    if any(x['name'] == query.get('name') for x in self.pipelines):
+      return 409, {'error': 'Pipeline %s already exists' % query.get('name'), 'code': 6}
+    pipeline = {'id': str(uuid.uuid4()), 'name': query.get('name'),
+                'created_at': datetime.utcnow().isoformat() + 'Z'}
+    self.pipelines.append(pipeline)
+    return 200, pipeline
+
+  def _create_run(self, body):
+    if not body.get('name'):
+      return 400, {'error': 'Invalid input error: The run name is empty', 'code': 3}
+    pipeline_spec = body['pipeline_spec']
+    run = dict(body, id=str(uuid.uuid4()), status='Running',
+               created_at=datetime.utcnow().isoformat() + 'Z')
+    # Like the real server, the manifest is only returned with the run details.
+    run['pipeline_spec'] = {k: v for k, v in pipeline_spec.items() if k != 'workflow_manifest'}
+    run_detail = {
+      'run': run,
+      'pipeline_runtime': {'workflow_manifest': pipeline_spec.get('workflow_manifest')},
+    }
+    self.runs.append(run_detail)
+    self._run_start_times[run['id']] = time.time()
+    return 200, self._update_run_status(run_detail)
+
+  def _update_run_status(self, run_detail):
+    run = run_detail['run']
+    if time.time() - self._run_start_times[run['id']] >= self.run_duration:
+      run['status'] = self.run_final_status
+    return run_detail
@@ -0,0 +1,138 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import unquote, urlparse
+import re
+import threading
+
+from ._artifacts import _sign_request
+from ._fake_api_server import _ThreadingHTTPServer
+
+_RANGE_REGEX = re.compile(r'^bytes=(\d*)-(\d*)$')
+_AUTHORIZATION_REGEX = re.compile(r'^AWS4-HMAC-SHA256 Credential=([^/]+)/\d{8}/([^/]+)/s3/')
+
+
+class FakeS3Server(object):
+  """In-memory stand-in for Minio, for tests.
+
+  It serves the GET and HEAD object requests, including range requests, and checks their
+  AWS SigV4 signature.
+
+  Example:
+  ```python
+  with FakeS3Server() as server:
+    server.put_object('mlpipeline', 'artifacts/run/step/output.tgz', data)
+    ArtifactDownloader(endpoint=server.endpoint).read(artifact)
+  ```
+
+  Attributes:
+    endpoint: the host:port the server listens on.
+    objects: dict of (bucket, key) to the object bytes.
+    requests: list of (method, path, range header) of all the handled requests.
+  """
+
+  def __init__(self, access_key='minio', secret_key='minio123', port=0):
+    self.access_key = access_key
+    self.secret_key = secret_key
+    self.objects = {}
+    self.requests = []
+    self._lock = threading.Lock()
+    self._server = _ThreadingHTTPServer(('localhost', port), self._make_handler())
+    self.endpoint = 'localhost:%d' % self._server.server_address[1]
+    self._thread = None
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def start(self):
+    self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._server.shutdown()
+    self._server.server_close()
+    self._thread.join()
+
+  def put_object(self, bucket, key, data):
+    with self._lock:
+      self.objects[(bucket, key)] = data
+
+  def _is_authorized(self, method, path, headers):
+    match = _AUTHORIZATION_REGEX.match(headers.get('Authorization') or '')
+    if not match or match.group(1) != self.access_key:
+      return False
+    try:
+      now = datetime.strptime(headers.get('x-amz-date') or '', '%Y%m%dT%H%M%SZ')
+    except ValueError:
+      return False
+    expected_headers = _sign_request(method, headers.get('Host'), path, self.access_key,
+                                     self.secret_key, match.group(2), now)
+    return headers['Authorization'] == expected_headers['Authorization']
+
+  def _make_handler(self):
+    server = self
+
+    class _Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def log_message(self, format, *args):
+        pass
+
+      def _send(self, status, data=b'', headers={}, send_body=True):
+        self.send_response(status)
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if send_body:
+          self.wfile.write(data)
+
+      def _handle(self, method):
+        path = urlparse(self.path).path
+        with server._lock:
+          server.requests.append((method, path, self.headers.get('Range')))
+          bucket, _, key = unquote(path).lstrip('/').partition('/')
+          data = server.objects.get((bucket, key))
+        send_body = method == 'GET'
+        if not server._is_authorized(method, path, self.headers):
+          return self._send(403, b'SignatureDoesNotMatch', send_body=send_body)
+        if data is None:
+          return self._send(404, b'NoSuchKey', send_body=send_body)
+        headers = {'Accept-Ranges': 'bytes', 'Content-Type': 'application/octet-stream'}
+        range_match = _RANGE_REGEX.match(self.headers.get('Range') or '')
+        if not range_match or not any(range_match.groups()):
+          return self._send(200, data, headers, send_body)
+        start, end = range_match.groups()
+        if not start:
+          start, end = max(0, len(data) - int(end)), len(data) - 1
+        start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+        if start >= len(data):
+          return self._send(416, b'InvalidRange', send_body=send_body)
+        headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, len(data))
+        self._send(206, data[start:end + 1], headers, send_body)
+
+      def do_GET(self):
+        self._handle('GET')
+
+      def do_HEAD(self):
+        self._handle('HEAD')
+
+    return _Handler
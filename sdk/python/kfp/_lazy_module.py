@@ -0,0 +1,63 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+  """A module which imports the modules defining its public attributes on first access."""
+
+  def __getattr__(self, name):
+    # Only called when the attribute is not in the module dict yet.
+    lazy_attributes = self.__dict__.get('_lazy_attributes', {})
+    if name not in lazy_attributes:
+      raise AttributeError("module '%s' has no attribute '%s'" % (self.__name__, name))
+    module_name, attribute_name = lazy_attributes[name]
+    module = importlib.import_module(module_name, self.__name__)
+    value = module if attribute_name is None else getattr(module, attribute_name)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return sorted(set(super(_LazyModule, self).__dir__()) | set(self._lazy_attributes))
+
+
+def make_lazy_module(module_name, lazy_attributes):
+  """Makes the attributes of a package module load on first access.
+
+  This keeps `import kfp` fast for the tools and component containers which only use a small
+  part of the SDK: the compiler, kubernetes, yaml and requests are only imported when they
+  are used. The module class is replaced rather than defining a module level __getattr__,
+  which is only supported by Python 3.7+.
+
+  Example, at the end of a package __init__.py:
+  ```python
+  make_lazy_module(__name__, {
+    'Compiler': ('.compiler', 'Compiler'),
+    'dsl': ('.dsl', None),
+  })
+  ```
+
+  Args:
+    module_name: the name of the module, usually __name__.
+    lazy_attributes: dict of attribute name to a tuple (module name, attribute name). The
+        module name can be relative to the module. If the attribute name is None, the module
+        itself is the attribute.
+  """
+  module = sys.modules[module_name]
+  module._lazy_attributes = lazy_attributes
+  module.__class__ = _LazyModule
@@ -13,5 +13,18 @@
 # limitations under the License.
 
 
-from .compiler import Compiler
-from ._component_builder import build_python_component, build_docker_image, VersionedDependency
\ No newline at end of file
+from .._lazy_module import make_lazy_module
+
+make_lazy_module(__name__, {
+  'compiler': ('.compiler', None),
+  'Compiler': ('.compiler', 'Compiler'),
+  'analyze_pipeline': ('._pipeline_analysis', 'analyze_pipeline'),
+  'PipelineAnalysis': ('._pipeline_analysis', 'PipelineAnalysis'),
+  'InMemoryTemplateCache': ('._template_cache', 'InMemoryTemplateCache'),
+  'DiskTemplateCache': ('._template_cache', 'DiskTemplateCache'),
+  'analyze_workflow_size': ('._workflow_size', 'analyze_workflow_size'),
+  'WorkflowSizeReport': ('._workflow_size', 'WorkflowSizeReport'),
+  'build_python_component': ('._component_builder', 'build_python_component'),
+  'build_docker_image': ('._component_builder', 'build_docker_image'),
+  'VersionedDependency': ('._component_builder', 'VersionedDependency'),
+})
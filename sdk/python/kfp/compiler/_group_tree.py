@@ -0,0 +1,112 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from .. import dsl
+
+
+class GroupTree(object):
+  """Index over the group tree of a pipeline.
+
+  The index is built once per compilation by a single traversal of the tree and is
+  shared by all the compiler passes that need to know where an op lives:
+
+  - parents: group/op name -> name of the enclosing group (None for the root group).
+  - depths: group/op name -> depth in the tree. The root group has depth 0.
+  - ancestors: group/op name -> tuple of ancestor names starting from the root and
+    ending with the group/op itself.
+  - groups: all groups (not including ops) in pre-order.
+
+  Ops which only belong to the pipeline (e.g. exit handler ops) are not part of the tree.
+  """
+
+  def __init__(self, root_group):
+    self.parents = {}
+    self.depths = {}
+    self.ancestors = {}
+    self.groups = []
+    # group name -> tuple of PipelineParams used in the conditions of the group and
+    # all of its ancestors.
+    self._condition_params = {}
+    # (group name, group name) -> depth of their lowest common ancestor.
+    self._common_depths = {}
+
+    self._add_group(root_group, None, ())
+    stack = [root_group]
+    while stack:
+      group = stack.pop()
+      self.groups.append(group)
+      for op in group.ops:
+        self.parents[op.name] = group.name
+        self.depths[op.name] = self.depths[group.name] + 1
+        self.ancestors[op.name] = self.ancestors[group.name] + (op.name,)
+      for g in group.groups:
+        self._add_group(g, group, self._condition_params[group.name])
+      # Reversed so that the groups are visited in their declaration order.
+      stack.extend(reversed(group.groups))
+
+  def _add_group(self, group, parent, parent_condition_params):
+    if parent is None:
+      self.parents[group.name] = None
+      self.depths[group.name] = 0
+      self.ancestors[group.name] = (group.name,)
+    else:
+      self.parents[group.name] = parent.name
+      self.depths[group.name] = self.depths[parent.name] + 1
+      self.ancestors[group.name] = self.ancestors[parent.name] + (group.name,)
+
+    condition_params = parent_condition_params
+    if group.type == 'condition':
+      condition_params = list(parent_condition_params)
+      if isinstance(group.condition.operand1, dsl.PipelineParam):
+        condition_params.append(group.condition.operand1)
+      if isinstance(group.condition.operand2, dsl.PipelineParam):
+        condition_params.append(group.condition.operand2)
+      condition_params = tuple(condition_params)
+    self._condition_params[group.name] = condition_params
+
+  def get_condition_params(self, op_name):
+    """Get parameters referenced in the conditions enclosing the op."""
+    parent = self.parents.get(op_name)
+    if parent is None:
+      return ()
+    return self._condition_params[parent]
+
+  def _get_common_depth(self, group1, group2):
+    """Get the depth of the lowest common ancestor of two groups."""
+    key = (group1, group2)
+    depth = self._common_depths.get(key)
+    if depth is None:
+      while self.depths[group1] > self.depths[group2]:
+        group1 = self.parents[group1]
+      while self.depths[group2] > self.depths[group1]:
+        group2 = self.parents[group2]
+      while group1 != group2:
+        group1 = self.parents[group1]
+        group2 = self.parents[group2]
+      depth = self.depths[group1]
+      self._common_depths[key] = depth
+    return depth
+
+  def get_uncommon_ancestors(self, op1_name, op2_name):
+    """Get unique ancestors between two ops.
+
+    For example, op1's ancestor groups are [root, G1, G2, G3, op1], op2's ancestor groups are
+    [root, G1, G4, op2], then it returns a tuple ([G2, G3, op1], [G4, op2]).
+    """
+    if op1_name == op2_name:
+      return ((), ())
+    common_depth = self._get_common_depth(self.parents[op1_name], self.parents[op2_name])
+    return (self.ancestors[op1_name][common_depth + 1:],
+            self.ancestors[op2_name][common_depth + 1:])
@@ -13,8 +13,6 @@
 # limitations under the License.
 
 from datetime import datetime
-from kubernetes import client as k8s_client
-from kubernetes import config
 import time
 import logging
 import re
@@ -27,6 +25,8 @@ class K8sHelper(object):
       raise Exception('K8sHelper __init__ failure')
 
   def _configure_k8s(self):
+    from kubernetes import client as k8s_client
+    from kubernetes import config
     try:
       config.load_kube_config()
       logging.info('Found local kubernetes config. Initialized with kube_config.')
@@ -41,6 +41,7 @@ class K8sHelper(object):
 
   def _create_k8s_job(self, yaml_spec):
     """ _create_k8s_job creates a kubernetes job based on the yaml spec """
+    from kubernetes import client as k8s_client
     pod = k8s_client.V1Pod(metadata=k8s_client.V1ObjectMeta(generate_name=yaml_spec['metadata']['generateName']))
     container = k8s_client.V1Container(name = yaml_spec['spec']['containers'][0]['name'],
                                        image = yaml_spec['spec']['containers'][0]['image'],
@@ -71,6 +72,7 @@ class K8sHelper(object):
 
   def _wait_for_k8s_job(self, pod_name, yaml_spec, timeout):
     """ _wait_for_k8s_job waits for the job to complete """
+    from kubernetes import client as k8s_client
     status = 'running'
     start_time = datetime.now()
     while status in ['pending', 'running']:
@@ -91,12 +93,14 @@ class K8sHelper(object):
 
   def _delete_k8s_job(self, pod_name, yaml_spec):
     """ _delete_k8s_job deletes a pod """
+    from kubernetes import client as k8s_client
     try:
       api_response = self._corev1.delete_namespaced_pod(pod_name, yaml_spec['metadata']['namespace'], k8s_client.V1DeleteOptions())
     except k8s_client.rest.ApiException as e:
       logging.exception('Exception when calling CoreV1Api->delete_namespaced_pod: {}\n'.format(str(e)))
 
   def _read_pod_log(self, pod_name, yaml_spec):
+    from kubernetes import client as k8s_client
     try:
       api_response = self._corev1.read_namespaced_pod_log(pod_name, yaml_spec['metadata']['namespace'])
     except k8s_client.rest.ApiException as e:
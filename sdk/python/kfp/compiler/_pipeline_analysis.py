@@ -0,0 +1,268 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import OrderedDict
+import os
+import re
+import tarfile
+import yaml
+
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_QUANTITY_REGEX = re.compile(r'^([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$')
+_QUANTITY_SUFFIXES = {
+  '': 1, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
+  'k': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12, 'P': 1e15, 'E': 1e18,
+  'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50, 'Ei': 2 ** 60,
+}
+
+
+def _parse_quantity(quantity):
+  """Parses a Kubernetes quantity such as '500m' or '2Gi'.
+
+  Returns:
+    The quantity as a float, or 0 if it cannot be parsed (e.g. it is a pipeline parameter).
+  """
+  if quantity is None:
+    return 0
+  if isinstance(quantity, (int, float)):
+    return float(quantity)
+  match = _QUANTITY_REGEX.match(str(quantity).strip())
+  if not match or match.group(2) not in _QUANTITY_SUFFIXES:
+    return 0
+  return float(match.group(1)) * _QUANTITY_SUFFIXES[match.group(2)]
+
+
+def _load_workflow(package_path):
+  if package_path.endswith('.tar.gz') or package_path.endswith('.tgz'):
+    with tarfile.open(package_path, 'r:gz') as tar:
+      members = [m for m in tar if m.isfile() and os.path.splitext(m.name)[-1] in ['.yaml', '.yml']]
+      if len(members) != 1:
+        raise ValueError('Invalid package. Expected exactly one pipeline yaml file in the package.')
+      with tar.extractfile(members[0]) as f:
+        return yaml.load(f.read().decode('utf-8'), Loader=_SafeLoader)
+  with open(package_path, 'r') as f:
+    return yaml.load(f, Loader=_SafeLoader)
+
+
+class PipelineAnalysis(object):
+  """The op level DAG of a compiled pipeline and its scheduling properties.
+
+  Groups such as conditions and exit handlers are flattened, so an op depends on the ops
+  of the groups that its enclosing groups depend on. Conditions are assumed to be true.
+  The schedule assumes unlimited parallelism: every op starts as soon as its dependencies
+  finish.
+
+  Attributes:
+    dependencies: OrderedDict of op name to the sorted list of the op names it directly
+        depends on, in topological order.
+    levels: dict of op name to its level, i.e. the number of ops on the longest chain of
+        dependencies leading to it. Ops without dependencies are on level 0.
+    level_widths: list with the number of ops on each level.
+    max_width: the largest number of ops on one level.
+    critical_path: list of op names on the longest path weighted by the op durations.
+    makespan: the estimated duration of the pipeline. Without durations, every op takes 1.
+    start_times: dict of op name to its estimated start time.
+    durations: dict of op name to the duration used in the estimates.
+    peak_parallelism: the largest number of ops running at the same time.
+    peak_cpu: the largest sum of cpu requests of the ops running at the same time, in cores.
+    peak_memory: the largest sum of memory requests of the ops running at the same time,
+        in bytes.
+  """
+
+  def __init__(self, dependencies, durations, cpu_requests, memory_requests):
+    self.dependencies = dependencies
+    self.durations = durations
+
+    self.levels = {}
+    self.start_times = {}
+    finish_times = {}
+    # op name -> the dependency which finishes last, to backtrack the critical path.
+    critical_dependencies = {}
+    for op, op_dependencies in dependencies.items():
+      self.levels[op] = 1 + max((self.levels[x] for x in op_dependencies), default=-1)
+      self.start_times[op] = 0
+      if op_dependencies:
+        critical_dependencies[op] = max(op_dependencies, key=lambda x: finish_times[x])
+        self.start_times[op] = finish_times[critical_dependencies[op]]
+      finish_times[op] = self.start_times[op] + durations[op]
+
+    self.level_widths = [0] * (1 + max(self.levels.values(), default=-1))
+    for level in self.levels.values():
+      self.level_widths[level] += 1
+    self.max_width = max(self.level_widths, default=0)
+
+    self.makespan = max(finish_times.values(), default=0)
+    self.critical_path = []
+    if finish_times:
+      op = max(finish_times, key=lambda x: finish_times[x])
+      while op is not None:
+        self.critical_path.append(op)
+        op = critical_dependencies.get(op)
+      self.critical_path.reverse()
+
+    # Ops which finish free their resources before the ops starting at the same time use them.
+    events = []
+    for op in dependencies:
+      events.append((finish_times[op], 0, -1, -cpu_requests[op], -memory_requests[op]))
+      events.append((self.start_times[op], 1, 1, cpu_requests[op], memory_requests[op]))
+    events.sort()
+    self.peak_parallelism = self.peak_cpu = self.peak_memory = 0
+    parallelism = cpu = memory = 0
+    for _, _, parallelism_delta, cpu_delta, memory_delta in events:
+      parallelism += parallelism_delta
+      cpu += cpu_delta
+      memory += memory_delta
+      self.peak_parallelism = max(self.peak_parallelism, parallelism)
+      self.peak_cpu = max(self.peak_cpu, cpu)
+      self.peak_memory = max(self.peak_memory, memory)
+
+  def __str__(self):
+    return self.format()
+
+  def format(self):
+    """Formats the analysis as a short human readable summary."""
+    return '\n'.join([
+      'Ops: %d' % len(self.dependencies),
+      'Levels: %d, max width: %d' % (len(self.level_widths), self.max_width),
+      'Critical path (%g): %s' % (self.makespan, ' -> '.join(self.critical_path)),
+      'Peak parallelism: %d' % self.peak_parallelism,
+      'Peak cpu: %g' % self.peak_cpu,
+      'Peak memory: %d bytes' % self.peak_memory,
+    ])
+
+
+def _flatten_dag(templates, template_name, dependencies, op_templates):
+  """Adds the ops of a DAG template and its sub DAGs to dependencies.
+
+  Returns:
+    A tuple (entry ops, exit ops) of the DAG. Entry ops are the ops which do not depend on
+    other ops of the DAG, exit ops are the ops no other op of the DAG depends on.
+  """
+  tasks = templates[template_name]['dag']['tasks']
+  task_entries = {}
+  task_exits = {}
+  for task in tasks:
+    template = templates[task['template']]
+    if 'dag' in template:
+      task_entries[task['name']], task_exits[task['name']] = _flatten_dag(
+          templates, task['template'], dependencies, op_templates)
+    elif 'container' in template or 'resource' in template:
+      dependencies[task['name']] = set()
+      op_templates[task['name']] = template
+      task_entries[task['name']] = task_exits[task['name']] = [task['name']]
+    else:
+      raise ValueError('Unsupported template %s. Only DAG templates and container or '
+                       'resource templates are supported.' % task['template'])
+
+  entries = []
+  upstream_tasks = set()
+  for task in tasks:
+    task_dependencies = task.get('dependencies', [])
+    upstream_tasks.update(task_dependencies)
+    if not task_dependencies:
+      entries.extend(task_entries[task['name']])
+    for entry in task_entries[task['name']]:
+      for dependency in task_dependencies:
+        dependencies[entry].update(task_exits[dependency])
+  exits = []
+  for task in tasks:
+    if task['name'] not in upstream_tasks:
+      exits.extend(task_exits[task['name']])
+  return entries, exits
+
+
+def _sort_topologically(dependencies):
+  dependents = {op: [] for op in dependencies}
+  num_dependencies = {}
+  for op, op_dependencies in dependencies.items():
+    num_dependencies[op] = len(op_dependencies)
+    for dependency in op_dependencies:
+      dependents[dependency].append(op)
+  ready = sorted(op for op, n in num_dependencies.items() if n == 0)
+  sorted_dependencies = OrderedDict()
+  while ready:
+    op = ready.pop()
+    sorted_dependencies[op] = sorted(dependencies[op])
+    for dependent in dependents[op]:
+      num_dependencies[dependent] -= 1
+      if num_dependencies[dependent] == 0:
+        ready.append(dependent)
+  if len(sorted_dependencies) != len(dependencies):
+    raise ValueError('The pipeline has cyclic dependencies.')
+  return sorted_dependencies
+
+
+def analyze_pipeline(pipeline, durations=None, resources=None):
+  """Analyzes the DAG of a pipeline: its critical path, width and resource needs.
+
+  Example:
+  ```python
+  analysis = analyze_pipeline(my_pipeline, durations={'train': 3600, 'preprocess': 600})
+  print(analysis.critical_path, analysis.makespan, analysis.peak_cpu)
+  dsl.get_pipeline_conf().set_parallelism(analysis.peak_parallelism)
+  ```
+
+  Args:
+    pipeline: a pipeline function decorated with @dsl.pipeline, the local path to a compiled
+        package (.tar.gz or .yaml) or a compiled workflow dict.
+    durations: optional dict of op name to its duration, e.g. taken from previous runs. Ops
+        which are not in it take the mean of the given durations. Without durations, every
+        op takes 1 and the makespan is the number of levels.
+    resources: optional dict of op name to a dict with 'cpu' and 'memory' requests, such as
+        {'cpu': '500m', 'memory': '2Gi'}. By default the requests in the op templates are used.
+
+  Returns:
+    A PipelineAnalysis.
+  """
+  if callable(pipeline):
+    from .compiler import Compiler
+    workflow = Compiler()._compile(pipeline)
+  elif isinstance(pipeline, str):
+    workflow = _load_workflow(pipeline)
+  else:
+    workflow = pipeline
+
+  spec = workflow['spec']
+  templates = {t['name']: t for t in spec['templates']}
+  dependencies = {}
+  op_templates = {}
+  if 'dag' in templates[spec['entrypoint']]:
+    _, exits = _flatten_dag(templates, spec['entrypoint'], dependencies, op_templates)
+  else:
+    dependencies[spec['entrypoint']] = set()
+    op_templates[spec['entrypoint']] = templates[spec['entrypoint']]
+    exits = [spec['entrypoint']]
+  if 'onExit' in spec:
+    # The exit handler runs after all the other ops. The compiler also lists the exit op as a
+    # task of the entrypoint DAG.
+    dependencies[spec['onExit']] = set(exits) - {spec['onExit']}
+    op_templates[spec['onExit']] = templates[spec['onExit']]
+  dependencies = _sort_topologically(dependencies)
+
+  durations = durations or {}
+  default_duration = sum(durations.values()) / len(durations) if durations else 1
+  op_durations = {op: durations.get(op, default_duration) for op in dependencies}
+
+  resources = resources or {}
+  cpu_requests = {}
+  memory_requests = {}
+  for op in dependencies:
+    requests = op_templates[op].get('container', {}).get('resources', {}).get('requests', {})
+    requests = dict(requests, **resources.get(op, {}))
+    cpu_requests[op] = _parse_quantity(requests.get('cpu'))
+    memory_requests[op] = _parse_quantity(requests.get('memory'))
+
+  return PipelineAnalysis(dependencies, op_durations, cpu_requests, memory_requests)
@@ -0,0 +1,234 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+
+
+# Source files which define how an op is converted into a template. Cached templates are
+# invalidated when any of them changes.
+# The paths are relative to the compiler package. _pipeline_param.py defines the placeholders
+# which are substituted into the command and arguments.
+_TEMPLATE_SOURCE_FILES = ['compiler.py', '_k8s_helper.py', os.path.join('..', 'dsl', '_pipeline_param.py')]
+_compiler_source_hash = None
+
+
+def _get_compiler_source_hash():
+  global _compiler_source_hash
+  if _compiler_source_hash is None:
+    source_hash = hashlib.sha256()
+    for file_name in _TEMPLATE_SOURCE_FILES:
+      with open(os.path.join(os.path.dirname(__file__), file_name), 'rb') as f:
+        source_hash.update(f.read())
+    _compiler_source_hash = source_hash.hexdigest()
+  return _compiler_source_hash
+
+
+def _k8s_obj_key(k8s_obj):
+  """Converts a k8s object into a json serializable key.
+
+  Unlike K8sHelper.convert_k8s_obj_to_json, the attributes are not renamed to their json
+  names, which makes it several times faster.
+  """
+  if isinstance(k8s_obj, (list, tuple)):
+    return [_k8s_obj_key(x) for x in k8s_obj]
+  if isinstance(k8s_obj, dict):
+    return {key: _k8s_obj_key(value) for key, value in k8s_obj.items()}
+  swagger_types = getattr(k8s_obj, 'swagger_types', None)
+  if swagger_types is None:
+    return k8s_obj
+  return [type(k8s_obj).__name__] + [_k8s_obj_key(getattr(k8s_obj, attr)) for attr in swagger_types]
+
+
+class _OpHasher(object):
+  """Computes the content hash of ops.
+
+  The key of each k8s object attached to the ops is computed once per hasher, since the same
+  object (e.g. an env variable or a volume mount added in a loop) is often shared by many ops.
+  """
+
+  def __init__(self):
+    self._k8s_obj_keys = {}
+
+  def _get_k8s_obj_key(self, k8s_obj):
+    key = id(k8s_obj)
+    # The object is kept along with its key so that its id cannot be reused.
+    if key not in self._k8s_obj_keys:
+      self._k8s_obj_keys[key] = (k8s_obj, _k8s_obj_key(k8s_obj))
+    return self._k8s_obj_keys[key][1]
+
+  def hash_op(self, op):
+    """Returns a stable hash of all the fields of the op which are used in its template."""
+    def _params(params):
+      return [(param.op_name, param.name, str(param.value) if param.value else None,
+               param.param_type.serialize() if param.param_type else None)
+              for param in params]
+
+    content = [
+      _get_compiler_source_hash(),
+      op.name,
+      op.image,
+      [str(x) for x in op.command or []],
+      [str(x) for x in op.arguments or []],
+      _params(op.argument_inputs),
+      _params(op.inputs),
+      _params(op.outputs.values()),
+      op.file_outputs,
+      op.resource_limits,
+      op.resource_requests,
+      op.node_selector,
+      [self._get_k8s_obj_key(x) for x in op.env_variables],
+      [self._get_k8s_obj_key(x) for x in op.volume_mounts],
+      op.pod_annotations,
+      op.pod_labels,
+      op.num_retries,
+    ]
+    content = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class InMemoryTemplateCache(object):
+  """Keeps compiled op templates in memory, evicting the least recently used ones.
+
+  Pass the same cache to the Compiler every time a pipeline is recompiled, e.g. in a notebook:
+  ```python
+  cache = InMemoryTemplateCache()
+  Compiler(template_cache=cache).compile(my_pipeline, 'my_pipeline.tar.gz')
+  ```
+
+  Args:
+    max_size: maximum total size in bytes of the json serialized templates.
+  """
+
+  def __init__(self, max_size=64 * 1024 * 1024):
+    self.max_size = max_size
+    self.size = 0
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()
+
+  def __len__(self):
+    return len(self._entries)
+
+  def _get_entry(self, key):
+    entry = self._entries.get(key)
+    if entry is not None:
+      self._entries.move_to_end(key)
+    return entry
+
+  def _put_entry(self, key, entry):
+    if key in self._entries:
+      self.size -= len(self._entries.pop(key))
+    if len(entry) > self.max_size:
+      return
+    self._entries[key] = entry
+    self.size += len(entry)
+    while self.size > self.max_size:
+      _, evicted_entry = self._entries.popitem(last=False)
+      self.size -= len(evicted_entry)
+
+  def get(self, key):
+    """Returns a copy of the template cached for the key, or None."""
+    entry = self._get_entry(key)
+    if entry is None:
+      self.misses += 1
+      return None
+    self.hits += 1
+    return json.loads(entry)
+
+  def put(self, key, template):
+    self._put_entry(key, json.dumps(template, sort_keys=True))
+
+  def clear(self):
+    self._entries.clear()
+    self.size = 0
+
+
+class DiskTemplateCache(InMemoryTemplateCache):
+  """Keeps compiled op templates in a directory, so that they are reused across processes.
+
+  Every template is stored in its own file. The least recently used files are deleted when
+  the total size of the directory exceeds max_size.
+
+  Args:
+    directory: local path to the cache directory. It is created if it does not exist.
+    max_size: maximum total size in bytes of the cached files.
+  """
+
+  def __init__(self, directory, max_size=256 * 1024 * 1024):
+    super(DiskTemplateCache, self).__init__(max_size)
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+    # key -> file size, least recently used first.
+    self._file_sizes = OrderedDict()
+    files = []
+    for file_name in os.listdir(directory):
+      if file_name.endswith('.json'):
+        stat = os.stat(os.path.join(directory, file_name))
+        files.append((stat.st_mtime, file_name[:-len('.json')], stat.st_size))
+    for _, key, size in sorted(files):
+      self._file_sizes[key] = size
+      self.size += size
+
+  def __len__(self):
+    return len(self._file_sizes)
+
+  def _path(self, key):
+    return os.path.join(self.directory, key + '.json')
+
+  def _get_entry(self, key):
+    if key not in self._file_sizes:
+      return None
+    try:
+      with open(self._path(key), 'r') as f:
+        entry = f.read()
+      # The modification time keeps the recency across processes.
+      os.utime(self._path(key))
+    except OSError:
+      # Deleted by another process.
+      self.size -= self._file_sizes.pop(key)
+      return None
+    self._file_sizes.move_to_end(key)
+    return entry
+
+  def _remove_file(self, key):
+    self.size -= self._file_sizes.pop(key)
+    try:
+      os.remove(self._path(key))
+    except OSError:
+      pass
+
+  def _put_entry(self, key, entry):
+    if key in self._file_sizes:
+      self._remove_file(key)
+    data = entry.encode('utf-8')
+    if len(data) > self.max_size:
+      return
+    # Write to a temporary file first so that readers never see partial templates.
+    fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+      f.write(data)
+    os.replace(temp_path, self._path(key))
+    self._file_sizes[key] = len(data)
+    self.size += len(data)
+    while self.size > self.max_size:
+      self._remove_file(next(iter(self._file_sizes)))
+
+  def clear(self):
+    for key in list(self._file_sizes):
+      self._remove_file(key)
@@ -0,0 +1,172 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import re
+
+
+_TASK_OUTPUT_REFERENCE_REGEX = re.compile(r'{{tasks\.([^.}]+)\.outputs\.parameters\.([^.}]+)}}')
+
+
+def _is_literal(value):
+  return isinstance(value, str) and '{{' not in value
+
+
+def _canonicalize_op_template(template):
+  """Canonicalize an op template by removing the parts that can be passed as task arguments.
+
+  Returns:
+    A tuple (structure hash, immediate input values, literal args, output names).
+    immediate input values is a dict of input parameter name to value.
+    literal args is a dict of the container args index to the literal arg.
+    output names is a dict of the output parameter name (without the op name prefix) to the
+    output parameter name.
+  """
+  canonical_template = copy.deepcopy(template)
+  del canonical_template['name']
+
+  immediate_values = {}
+  for parameter in canonical_template.get('inputs', {}).get('parameters', []):
+    if _is_literal(parameter.get('value')):
+      immediate_values[parameter['name']] = parameter.pop('value')
+
+  literal_args = {}
+  args = canonical_template['container'].get('args', [])
+  for i, arg in enumerate(args):
+    if _is_literal(arg):
+      literal_args[i] = arg
+      args[i] = None
+
+  output_names = {}
+  output_prefix = template['name'] + '-'
+  for parameter in canonical_template.get('outputs', {}).get('parameters', []):
+    local_name = parameter['name']
+    if local_name.startswith(output_prefix):
+      local_name = local_name[len(output_prefix):]
+    output_names[local_name] = parameter['name']
+    parameter['name'] = local_name
+
+  structure = json.dumps(canonical_template, sort_keys=True)
+  structure_hash = hashlib.sha256(structure.encode()).hexdigest()
+  return structure_hash, immediate_values, literal_args, output_names
+
+
+def _make_parameter_name_unique(name, used_names):
+  unique_name = name
+  i = 2
+  while unique_name in used_names:
+    unique_name = '%s-%d' % (name, i)
+    i += 1
+  return unique_name
+
+
+def deduplicate_op_templates(op_templates, group_templates, excluded_op_names=()):
+  """Replaces structurally identical op templates with one shared template.
+
+  Op templates which only differ in their name, their immediate input parameter values, the
+  names of their output parameters and the literal values of their container args are
+  considered identical. One of them is kept as the shared template. The immediate values and
+  the literal args which are not the same for all the ops become input parameters of the
+  shared template, and every DAG task which used one of the removed templates passes them as
+  arguments instead. References to the renamed output parameters are updated in the DAGs.
+
+  Args:
+    op_templates: list of op templates. Task names are the same as the template names.
+    group_templates: list of DAG templates. They are updated in place.
+    excluded_op_names: names of the ops which must keep their own template, such as the exit
+        handler which is referenced by the workflow directly.
+
+  Returns:
+    The deduplicated list of op templates.
+  """
+  templates_by_structure = OrderedDict()
+  canonical_forms = {}
+  for template in sorted(op_templates, key=lambda x: x['name']):
+    if template['name'] in excluded_op_names:
+      continue
+    canonical_form = _canonicalize_op_template(template)
+    canonical_forms[template['name']] = canonical_form
+    templates_by_structure.setdefault(canonical_form[0], []).append(template)
+
+  # task name -> (template name, list of extra arguments)
+  task_updates = {}
+  # (task name, output name) -> output name of the shared template
+  output_renames = {}
+  removed_template_names = set()
+  for templates in templates_by_structure.values():
+    if len(templates) < 2:
+      continue
+    shared_template = templates[0]
+    _, _, shared_literal_args, shared_output_names = canonical_forms[shared_template['name']]
+
+    # Immediate input values are always passed by the tasks.
+    input_parameters = shared_template.get('inputs', {}).get('parameters', [])
+    used_parameter_names = set(x['name'] for x in input_parameters)
+    for parameter in input_parameters:
+      if _is_literal(parameter.get('value')):
+        del parameter['value']
+
+    # Literal args which differ between the ops become input parameters.
+    arg_parameter_names = {}
+    for i in sorted(shared_literal_args):
+      if all(canonical_forms[x['name']][2][i] == shared_literal_args[i] for x in templates):
+        continue
+      parameter_name = _make_parameter_name_unique('argument-%d' % i, used_parameter_names)
+      used_parameter_names.add(parameter_name)
+      arg_parameter_names[i] = parameter_name
+      shared_template['container']['args'][i] = '{{inputs.parameters.%s}}' % parameter_name
+      input_parameters.append({'name': parameter_name})
+    if arg_parameter_names:
+      input_parameters.sort(key=lambda x: x['name'])
+      shared_template.setdefault('inputs', {})['parameters'] = input_parameters
+
+    for template in templates:
+      name = template['name']
+      _, immediate_values, literal_args, output_names = canonical_forms[name]
+      arguments = [{'name': k, 'value': v} for k, v in immediate_values.items()]
+      arguments += [{'name': v, 'value': literal_args[i]} for i, v in arg_parameter_names.items()]
+      task_updates[name] = (shared_template['name'], arguments)
+      if template is not shared_template:
+        removed_template_names.add(name)
+        for local_name, output_name in output_names.items():
+          output_renames[(name, output_name)] = shared_output_names[local_name]
+
+  def _rename_output_reference(match):
+    task_name, output_name = match.group(1), match.group(2)
+    output_name = output_renames.get((task_name, output_name), output_name)
+    return '{{tasks.%s.outputs.parameters.%s}}' % (task_name, output_name)
+
+  for group_template in group_templates:
+    for task in group_template['dag']['tasks']:
+      if task['name'] in task_updates:
+        task['template'], arguments = task_updates[task['name']]
+        if arguments:
+          task_arguments = task.setdefault('arguments', {}).setdefault('parameters', [])
+          task_arguments.extend(arguments)
+          task_arguments.sort(key=lambda x: x['name'])
+      if output_renames:
+        if 'when' in task:
+          task['when'] = _TASK_OUTPUT_REFERENCE_REGEX.sub(_rename_output_reference, task['when'])
+        for argument in task.get('arguments', {}).get('parameters', []):
+          argument['value'] = _TASK_OUTPUT_REFERENCE_REGEX.sub(_rename_output_reference, argument['value'])
+    if output_renames:
+      for output in group_template.get('outputs', {}).get('parameters', []):
+        output['valueFrom']['parameter'] = _TASK_OUTPUT_REFERENCE_REGEX.sub(
+            _rename_output_reference, output['valueFrom']['parameter'])
+
+  return [x for x in op_templates if x['name'] not in removed_template_names]
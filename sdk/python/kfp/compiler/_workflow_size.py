@@ -0,0 +1,183 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import defaultdict, OrderedDict
+import hashlib
+import json
+import logging
+
+
+DEFAULT_LITERAL_THRESHOLD = 1024
+
+# Prefix of the workflow parameters which hold the offloaded literals.
+_OFFLOADED_LITERAL_PREFIX = 'inline-literal-'
+
+
+def _json_size(obj):
+  return len(json.dumps(obj, separators=(',', ':')).encode('utf-8'))
+
+
+class LargeLiteral(object):
+  """A large string which is inlined into the workflow."""
+
+  def __init__(self, value):
+    self.value = value
+    self.size = len(value.encode('utf-8'))
+    # Paths in the workflow where the literal is inlined, e.g. 'templates[my-op].container.command[2]'.
+    self.locations = []
+
+  @property
+  def total_size(self):
+    return self.size * len(self.locations)
+
+  def __repr__(self):
+    return str({self.__class__.__name__: {'size': self.size, 'locations': self.locations}})
+
+
+class WorkflowSizeReport(object):
+  """Breakdown of the serialized size of a workflow.
+
+  All the sizes are in bytes of the compact json serialization, which is how Kubernetes
+  stores the workflow object.
+
+  Attributes:
+    total_size: size of the whole workflow.
+    template_sizes: OrderedDict of template name to size, largest first.
+    field_sizes: OrderedDict of template field (such as 'container.command') to the size summed
+        over all templates, largest first.
+    large_literals: list of LargeLiteral, largest total size first.
+  """
+
+  def __init__(self, total_size, template_sizes, field_sizes, large_literals):
+    self.total_size = total_size
+    self.template_sizes = template_sizes
+    self.field_sizes = field_sizes
+    self.large_literals = large_literals
+
+  def __str__(self):
+    return self.format()
+
+  def format(self, max_rows=10):
+    """Formats the report as a table showing max_rows largest items in each section."""
+    lines = ['Workflow size: %d bytes' % self.total_size]
+    lines.append('Largest templates:')
+    for name, size in list(self.template_sizes.items())[:max_rows]:
+      lines.append('  %10d  %s' % (size, name))
+    lines.append('Largest template fields:')
+    for field, size in list(self.field_sizes.items())[:max_rows]:
+      lines.append('  %10d  %s' % (size, field))
+    if self.large_literals:
+      lines.append('Largest inlined literals:')
+      for literal in self.large_literals[:max_rows]:
+        lines.append('  %10d  %d x %d bytes, first at %s' % (
+            literal.total_size, len(literal.locations), literal.size, literal.locations[0]))
+    return '\n'.join(lines)
+
+
+def _find_large_literals(obj, path, min_size, literals):
+  if isinstance(obj, str):
+    if len(obj) >= min_size:
+      if obj not in literals:
+        literals[obj] = LargeLiteral(obj)
+      literals[obj].locations.append(path)
+  elif isinstance(obj, dict):
+    for key, value in obj.items():
+      _find_large_literals(value, '%s.%s' % (path, key) if path else key, min_size, literals)
+  elif isinstance(obj, list):
+    for i, value in enumerate(obj):
+      _find_large_literals(value, '%s[%d]' % (path, i), min_size, literals)
+
+
+def analyze_workflow_size(workflow, literal_threshold=DEFAULT_LITERAL_THRESHOLD):
+  """Breaks down the size of a compiled workflow by template, template field and literal.
+
+  Args:
+    workflow: the workflow dict.
+    literal_threshold: strings of at least this many characters are reported as large literals.
+
+  Returns:
+    A WorkflowSizeReport.
+  """
+  template_sizes = {}
+  field_sizes = defaultdict(int)
+  literals = OrderedDict()
+  for template in workflow['spec']['templates']:
+    template_sizes[template['name']] = _json_size(template)
+    for key, value in template.items():
+      if key == 'container':
+        for container_key, container_value in value.items():
+          field_sizes['container.' + container_key] += _json_size(container_value)
+      elif key != 'name':
+        field_sizes[key] += _json_size(value)
+    _find_large_literals(template, 'templates[%s]' % template['name'], literal_threshold, literals)
+
+  return WorkflowSizeReport(
+      total_size=_json_size(workflow),
+      template_sizes=OrderedDict(sorted(template_sizes.items(), key=lambda x: -x[1])),
+      field_sizes=OrderedDict(sorted(field_sizes.items(), key=lambda x: -x[1])),
+      large_literals=sorted(literals.values(), key=lambda x: -x.total_size),
+  )
+
+
+def check_workflow_size(workflow, size_budget):
+  """Logs a warning with the size report if the workflow is larger than size_budget bytes.
+
+  Returns:
+    The WorkflowSizeReport if the budget is exceeded, otherwise None.
+  """
+  total_size = _json_size(workflow)
+  if total_size <= size_budget:
+    return None
+  report = analyze_workflow_size(workflow)
+  logging.warning('The workflow size (%d bytes) exceeds the budget of %d bytes. '
+                  'It might be rejected by the cluster.\n%s', total_size, size_budget, report)
+  return report
+
+
+def offload_large_literals(workflow, min_size=DEFAULT_LITERAL_THRESHOLD):
+  """Moves large literals which are repeated in the container commands and args of several
+  templates into workflow parameters, and references them from the templates.
+
+  For example, the source code of a lightweight python component used by many tasks is then
+  emitted once instead of once per template.
+
+  The parameters are named inline-literal-<hash>. Like the pipeline parameters, they are shown
+  as run parameters and can be overridden when a run is created.
+
+  Args:
+    workflow: the workflow dict. It is updated in place.
+    min_size: only strings of at least this many characters are offloaded.
+
+  Returns:
+    The workflow.
+  """
+  literals = OrderedDict()
+  for template in workflow['spec']['templates']:
+    container = template.get('container', {})
+    for field in ['command', 'args']:
+      for i, value in enumerate(container.get(field, [])):
+        # Strings with placeholders are resolved per template, so they have to stay there.
+        if isinstance(value, str) and len(value) >= min_size and '{{' not in value:
+          literals.setdefault(value, []).append((container[field], i))
+
+  parameters = workflow['spec'].setdefault('arguments', {}).setdefault('parameters', [])
+  for value, locations in literals.items():
+    if len(locations) < 2:
+      continue
+    parameter_name = _OFFLOADED_LITERAL_PREFIX + hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+    parameters.append({'name': parameter_name, 'value': value})
+    for container_field, i in locations:
+      container_field[i] = '{{workflow.parameters.%s}}' % parameter_name
+  return workflow
@@ -13,17 +13,38 @@
 # limitations under the License.
 
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import inspect
-import re
+import io
+import json
 import tarfile
+import tempfile
 import yaml
 
 from .. import dsl
 from ._k8s_helper import K8sHelper
-from ..dsl._pipeline_param import _match_serialized_pipelineparam
+from ._group_tree import GroupTree
+from ._template_cache import _OpHasher
+from ._template_deduplication import deduplicate_op_templates
+from ._workflow_size import check_workflow_size, offload_large_literals
+from ..dsl._pipeline_param import _split_serialized_pipelineparams, SerializedPipelineParam
 from ..dsl._metadata import TypeMeta
 
+# Use the libyaml based emitter when it is available.
+try:
+  _SafeDumper = yaml.CSafeDumper
+except AttributeError:
+  _SafeDumper = yaml.SafeDumper
+
+class _WorkflowDumper(_SafeDumper):
+  """Dumps workflows as plain yaml without anchors and aliases."""
+
+  def ignore_aliases(self, data):
+    return True
+
+_WorkflowDumper.add_representer(OrderedDict, _WorkflowDumper.represent_dict)
+
+
 class Compiler(object):
   """DSL Compiler.
 
@@ -38,8 +59,15 @@ class Compiler(object):
 
   Compiler().compile(my_pipeline, 'path/to/workflow.yaml')
   ```
+
+  Args:
+    template_cache: optional InMemoryTemplateCache or DiskTemplateCache. The templates of the
+        ops which did not change since a previous compilation are then taken from the cache.
   """
 
+  def __init__(self, template_cache=None):
+    self._template_cache = template_cache
+
   def _pipelineparam_full_name(self, param):
     """_pipelineparam_full_name converts the names of pipeline parameters
       to unique names in the argo yaml
@@ -51,55 +79,7 @@ class Compiler(object):
       return param.op_name + '-' + param.name
     return param.name
 
-  def _get_groups_for_ops(self, root_group):
-    """Helper function to get belonging groups for each op.
-
-    Each pipeline has a root group. Each group has a list of operators (leaf) and groups.
-    This function traverse the tree and get all ancestor groups for all operators.
-
-    Returns:
-      A dict. Key is the operator's name. Value is a list of ancestor groups including the
-              op itself. The list of a given operator is sorted in a way that the farthest
-              group is the first and operator itself is the last.
-    """
-    def _get_op_groups_helper(current_groups, ops_to_groups):
-      root_group = current_groups[-1]
-      for g in root_group.groups:
-        current_groups.append(g)
-        _get_op_groups_helper(current_groups, ops_to_groups)
-        del current_groups[-1]
-      for op in root_group.ops:
-        ops_to_groups[op.name] = [x.name for x in current_groups] + [op.name]
-
-    ops_to_groups = {}
-    current_groups = [root_group]
-    _get_op_groups_helper(current_groups, ops_to_groups)
-    return ops_to_groups
-
-  def _get_groups(self, root_group):
-    """Helper function to get all groups (not including ops) in a pipeline."""
-
-    def _get_groups_helper(group):
-      groups = [group]
-      for g in group.groups:
-        groups += _get_groups_helper(g)
-      return groups
-
-    return _get_groups_helper(root_group)
-
-  def _get_uncommon_ancestors(self, op_groups, op1, op2):
-    """Helper function to get unique ancestors between two ops.
-
-    For example, op1's ancestor groups are [root, G1, G2, G3, op1], op2's ancestor groups are
-    [root, G1, G4, op2], then it returns a tuple ([G2, G3, op1], [G4, op2]).
-    """
-    both_groups = [op_groups[op1.name], op_groups[op2.name]]
-    common_groups_len = sum(1 for x in zip(*both_groups) if x==(x[0],)*len(x))
-    group1 = op_groups[op1.name][common_groups_len:]
-    group2 = op_groups[op2.name][common_groups_len:]
-    return (group1, group2)
-
-  def _get_inputs_outputs(self, pipeline, root_group, op_groups):
+  def _get_inputs_outputs(self, pipeline, group_tree):
     """Get inputs and outputs of each group and op.
 
     Returns:
@@ -109,12 +89,11 @@ class Compiler(object):
       produces the param. If the param is a pipeline param (no producer op), then
       producing_op_name is None.
     """
-    condition_params = self._get_condition_params_for_ops(root_group)
     inputs = defaultdict(set)
     outputs = defaultdict(set)
     for op in pipeline.ops.values():
       # op's inputs and all params used in conditions for that op are both considered.
-      for param in op.inputs + list(condition_params[op.name]):
+      for param in op.inputs + list(group_tree.get_condition_params(op.name)):
         # if the value is already provided (immediate value), then no need to expose
         # it as input for its parent groups.
         if param.value:
@@ -122,9 +101,8 @@ class Compiler(object):
 
         full_name = self._pipelineparam_full_name(param)
         if param.op_name:
-          upstream_op = pipeline.ops[param.op_name]
-          upstream_groups, downstream_groups = self._get_uncommon_ancestors(
-              op_groups, upstream_op, op)
+          upstream_groups, downstream_groups = group_tree.get_uncommon_ancestors(
+              param.op_name, op.name)
           for i, g in enumerate(downstream_groups):
             if i == 0:
               # If it is the first uncommon downstream group, then the input comes from
@@ -143,33 +121,11 @@ class Compiler(object):
               outputs[g].add((full_name, upstream_groups[i+1]))
         else:
           if not op.is_exit_handler:
-            for g in op_groups[op.name]:
+            for g in group_tree.ancestors[op.name]:
               inputs[g].add((full_name, None))
     return inputs, outputs
 
-  def _get_condition_params_for_ops(self, root_group):
-    """Get parameters referenced in conditions of ops."""
-
-    conditions = defaultdict(set)
-
-    def _get_condition_params_for_ops_helper(group, current_conditions_params):
-      new_current_conditions_params = current_conditions_params
-      if group.type == 'condition':
-        new_current_conditions_params = list(current_conditions_params)
-        if isinstance(group.condition.operand1, dsl.PipelineParam):
-          new_current_conditions_params.append(group.condition.operand1)
-        if isinstance(group.condition.operand2, dsl.PipelineParam):
-          new_current_conditions_params.append(group.condition.operand2)
-      for op in group.ops:
-        for param in new_current_conditions_params:
-          conditions[op.name].add(param)
-      for g in group.groups:
-        _get_condition_params_for_ops_helper(g, new_current_conditions_params)
-
-    _get_condition_params_for_ops_helper(root_group, [])
-    return conditions
-
-  def _get_dependencies(self, pipeline, root_group, op_groups):
+  def _get_dependencies(self, pipeline, group_tree):
     """Get dependent groups and ops for all ops and groups.
 
     Returns:
@@ -179,19 +135,17 @@ class Compiler(object):
       then G3 is dependent on G2. Basically dependency only exists in the first uncommon
       ancesters in their ancesters chain. Only sibling groups/ops can have dependencies.
     """
-    condition_params = self._get_condition_params_for_ops(root_group)
     dependencies = defaultdict(set)
     for op in pipeline.ops.values():
       unstream_op_names = set()
-      for param in op.inputs + list(condition_params[op.name]):
+      for param in op.inputs + list(group_tree.get_condition_params(op.name)):
         if param.op_name:
           unstream_op_names.add(param.op_name)
       unstream_op_names |= set(op.dependent_op_names)
 
       for op_name in unstream_op_names:
-        upstream_op = pipeline.ops[op_name]
-        upstream_groups, downstream_groups = self._get_uncommon_ancestors(
-            op_groups, upstream_op, op)
+        upstream_groups, downstream_groups = group_tree.get_uncommon_ancestors(
+            op_name, op.name)
         dependencies[downstream_groups[0]].add(upstream_groups[0])
     return dependencies
 
@@ -214,27 +168,46 @@ class Compiler(object):
       return str(value_or_reference)
 
   def _process_args(self, raw_args, argument_inputs):
+    """_process_args replaces the serialized pipeline parameters in the raw arguments with
+    the argo input parameter references.
+
+    Each argument is scanned once and every serialized parameter found in it is resolved
+    through a dict lookup. Parameters that are not in argument_inputs are left as they are.
+
+    Args:
+      raw_args: list of command or argument parts.
+      argument_inputs(list[PipelineParam]): the (sanitized) parameters referenced by the op.
+      """
     if not raw_args:
       return []
-    processed_args = list(map(str, raw_args))
-    for i, _ in enumerate(processed_args):
-      # unsanitized_argument_inputs stores a dict: string of sanitized param -> string of unsanitized param
-      matches = []
-      matches += _match_serialized_pipelineparam(str(processed_args[i]))
-      unsanitized_argument_inputs = {}
-      for x in list(set(matches)):
-        if len(x) == 3 or (len(x) == 4 and x[3] == ''):
-          sanitized_str = str(dsl.PipelineParam(K8sHelper.sanitize_k8s_name(x[1]), K8sHelper.sanitize_k8s_name(x[0]), x[2]))
-          unsanitized_argument_inputs[sanitized_str] = str(dsl.PipelineParam(x[1], x[0], x[2]))
-        elif len(x) == 4:
-          sanitized_str = str(dsl.PipelineParam(K8sHelper.sanitize_k8s_name(x[1]), K8sHelper.sanitize_k8s_name(x[0]), x[2], TypeMeta.from_dict_or_str(x[3])))
-          unsanitized_argument_inputs[sanitized_str] = str(dsl.PipelineParam(x[1], x[0], x[2], TypeMeta.from_dict_or_str(x[3])))
-      if argument_inputs:
-        for param in argument_inputs:
-          if str(param) in unsanitized_argument_inputs:
-            full_name = self._pipelineparam_full_name(param)
-            processed_args[i] = re.sub(unsanitized_argument_inputs[str(param)], '{{inputs.parameters.%s}}' % full_name,
-                                       processed_args[i])
+
+    input_references = {}
+    for param in argument_inputs or []:
+      key = (param.op_name or '', param.name, param.value or '',
+             param.param_type.serialize() if param.param_type is not None else '')
+      input_references[key] = '{{inputs.parameters.%s}}' % self._pipelineparam_full_name(param)
+
+    # The raw arguments carry the unsanitized names.
+    sanitized_names = {}
+    def _sanitize(name):
+      if name not in sanitized_names:
+        sanitized_names[name] = K8sHelper.sanitize_k8s_name(name) if name else name
+      return sanitized_names[name]
+
+    processed_args = []
+    for arg in map(str, raw_args):
+      segments = _split_serialized_pipelineparams(arg)
+      if len(segments) == 1 and isinstance(segments[0], str):
+        processed_args.append(arg)
+        continue
+      processed_segments = []
+      for segment in segments:
+        if isinstance(segment, SerializedPipelineParam):
+          key = (_sanitize(segment.op_name), _sanitize(segment.name), segment.value, segment.type)
+          processed_segments.append(input_references.get(key, segment.pattern))
+        else:
+          processed_segments.append(segment)
+      processed_args.append(''.join(processed_segments))
     return processed_args
 
   def _op_to_template(self, op):
@@ -412,20 +385,33 @@ class Compiler(object):
   def _create_templates(self, pipeline):
     """Create all groups and ops templates in the pipeline."""
 
-    new_root_group = pipeline.groups[0]
+    # The group tree is indexed once and shared by all the passes below.
+    group_tree = GroupTree(pipeline.groups[0])
+    inputs, outputs = self._get_inputs_outputs(pipeline, group_tree)
+    dependencies = self._get_dependencies(pipeline, group_tree)
 
-    op_groups = self._get_groups_for_ops(new_root_group)
-    inputs, outputs = self._get_inputs_outputs(pipeline, new_root_group, op_groups)
-    dependencies = self._get_dependencies(pipeline, new_root_group, op_groups)
-    groups = self._get_groups(new_root_group)
+    group_templates = []
+    for g in group_tree.groups:
+      group_templates.append(self._group_to_template(g, inputs, outputs, dependencies))
 
-    templates = []
-    for g in groups:
-      templates.append(self._group_to_template(g, inputs, outputs, dependencies))
-
-    for op in pipeline.ops.values():
-      templates.append(self._op_to_template(op))
-    return templates
+    op_templates = []
+    if self._template_cache is None:
+      for op in pipeline.ops.values():
+        op_templates.append(self._op_to_template(op))
+    else:
+      op_hasher = _OpHasher()
+      for op in pipeline.ops.values():
+        op_hash = op_hasher.hash_op(op)
+        template = self._template_cache.get(op_hash)
+        if template is None:
+          template = self._op_to_template(op)
+          self._template_cache.put(op_hash, template)
+        op_templates.append(template)
+
+    if pipeline.conf.deduplicate_templates:
+      exit_op_names = [op.name for op in pipeline.ops.values() if op.is_exit_handler]
+      op_templates = deduplicate_op_templates(op_templates, group_templates, exit_op_names)
+    return group_templates + op_templates
 
   def _create_volumes(self, pipeline):
     """Create volumes required for the templates"""
@@ -488,6 +474,13 @@ class Compiler(object):
       workflow['spec']['onExit'] = exit_handler.name
     if volumes:
       workflow['spec']['volumes'] = volumes
+    if pipeline.conf.parallelism is not None:
+      workflow['spec']['parallelism'] = pipeline.conf.parallelism
+
+    if pipeline.conf.offload_literals_min_size is not None:
+      offload_large_literals(workflow, pipeline.conf.offload_literals_min_size)
+    if pipeline.conf.size_budget is not None:
+      check_workflow_size(workflow, pipeline.conf.size_budget)
     return workflow
 
   def _validate_exit_handler(self, pipeline):
@@ -576,28 +569,59 @@ class Compiler(object):
     workflow = self._create_pipeline_workflow(args_list_with_defaults, p)
     return workflow
 
-  def compile(self, pipeline_func, package_path, type_check=False):
+  def _dump_workflow(self, workflow, stream=None, output_format='yaml'):
+    """Serialize the workflow into yaml or json.
+
+    Args:
+      workflow: the workflow dict.
+      stream: text stream to write to. If None, the serialized text is returned.
+      output_format: 'yaml' or 'json'. Json is a subset of yaml, so both can be used as
+          the pipeline.yaml of a package.
+    """
+    if output_format == 'json':
+      # json.dumps is backed by the C encoder, unlike json.dump which encodes in python.
+      text = json.dumps(workflow, sort_keys=True)
+      if stream is None:
+        return text
+      stream.write(text)
+    elif output_format == 'yaml':
+      return yaml.dump(workflow, stream, Dumper=_WorkflowDumper, default_flow_style=False)
+    else:
+      raise ValueError('Unsupported output format: %s. Supported formats: yaml, json.' % output_format)
+
+  def _write_workflow(self, workflow, package_path, output_format='yaml'):
+    """Write the workflow into a tar.gz package as pipeline.yaml.
+
+    The workflow is serialized straight into a temporary file which is then copied into the
+    package, so that no in-memory copy of the whole text is needed.
+    """
+    with tempfile.TemporaryFile() as workflow_file:
+      text_file = io.TextIOWrapper(workflow_file, encoding='utf-8')
+      self._dump_workflow(workflow, text_file, output_format)
+      text_file.flush()
+      tarinfo = tarfile.TarInfo('pipeline.yaml')
+      tarinfo.size = workflow_file.tell()
+      workflow_file.seek(0)
+      with tarfile.open(package_path, "w:gz") as tar:
+        tar.addfile(tarinfo, fileobj=workflow_file)
+      # Do not let the wrapper close the underlying file.
+      text_file.detach()
+
+  def compile(self, pipeline_func, package_path, type_check=False, output_format='yaml'):
     """Compile the given pipeline function into workflow yaml.
 
     Args:
       pipeline_func: pipeline functions with @dsl.pipeline decorator.
       package_path: the output workflow tar.gz file path. for example, "~/a.tar.gz"
       type_check: whether to enable the type check or not, default: False.
+      output_format: the format of the workflow in the package, 'yaml' or 'json'.
+          Json is faster to write and to load. Default: 'yaml'.
     """
     import kfp
     type_check_old_value = kfp.TYPE_CHECK
     try:
       kfp.TYPE_CHECK = type_check
       workflow = self._compile(pipeline_func)
-      yaml.Dumper.ignore_aliases = lambda *args : True
-      yaml_text = yaml.dump(workflow, default_flow_style=False)
-
-      from contextlib import closing
-      from io import BytesIO
-      with tarfile.open(package_path, "w:gz") as tar:
-        with closing(BytesIO(yaml_text.encode())) as yaml_file:
-          tarinfo = tarfile.TarInfo('pipeline.yaml')
-          tarinfo.size = len(yaml_file.getvalue())
-          tar.addfile(tarinfo, fileobj=yaml_file)
+      self._write_workflow(workflow, package_path, output_format)
     finally:
       kfp.TYPE_CHECK = type_check_old_value
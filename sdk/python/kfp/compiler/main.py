@@ -14,6 +14,10 @@
 
 
 import argparse
+import concurrent.futures
+import glob
+import hashlib
+import json
 import kfp.dsl as dsl
 import kfp.compiler
 import os
@@ -21,6 +25,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
 
 
 def parse_arguments():
@@ -29,7 +34,9 @@ def parse_arguments():
   parser = argparse.ArgumentParser()
   parser.add_argument('--py',
                       type=str,
-                      help='local absolute path to a py file.')
+                      action='append',
+                      help='local absolute path to a py file. With --output-dir it can be '
+                           'repeated and can also be a directory of py files.')
   parser.add_argument('--package',
                       type=str,
                       help='local path to a pip installable python package file.')
@@ -41,17 +48,32 @@ def parse_arguments():
                       help='The namespace for the pipeline function')
   parser.add_argument('--output',
                       type=str,
-                      required=True,
                       help='local path to the output workflow yaml file.')
+  parser.add_argument('--output-dir',
+                      type=str,
+                      help='local path to the output directory. Compiles all the --py files in '
+                           'parallel into <output-dir>/<py file name>.tar.gz.')
+  parser.add_argument('--workers',
+                      type=int,
+                      help='number of worker processes used with --output-dir. '
+                           'Default is the number of CPUs.')
+  parser.add_argument('--force',
+                      action='store_true',
+                      help='with --output-dir, recompile pipelines which have not changed.')
   parser.add_argument('--type-check',
                       action='store_true',
                       help='enable the type check, default is disabled.')
+  parser.add_argument('--output-format',
+                      type=str,
+                      choices=['yaml', 'json'],
+                      default='yaml',
+                      help='format of the workflow in the package, default is yaml.')
 
   args = parser.parse_args()
   return args
 
 
-def _compile_pipeline_function(function_name, output_path, type_check):
+def _compile_pipeline_function(function_name, output_path, type_check, output_format='yaml'):
 
   pipeline_funcs = list(dsl.Pipeline.get_pipeline_functions().keys())
   if len(pipeline_funcs) == 0:
@@ -69,40 +91,187 @@ def _compile_pipeline_function(function_name, output_path, type_check):
   else:
     pipeline_func = pipeline_funcs[0]
 
-  kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check)
+  kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check, output_format)
 
 
-def compile_package(package_path, namespace, function_name, output_path, type_check):
+def compile_package(package_path, namespace, function_name, output_path, type_check, output_format='yaml'):
   tmpdir = tempfile.mkdtemp()
   sys.path.insert(0, tmpdir)
   try:
     subprocess.check_call(['python3', '-m', 'pip', 'install', package_path, '-t', tmpdir])
     __import__(namespace)
-    _compile_pipeline_function(function_name, output_path, type_check)
+    _compile_pipeline_function(function_name, output_path, type_check, output_format)
   finally:
     del sys.path[0]
     shutil.rmtree(tmpdir)
 
 
-def compile_pyfile(pyfile, function_name, output_path, type_check):
+def compile_pyfile(pyfile, function_name, output_path, type_check, output_format='yaml'):
   sys.path.insert(0, os.path.dirname(pyfile))
   try:
     filename = os.path.basename(pyfile)
     __import__(os.path.splitext(filename)[0])
-    _compile_pipeline_function(function_name, output_path, type_check)
+    _compile_pipeline_function(function_name, output_path, type_check, output_format)
   finally:
     del sys.path[0]
 
 
+# Name of the file in the output directory which stores the hashes of the compiled sources.
+_BATCH_CACHE_FILE_NAME = '.dsl-compile-cache.json'
+
+
+def _get_sdk_hash():
+  """Hash of the kfp package sources, so that upgrading the SDK invalidates the cache."""
+  kfp_dir = os.path.dirname(os.path.abspath(kfp.__file__))
+  sdk_hash = hashlib.sha256()
+  for path in sorted(glob.glob(os.path.join(kfp_dir, '**', '*.py'), recursive=True)):
+    sdk_hash.update(os.path.relpath(path, kfp_dir).encode())
+    with open(path, 'rb') as f:
+      sdk_hash.update(f.read())
+  return sdk_hash.hexdigest()
+
+
+def _get_source_hash(pyfile, sdk_hash, function_name, type_check, output_format):
+  source_hash = hashlib.sha256()
+  with open(pyfile, 'rb') as f:
+    source_hash.update(f.read())
+  source_hash.update(json.dumps([sdk_hash, function_name, type_check, output_format]).encode())
+  return source_hash.hexdigest()
+
+
+def _expand_pyfiles(paths):
+  """Expands directories into the py files in them.
+
+  Returns:
+    A list of tuples (py file, whether it was found in a directory).
+  """
+  pyfiles = []
+  for path in paths:
+    if os.path.isdir(path):
+      pyfiles.extend((x, True) for x in sorted(glob.glob(os.path.join(path, '*.py')))
+                     if os.path.basename(x) != '__init__.py')
+    else:
+      pyfiles.append((path, False))
+  return pyfiles
+
+
+def _compile_pyfile_in_worker(pyfile, function_name, output_path, type_check, output_format,
+                              skip_if_no_pipeline):
+  """Compiles one py file in a worker process, which may have compiled other files before.
+
+  Returns:
+    A tuple (status, elapsed seconds, error message). status is one of 'compiled', 'skipped'
+    and 'failed'.
+  """
+  start_time = time.time()
+  # Pipelines and modules imported for previous files must not leak into this one.
+  dsl.Pipeline.get_pipeline_functions().clear()
+  module_name = os.path.splitext(os.path.basename(pyfile))[0]
+  sys.modules.pop(module_name, None)
+  try:
+    sys.path.insert(0, os.path.dirname(pyfile))
+    try:
+      __import__(module_name)
+    finally:
+      del sys.path[0]
+    if skip_if_no_pipeline and not dsl.Pipeline.get_pipeline_functions():
+      return 'skipped', time.time() - start_time, 'no pipeline function'
+    _compile_pipeline_function(function_name, output_path, type_check, output_format)
+  except Exception as e:
+    return 'failed', time.time() - start_time, '%s: %s' % (type(e).__name__, e)
+  finally:
+    sys.modules.pop(module_name, None)
+  return 'compiled', time.time() - start_time, None
+
+
+def compile_pyfiles(paths, output_dir, function_name=None, type_check=False, output_format='yaml',
+                    workers=None, force=False):
+  """Compiles many py files in parallel.
+
+  Each py file is compiled into <output_dir>/<py file name>.tar.gz by a pool of worker
+  processes, so the SDK is imported once per worker. Files whose source, SDK and compile
+  options did not change since they were last compiled into output_dir are skipped unless
+  force is True. Only the py file itself is hashed, not the modules it imports.
+
+  Args:
+    paths: py files or directories of py files. Files in directories which do not define a
+        pipeline are skipped.
+
+  Returns:
+    A dict of py file to tuple (status, output path, elapsed seconds, error message).
+    status is one of 'compiled', 'unchanged', 'skipped' and 'failed'.
+  """
+  pyfiles = _expand_pyfiles(paths)
+  output_paths = {}
+  for pyfile, _ in pyfiles:
+    output_name = os.path.splitext(os.path.basename(pyfile))[0] + '.tar.gz'
+    if output_name in output_paths.values():
+      raise ValueError('Multiple py files would be compiled into %s.' % output_name)
+    output_paths[pyfile] = os.path.join(output_dir, output_name)
+
+  os.makedirs(output_dir, exist_ok=True)
+  cache_path = os.path.join(output_dir, _BATCH_CACHE_FILE_NAME)
+  cache = {}
+  if os.path.exists(cache_path):
+    with open(cache_path, 'r') as f:
+      cache = json.load(f)
+
+  sdk_hash = _get_sdk_hash()
+  results = {}
+  futures = {}
+  with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+    for pyfile, in_directory in pyfiles:
+      output_path = output_paths[pyfile]
+      source_hash = _get_source_hash(pyfile, sdk_hash, function_name, type_check, output_format)
+      output_name = os.path.basename(output_path)
+      if not force and cache.get(output_name) == source_hash and os.path.exists(output_path):
+        results[pyfile] = ('unchanged', output_path, 0.0, None)
+        continue
+      future = executor.submit(_compile_pyfile_in_worker, os.path.abspath(pyfile), function_name,
+                               output_path, type_check, output_format, in_directory)
+      futures[future] = (pyfile, source_hash)
+
+    for future in concurrent.futures.as_completed(futures):
+      pyfile, source_hash = futures[future]
+      status, elapsed_time, error = future.result()
+      output_name = os.path.basename(output_paths[pyfile])
+      if status == 'compiled':
+        cache[output_name] = source_hash
+      else:
+        cache.pop(output_name, None)
+      results[pyfile] = (status, output_paths[pyfile], elapsed_time, error)
+
+  with open(cache_path, 'w') as f:
+    json.dump(cache, f, indent=2, sort_keys=True)
+  return results
+
+
 def main():
   args = parse_arguments()
+  if args.output_dir:
+    if args.py is None or args.package is not None or args.output is not None:
+      raise ValueError('--output-dir is only supported with --py and without --output.')
+    results = compile_pyfiles(args.py, args.output_dir, args.function, args.type_check,
+                              args.output_format, args.workers, args.force)
+    for pyfile in sorted(results):
+      status, output_path, elapsed_time, error = results[pyfile]
+      print('%-9s %7.2fs  %s -> %s%s' % (status, elapsed_time, pyfile, output_path,
+                                          ' (%s)' % error if error else ''))
+    if any(x[0] == 'failed' for x in results.values()):
+      sys.exit(1)
+    return
+
+  if args.output is None:
+    raise ValueError('--output is required.')
   if ((args.py is None and args.package is None) or
       (args.py is not None and args.package is not None)):
     raise ValueError('Either --py or --package is needed but not both.')
   if args.py:
-    compile_pyfile(args.py, args.function, args.output, args.type_check)
+    if len(args.py) > 1:
+      raise ValueError('Multiple --py files are only supported with --output-dir.')
+    compile_pyfile(args.py[0], args.function, args.output, args.type_check, args.output_format)
   else:
     if args.namespace is None:
       raise ValueError('--namespace is required for compiling packages.')
-    compile_package(args.package, args.namespace, args.function, args.output, args.type_check)
-  
+    compile_package(args.package, args.namespace, args.function, args.output, args.type_check,
+                    args.output_format)
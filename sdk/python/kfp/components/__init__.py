@@ -12,6 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ._components import *
-from ._python_op import *
-from ._component_store import *
+from .._lazy_module import make_lazy_module
+
+__all__ = [
+  'load_component',
+  'load_component_from_text',
+  'load_component_from_url',
+  'load_component_from_file',
+  'get_task_factory_cache_info',
+  'clear_task_factory_cache',
+  'func_to_container_op',
+  'func_to_component_text',
+  'InputPath',
+  'OutputPath',
+  'register_serializer',
+  'ComponentStore',
+  'ComponentCache',
+  'ComponentBundle',
+  'build_component_bundle',
+]
+
+make_lazy_module(__name__, {
+  'load_component': ('._components', 'load_component'),
+  'load_component_from_text': ('._components', 'load_component_from_text'),
+  'load_component_from_url': ('._components', 'load_component_from_url'),
+  'load_component_from_file': ('._components', 'load_component_from_file'),
+  'get_task_factory_cache_info': ('._components', 'get_task_factory_cache_info'),
+  'clear_task_factory_cache': ('._components', 'clear_task_factory_cache'),
+  'func_to_container_op': ('._python_op', 'func_to_container_op'),
+  'func_to_component_text': ('._python_op', 'func_to_component_text'),
+  'InputPath': ('._python_op', 'InputPath'),
+  'OutputPath': ('._python_op', 'OutputPath'),
+  'register_serializer': ('._python_op', 'register_serializer'),
+  'ComponentStore': ('._component_store', 'ComponentStore'),
+  'ComponentCache': ('._component_cache', 'ComponentCache'),
+  'ComponentBundle': ('._component_bundle', 'ComponentBundle'),
+  'build_component_bundle': ('._component_bundle', 'build_component_bundle'),
+})
+
@@ -0,0 +1,235 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__all__ = [
+    'ComponentBundle',
+    'build_component_bundle',
+]
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+from . import _components as comp
+from ._structures import ComponentSpec
+from ._yaml_utils import load_yaml
+
+
+#File layout: magic, size of the index, index JSON, component specs JSON.
+_MAGIC = b'KFPCBND1'
+_INDEX_SIZE_FORMAT = '<Q'
+_HEADER_SIZE = len(_MAGIC) + struct.calcsize(_INDEX_SIZE_FORMAT)
+
+_COMPONENT_FILE_NAME = 'component.yaml'
+_DIGESTS_SUBPATH = ('versions', 'sha256')
+_TAGS_SUBPATH = ('versions', 'tags')
+
+
+def _parse_component_file_path(relative_path):
+    '''Returns (name, digest, tag) for a path laid out like the ComponentStore search locations, or None.'''
+    parts = relative_path.replace(os.sep, '/').split('/')
+    if parts[-1] == _COMPONENT_FILE_NAME and len(parts) > 1:
+        return '/'.join(parts[:-1]), None, None
+    if len(parts) > 3 and tuple(parts[-3:-1]) == _DIGESTS_SUBPATH:
+        return '/'.join(parts[:-3]), parts[-1], None
+    if len(parts) > 3 and tuple(parts[-3:-1]) == _TAGS_SUBPATH:
+        return '/'.join(parts[:-3]), None, parts[-1]
+    return None
+
+
+def build_component_bundle(components_dir, output_path):
+    '''Builds a component bundle file from a directory of component files.
+
+    The directory is laid out like the ComponentStore search locations:
+    <components_dir>/<name>/component.yaml
+    <components_dir>/<name>/versions/sha256/<digest>
+    <components_dir>/<name>/versions/tags/<tag>
+
+    Every component file is parsed and validated once, and the bundle stores the component specs as compact JSON, indexed by name, digest and tag.
+    The components which cannot be parsed are skipped with a warning.
+
+    Args:
+        components_dir: Local path to the directory with the component files.
+        output_path: Local path to the output bundle file.
+
+    Returns:
+        The sorted list of the names of the bundled components.
+    '''
+    payloads = OrderedDict() #digest -> component spec JSON
+    names = {}
+    for root, dirs, file_names in os.walk(components_dir):
+        dirs.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(root, file_name)
+            location = _parse_component_file_path(os.path.relpath(file_path, components_dir))
+            if location is None:
+                continue
+            name, file_digest, tag = location
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if file_digest is not None and file_digest != digest:
+                logging.warning('Skipping {}: the file digest is {}'.format(file_path, digest))
+                continue
+            if digest not in payloads:
+                try:
+                    component_spec = ComponentSpec.from_struct(load_yaml(data))
+                except Exception as e:
+                    logging.warning('Skipping {}: {}'.format(file_path, e))
+                    continue
+                payloads[digest] = json.dumps(component_spec.to_struct(), separators=(',', ':')).encode('utf-8')
+
+            entry = names.setdefault(name, {'latest': None, 'digests': [], 'tags': {}})
+            if digest not in entry['digests']:
+                entry['digests'].append(digest)
+            if tag is not None:
+                entry['tags'][tag] = digest
+            elif file_digest is None:
+                entry['latest'] = digest
+
+    components = {}
+    offset = 0
+    for digest, payload in payloads.items():
+        components[digest] = [offset, len(payload)]
+        offset += len(payload)
+    index = json.dumps({'components': components, 'names': names}, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack(_INDEX_SIZE_FORMAT, len(index)))
+        f.write(index)
+        for payload in payloads.values():
+            f.write(payload)
+    os.replace(temp_path, output_path)
+    return sorted(names)
+
+
+class ComponentBundle:
+    '''Read-only component bundle file built by build_component_bundle.
+
+    The file is memory-mapped and only the index is parsed when the bundle is opened.
+    Each component spec is deserialized when its component is first loaded.
+
+    Args:
+        path: Local path to the bundle file.
+    '''
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(_MAGIC)] != _MAGIC:
+            self._mmap.close()
+            raise ValueError('{} is not a component bundle file.'.format(self.path))
+        (index_size,) = struct.unpack(_INDEX_SIZE_FORMAT, self._mmap[len(_MAGIC):_HEADER_SIZE])
+        index = json.loads(self._mmap[_HEADER_SIZE:_HEADER_SIZE + index_size].decode('utf-8'))
+        self._components = index['components']
+        self._names = index['names']
+        self._data_offset = _HEADER_SIZE + index_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    @property
+    def names(self):
+        return sorted(self._names)
+
+    def find_digest(self, name, digest=None, tag=None):
+        '''Returns the digest of the component version with the name and either digest or tag, or None if the bundle does not have it.'''
+        entry = self._names.get(name)
+        if entry is None:
+            return None
+        if digest is not None:
+            return digest if digest in entry['digests'] else None
+        if tag is not None:
+            return entry['tags'].get(tag)
+        return entry['latest']
+
+    def _get_payload(self, digest):
+        offset, size = self._components[digest]
+        start = self._data_offset + offset
+        return self._mmap[start:start + size]
+
+    def get_component_spec(self, name, digest=None, tag=None):
+        '''Returns the ComponentSpec of the component version. Raises KeyError if the bundle does not have it.'''
+        found_digest = self.find_digest(name, digest, tag)
+        if found_digest is None:
+            raise KeyError(name)
+        return ComponentSpec.from_struct(json.loads(self._get_payload(found_digest).decode('utf-8'), object_pairs_hook=OrderedDict))
+
+    def load_component(self, name, digest=None, tag=None, component_filename=None):
+        '''
+        Loads component from the bundle and creates a task factory function
+
+        Args:
+            name: Component name.
+            digest: Strict component version. SHA256 hash digest of the original component file.
+            tag: Version tag.
+            component_filename: File name used by the task factory. Default: <bundle path>/<name>
+
+        Returns:
+            A factory function with a strongly-typed signature.
+            Once called with the required arguments, the factory constructs a pipeline task instance (ContainerOp).
+
+        Raises:
+            KeyError: The bundle does not have the component version.
+        '''
+        found_digest = self.find_digest(name, digest, tag)
+        if found_digest is None:
+            raise KeyError(name)
+        component_filename = component_filename or self.path + '/' + name
+        payload = self._get_payload(found_digest)
+        return comp._task_factory_cache.get_or_create(
+            payload,
+            component_filename,
+            lambda: comp._create_task_factory_from_component_dict(json.loads(payload.decode('utf-8'), object_pairs_hook=OrderedDict), component_filename),
+        )
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Builds a component bundle file from a directory of component files.')
+    parser.add_argument('--components-dir',
+                        type=str,
+                        required=True,
+                        help='local path to the directory with the component files.')
+    parser.add_argument('--output',
+                        type=str,
+                        required=True,
+                        help='local path to the output bundle file.')
+    args = parser.parse_args()
+    names = build_component_bundle(args.components_dir, args.output)
+    print('Bundled {} components into {}'.format(len(names), args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__all__ = [
+    'ComponentCache',
+]
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+_DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kfp', 'components')
+
+
+def _write_file_atomically(path, data):
+    #Readers in other processes never see partial files
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class ComponentCache:
+    '''Content-addressed on-disk cache of the component files downloaded by ComponentStore.
+
+    The files are stored by the SHA256 digest of their content, so files loaded by digest never
+    expire and are shared by all the URLs they were downloaded from. Files loaded by name or
+    tag are revalidated with the ETag (or Last-Modified) of the previous download, so that an
+    unchanged file is not downloaded again. The least recently used files are deleted when the
+    total size of the files exceeds max_size.
+
+    Layout:
+    <directory>/sha256/<digest>: the file content
+    <directory>/urls/<sha256 of the url>.json: the digest and the validators of the last download of the URL
+
+    Args:
+        directory: Local path to the cache directory. It is created if it does not exist. Default: ~/.cache/kfp/components
+        max_size: Maximum total size in bytes of the cached files.
+        offline: Never use the network. The cached files of the URLs are used without revalidation and URLs which are not cached are not found.
+    '''
+    def __init__(self, directory=None, max_size=256 * 1024 * 1024, offline=False):
+        self.directory = directory or _DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._blobs_dir = os.path.join(self.directory, 'sha256')
+        self._urls_dir = os.path.join(self.directory, 'urls')
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        os.makedirs(self._urls_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+        #digest -> file size, least recently used first
+        self._blob_sizes = OrderedDict()
+        self.size = 0
+        blobs = []
+        for digest in os.listdir(self._blobs_dir):
+            if digest.endswith('.tmp'):
+                continue
+            stat = os.stat(os.path.join(self._blobs_dir, digest))
+            blobs.append((stat.st_mtime, digest, stat.st_size))
+        for _, digest, size in sorted(blobs):
+            self._blob_sizes[digest] = size
+            self.size += size
+
+    def __len__(self):
+        return len(self._blob_sizes)
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blobs_dir, digest)
+
+    def _url_entry_path(self, url):
+        return os.path.join(self._urls_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get_by_digest(self, digest):
+        '''Returns the cached file with the SHA256 digest, or None.'''
+        with self._lock:
+            if digest not in self._blob_sizes:
+                return None
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                data = f.read()
+            #The modification time keeps the recency across processes
+            os.utime(self._blob_path(digest))
+        except OSError:
+            #Evicted by another process
+            with self._lock:
+                if digest in self._blob_sizes:
+                    self.size -= self._blob_sizes.pop(digest)
+            return None
+        with self._lock:
+            if digest in self._blob_sizes:
+                self._blob_sizes.move_to_end(digest)
+        return data
+
+    def put(self, data):
+        '''Adds a file to the cache and returns its SHA256 digest.'''
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._blob_sizes:
+                return digest
+        if len(data) > self.max_size:
+            return digest
+        _write_file_atomically(self._blob_path(digest), data)
+        with self._lock:
+            if digest not in self._blob_sizes:
+                self._blob_sizes[digest] = len(data)
+                self.size += len(data)
+            evicted_digests = []
+            while self.size > self.max_size:
+                evicted_digest, evicted_size = self._blob_sizes.popitem(last=False)
+                self.size -= evicted_size
+                evicted_digests.append(evicted_digest)
+        for evicted_digest in evicted_digests:
+            try:
+                os.remove(self._blob_path(evicted_digest))
+            except OSError:
+                pass
+        return digest
+
+    def _read_url_entry(self, url):
+        try:
+            with open(self._url_entry_path(url), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if entry.get('url') != url:
+            return None, None
+        return entry, self.get_by_digest(entry['sha256'])
+
+    def fetch(self, url, session, immutable=False):
+        '''Returns the content of the URL, from the cache when possible.
+
+        Args:
+            url: The URL of the component file.
+            session: The requests.Session used to download the file.
+            immutable: Whether the content of the URL never changes, e.g. when the URL contains the digest of the file. Cached immutable URLs are not revalidated.
+
+        Returns:
+            The content of the URL, or None if it was not found.
+        '''
+        entry, data = self._read_url_entry(url)
+        if data is not None and (immutable or self.offline):
+            with self._lock:
+                self.hits += 1
+            return data
+        if self.offline:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        headers = {}
+        if data is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = session.get(url, headers=headers)
+        except Exception as e:
+            if data is None:
+                raise
+            logging.warning('Failed to revalidate {}, using the cached file: {}'.format(url, e))
+            return data
+        if response.status_code == 304 and data is not None:
+            with self._lock:
+                self.hits += 1
+                self.revalidations += 1
+            return data
+        with self._lock:
+            self.misses += 1
+        if not response.ok or not response.content:
+            return None
+        entry = {
+            'url': url,
+            'sha256': self.put(response.content),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        _write_file_atomically(self._url_entry_path(url), json.dumps(entry).encode('utf-8'))
+        return response.content
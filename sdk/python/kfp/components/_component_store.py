@@ -2,21 +2,54 @@ __all__ = [
     'ComponentStore',
 ]
 
+import threading
 from pathlib import Path
-import requests
 from . import _components as comp
 
 class ComponentStore:
-    def __init__(self, local_search_paths=None, url_search_prefixes=None):
+    '''Loads components by name, digest or tag from local directories and URL prefixes.
+
+    Args:
+        local_search_paths: Local directories to search the components in. Default: the current directory.
+        url_search_prefixes: URL prefixes to search the components in, after the local directories.
+        cache: Optional ComponentCache for the files downloaded from URLs. It keeps them across processes and allows loading them offline.
+        bundle_paths: Local paths to component bundle files built by build_component_bundle. They are searched after the local directories.
+    '''
+    def __init__(self, local_search_paths=None, url_search_prefixes=None, cache=None, bundle_paths=None):
+        from ._component_bundle import ComponentBundle
         self.local_search_paths = local_search_paths or ['.']
         self.url_search_prefixes = url_search_prefixes or []
+        self.cache = cache
+        self.bundles = [ComponentBundle(bundle_path) for bundle_path in bundle_paths or []]
 
         self._component_file_name = 'component.yaml'
         self._digests_subpath = 'versions/sha256'
         self._tags_subpath = 'versions/tags'
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self):
+        #One session for all the downloads, so that the connections to the hosts are reused
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            return self._session
+
+    def _fetch_url(self, url, immutable=False):
+        '''Returns the content of the URL or None if it was not found.'''
+        if self.cache is not None:
+            return self.cache.fetch(url, self._get_session(), immutable)
+        response = self._get_session().get(url) #Does not throw exceptions on bad status, but throws on dead domains and malformed URLs. Should we log those cases?
+        if not response.ok:
+            return None
+        return response.content
 
     def load_component_from_url(self, url):
-        return comp.load_component_from_url(url)
+        content = self._fetch_url(url)
+        if not content:
+            raise RuntimeError('Component was not found at {}'.format(url))
+        return comp._load_component_from_yaml_or_zip_bytes(content, url)
 
     def load_component_from_file(self, path):
         return comp.load_component_from_file(path)
@@ -27,14 +60,17 @@ class ComponentStore:
 
         Search locations:
         <local-search-path>/<name>/component.yaml
+        <bundle-path>:<name>
         <url-search-prefix>/<name>/component.yaml
 
         If the digest is specified, then the search locations are:
         <local-search-path>/<name>/versions/sha256/<digest>
+        <bundle-path>:<name>/versions/sha256/<digest>
         <url-search-prefix>/<name>/versions/sha256/<digest>
 
         If the tag is specified, then the search locations are:
         <local-search-path>/<name>/versions/tags/<digest>
+        <bundle-path>:<name>/versions/tags/<digest>
         <url-search-prefix>/<name>/versions/tags/<digest>
 
         Args:
@@ -50,41 +86,121 @@ class ComponentStore:
         #This function should be called load_task_factory since it returns a factory function.
         #The real load_component function should produce an object with component properties (e.g. name, description, inputs/outputs).
         #TODO: Change this function to return component spec object but it should be callable to construct tasks.
+        path_suffix = self._get_path_suffix(name, digest, tag)
+        tried_locations = []
+
+        load_func = self._find_local_component(name, digest, tag, path_suffix, tried_locations)
+        if load_func is not None:
+            return load_func()
+
+        #Trying URL prefixes
+        for url in self._get_urls(path_suffix, tried_locations):
+            content = self._fetch_url_or_none(url, immutable=digest is not None)
+            if content:
+                return comp._load_component_from_yaml_or_zip_bytes(content, url)
+
+        raise self._component_not_found_error(name, tried_locations)
+
+    def load_components(self, components, max_workers=10):
+        '''
+        Loads many components concurrently and creates their task factory functions
+
+        The components are searched like in load_component, but the URL prefixes of all the components are fetched at the same time, and every component is parsed as soon as it is fetched, while the other components are still being downloaded.
+        So loading dozens of remote components takes about as long as the slowest download.
+
+        Example::
+
+            store = ComponentStore(url_search_prefixes=['https://raw.githubusercontent.com/kubeflow/pipelines/master/components/'])
+            train_op, predict_op = store.load_components([
+                'gcp/dataproc/train',
+                {'name': 'gcp/dataproc/predict', 'tag': 'v1'},
+            ])
+
+        Args:
+            components: List of the components to load. Every component is either a name or a dict of the arguments of load_component: name and either digest or tag.
+            max_workers: Maximum number of concurrent downloads.
+
+        Returns:
+            The list of the task factory functions, in the order of the components.
+        '''
+        from concurrent.futures import ThreadPoolExecutor
+
+        component_args = [{'name': component} if isinstance(component, str) else dict(component) for component in components]
+        path_suffixes = [self._get_path_suffix(**args) for args in component_args]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            load_futures = [None] * len(component_args)
+            tried_locations = [[] for _ in component_args]
+            url_futures = {}
+            for index, (args, path_suffix) in enumerate(zip(component_args, path_suffixes)):
+                load_func = self._find_local_component(args['name'], args.get('digest'), args.get('tag'), path_suffix, tried_locations[index])
+                if load_func is not None:
+                    load_futures[index] = executor.submit(load_func)
+                    continue
+                #The URL prefixes are all fetched at the same time. The first prefix which has the component wins, like in load_component.
+                urls = self._get_urls(path_suffix, tried_locations[index])
+                url_futures[index] = [(url, executor.submit(self._fetch_url_or_none, url, args.get('digest') is not None)) for url in urls]
+
+            for index, url_content_futures in url_futures.items():
+                for url, content_future in url_content_futures:
+                    content = content_future.result()
+                    if content:
+                        load_futures[index] = executor.submit(comp._load_component_from_yaml_or_zip_bytes, content, url)
+                        break
+                if load_futures[index] is None:
+                    raise self._component_not_found_error(component_args[index]['name'], tried_locations[index])
+
+            return [future.result() for future in load_futures]
+
+    def _get_path_suffix(self, name, digest=None, tag=None):
         if not name:
             raise TypeError("name is required")
         if name.startswith('/') or name.endswith('/'):
             raise ValueError('Component name should not start or end with slash: "{}"'.format(name))
 
-        tried_locations = []
-
         if digest is not None and tag is not None:
             raise ValueError('Cannot specify both tag and digest')
 
         if digest is not None:
-            path_suffix = name + '/' + self._digests_subpath + '/' + digest
+            return name + '/' + self._digests_subpath + '/' + digest
         elif tag is not None:
-            path_suffix = name + '/' + self._tags_subpath + '/' + tag
             #TODO: Handle symlinks in GIT URLs
+            return name + '/' + self._tags_subpath + '/' + tag
         else:
-            path_suffix = name + '/' + self._component_file_name
+            return name + '/' + self._component_file_name
 
+    def _find_local_component(self, name, digest, tag, path_suffix, tried_locations):
+        '''Returns a function which loads the component from a local search path, a bundle or the cache, or None.'''
         #Trying local search paths
         for local_search_path in self.local_search_paths:
             component_path = Path(local_search_path, path_suffix)
             tried_locations.append(str(component_path))
             if component_path.is_file():
-                return comp.load_component_from_file(str(component_path))
-
-        #Trying URL prefixes
-        for url_search_prefix in self.url_search_prefixes:
-            url = url_search_prefix + path_suffix
-            tried_locations.append(url)
-            try:
-                response = requests.get(url) #Does not throw exceptions on bad status, but throws on dead domains and malformed URLs. Should we log those cases?
-                response.raise_for_status()
-            except:
-                continue
-            if response.content:
-                return comp._load_component_from_yaml_or_zip_bytes(response.content, url)
-
-        raise RuntimeError('Component {} was not found. Tried the following locations:\n{}'.format(name, '\n'.join(tried_locations)))
+                return lambda: comp.load_component_from_file(str(component_path))
+
+        #Trying bundles
+        for bundle in self.bundles:
+            tried_locations.append(bundle.path + ':' + path_suffix)
+            found_digest = bundle.find_digest(name, digest, tag)
+            if found_digest is not None:
+                return lambda: bundle.load_component(name, digest=found_digest, component_filename=path_suffix)
+
+        #Trying the cached files. The digest identifies the file no matter which URL it was downloaded from.
+        if digest is not None and self.cache is not None:
+            content = self.cache.get_by_digest(digest)
+            if content:
+                return lambda: comp._load_component_from_yaml_or_zip_bytes(content, path_suffix)
+        return None
+
+    def _get_urls(self, path_suffix, tried_locations):
+        urls = [url_search_prefix + path_suffix for url_search_prefix in self.url_search_prefixes]
+        tried_locations.extend(urls)
+        return urls
+
+    def _fetch_url_or_none(self, url, immutable):
+        try:
+            return self._fetch_url(url, immutable)
+        except:
+            return None
+
+    def _component_not_found_error(self, name, tried_locations):
+        return RuntimeError('Component {} was not found. Tried the following locations:\n{}'.format(name, '\n'.join(tried_locations)))
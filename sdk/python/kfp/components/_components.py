@@ -17,10 +17,14 @@ __all__ = [
     'load_component_from_text',
     'load_component_from_url',
     'load_component_from_file',
+    'get_task_factory_cache_info',
+    'clear_task_factory_cache',
 ]
 
+import hashlib
 import sys
-from collections import OrderedDict
+import threading
+from collections import OrderedDict, namedtuple
 from ._naming import _sanitize_file_name, _sanitize_python_function_name, generate_unique_name_conversion_table
 from ._yaml_utils import load_yaml
 from ._structures import ComponentSpec
@@ -32,6 +36,67 @@ import kfp
 _default_component_name = 'Component'
 
 
+TaskFactoryCacheInfo = namedtuple('TaskFactoryCacheInfo', ['hits', 'misses', 'max_size', 'size'])
+
+
+class _TaskFactoryCache:
+    '''Process-wide LRU cache of the task factories created from component files.
+
+    The entries are keyed by the SHA256 digest of the component file bytes and by the component file name which is part of the factory.
+    The cached factory keeps the parsed ComponentSpec, so loading the same component again is a hash lookup.
+    '''
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._task_factories = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, data: bytes, component_filename, create_task_factory):
+        key = (hashlib.sha256(data).hexdigest(), component_filename)
+        with self._lock:
+            task_factory = self._task_factories.get(key)
+            if task_factory is not None:
+                self._task_factories.move_to_end(key)
+                self.hits += 1
+                return task_factory
+            self.misses += 1
+        #Parsing is done outside the lock so that different components can be loaded at the same time
+        task_factory = create_task_factory()
+        with self._lock:
+            task_factory = self._task_factories.setdefault(key, task_factory)
+            while len(self._task_factories) > max(self.max_size, 0):
+                self._task_factories.popitem(last=False)
+        return task_factory
+
+    def info(self):
+        with self._lock:
+            return TaskFactoryCacheInfo(self.hits, self.misses, self.max_size, len(self._task_factories))
+
+    def clear(self):
+        with self._lock:
+            self._task_factories.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_task_factory_cache = _TaskFactoryCache()
+
+
+def get_task_factory_cache_info():
+    '''Returns the statistics of the task factory cache used by the load_component_from_* functions.
+
+    Returns:
+        TaskFactoryCacheInfo with the number of cache hits and misses, the maximum number of cached task factories and the current number of cached task factories.
+    '''
+    return _task_factory_cache.info()
+
+
+def clear_task_factory_cache():
+    '''Clears the task factory cache used by the load_component_from_* functions and resets its statistics.'''
+    _task_factory_cache.clear()
+
+
 def load_component(filename=None, url=None, text=None):
     '''
     Loads component from text, file or URL and creates a task factory function
@@ -96,7 +161,7 @@ def load_component_from_file(filename):
     if filename is None:
         raise TypeError
     with open(filename, 'rb') as component_stream:
-        return _load_component_from_yaml_or_zip_stream(component_stream, filename)
+        return _load_component_from_yaml_or_zip_bytes(component_stream.read(), filename)
 
 
 def load_component_from_text(text):
@@ -112,7 +177,8 @@ def load_component_from_text(text):
     '''
     if text is None:
         raise TypeError
-    return _create_task_factory_from_component_text(text, None)
+    data = text if isinstance(text, bytes) else text.encode('utf-8')
+    return _task_factory_cache.get_or_create(data, None, lambda: _create_task_factory_from_component_text(text, None))
 
 
 _COMPONENT_FILE_NAME_IN_ARCHIVE = 'component.yaml'
@@ -120,8 +186,11 @@ _COMPONENT_FILE_NAME_IN_ARCHIVE = 'component.yaml'
 
 def _load_component_from_yaml_or_zip_bytes(bytes, component_filename=None):
     import io
-    component_stream = io.BytesIO(bytes)
-    return _load_component_from_yaml_or_zip_stream(component_stream, component_filename)
+    return _task_factory_cache.get_or_create(
+        bytes,
+        component_filename,
+        lambda: _load_component_from_yaml_or_zip_stream(io.BytesIO(bytes), component_filename),
+    )
 
 
 def _load_component_from_yaml_or_zip_stream(stream, component_filename=None):
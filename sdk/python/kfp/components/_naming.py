@@ -21,6 +21,7 @@ __all__ = [
     '_generate_unique_suffix',
     '_make_name_unique_by_adding_index',
     '_convert_name_and_make_it_unique_by_adding_number',
+    '_UniqueNameRegistry',
     'generate_unique_name_conversion_table',
 ]
 
@@ -87,15 +88,47 @@ def _convert_name_and_make_it_unique_by_adding_number(name: str, used_converted_
     return converted_name
 
 
+class _UniqueNameRegistry:
+    '''Keeps track of used names and makes new names unique by adding indices.
+
+    For every base name the registry remembers the next index to try, so registering N items that share a name takes linear time instead of re-probing all the taken indices each time.
+    '''
+    def __init__(self, delimiter: str = ' ', conversion_func: Callable[[str], str] = None):
+        self._delimiter = delimiter
+        self._conversion_func = conversion_func or (lambda name: name)
+        self._used_names = set()
+        self._next_indices = {}
+
+    def __contains__(self, name):
+        return name in self._used_names
+
+    def __len__(self):
+        return len(self._used_names)
+
+    def make_unique(self, name: str) -> str:
+        '''Converts the name, makes it unique by adding an index if needed ("Something", "Something 2", ...) and marks the result as used.
+        '''
+        base_name = self._conversion_func(name)
+        unique_name = base_name
+        if unique_name in self._used_names:
+            index = self._next_indices.get(base_name, 2) #Starting indices from 2
+            while True:
+                unique_name = self._conversion_func(name + self._delimiter + str(index))
+                index += 1
+                if unique_name not in self._used_names:
+                    break
+            self._next_indices[base_name] = index
+        self._used_names.add(unique_name)
+        return unique_name
+
+
 def generate_unique_name_conversion_table(names: Sequence[str], conversion_func: Callable[[str], str]) -> Mapping[str, str]:
     '''Given a list of names and conversion_func, this function generates a map from original names to converted names that are made unique by adding numbers.
     '''
     forward_map = {}
-    reverse_map = {}
+    used_converted_names = _UniqueNameRegistry(' ', conversion_func)
     for name in names:
         if name in forward_map:
             raise ValueError('Original name {} is not unique.'.format(name))
-        converted_name = _convert_name_and_make_it_unique_by_adding_number(name, reverse_map, conversion_func)
-        forward_map[name] = converted_name
-        reverse_map[converted_name] = name
+        forward_map[name] = used_converted_names.make_unique(name)
     return forward_map
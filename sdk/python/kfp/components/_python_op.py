@@ -15,6 +15,9 @@
 __all__ = [
     'func_to_container_op',
     'func_to_component_text',
+    'InputPath',
+    'OutputPath',
+    'register_serializer',
 ]
 
 from ._yaml_utils import dump_yaml
@@ -36,6 +39,110 @@ class InputFile(Generic[T], str):
 class OutputFile(Generic[T], str):
     pass
 
+
+class InputPath:
+    '''When creating component from function, InputPath should be used as function parameter annotation to tell the system to pass the *data file path* to the function instead of passing the actual data.
+
+    Example::
+
+        def count_lines(text_path: InputPath('Text')) -> int:
+            with open(text_path) as f:
+                return len(f.readlines())
+
+    The "_path" and "_file" suffixes are stripped from the parameter name to get the input name.
+    Note: ContainerOp does not support input artifacts yet, so the input data is passed to the container as a value and is written to a local file before the function is called.
+    '''
+    def __init__(self, type=None):
+        self.type = type
+
+
+class OutputPath:
+    '''When creating component from function, OutputPath should be used as function parameter annotation to tell the system that the function wants to output data by writing it into a file with the given path instead of returning the data from the function.
+
+    Example::
+
+        def split_text(text: str, lines_path: OutputPath('Text')):
+            with open(lines_path, 'w') as f:
+                f.write('\\n'.join(text.split()))
+
+    The "_path" and "_file" suffixes are stripped from the parameter name to get the output name.
+    The parent directory of the file is created before the function is called.
+    '''
+    def __init__(self, type=None):
+        self.type = type
+
+
+#The serializers run in the component container. Their source code is copied to the component program, so they must be self-contained.
+def _serialize_str(obj, file_path):
+    with open(file_path, 'w') as f:
+        f.write(str(obj))
+
+
+def _serialize_bytes(obj, file_path):
+    with open(file_path, 'wb') as f:
+        f.write(obj)
+
+
+def _serialize_json(obj, file_path):
+    import json
+    with open(file_path, 'w') as f:
+        json.dump(obj, f)
+
+
+def _serialize_numpy_array(obj, file_path):
+    import numpy
+    with open(file_path, 'wb') as f: #numpy.save adds the .npy extension to file names
+        numpy.save(f, obj, allow_pickle=False)
+
+
+def _serialize_parquet(obj, file_path):
+    obj.to_parquet(file_path)
+
+
+#Type name -> (serializer, deserializer or None)
+_serializers = {}
+
+#Types with binary file formats. ContainerOp does not support input artifacts yet and the input values are passed as strings, so these types cannot be used as inputs.
+_binary_type_names = {'bytes', 'NumPyArray', 'ndarray', 'ApacheParquet', 'DataFrame'}
+
+
+def register_serializer(type_name, serializer, deserializer=None):
+    '''Registers the functions which write and read the values of a type in lightweight python components.
+
+    Functions returning a value of the type write it to the output file with the serializer.
+    If the deserializer is specified, functions taking a value of the type as an input get the value read with the deserializer from a file containing the passed argument.
+    Otherwise the function gets the argument as a string.
+    The functions are copied to the component program like the component function, so they must be self-contained (the imports must be inside the functions).
+
+    Args:
+        type_name: The type name or annotation, e.g. 'NumPyArray' or dict.
+        serializer: Function(obj, file_path) that writes the value to the file.
+        deserializer: Optional. Function(file_path) that reads the value from the file.
+    '''
+    _serializers[_annotation_to_type_struct(type_name)] = (serializer, deserializer)
+
+
+def _annotation_to_type_struct(annotation):
+    import inspect
+    if not annotation or annotation == inspect.Parameter.empty:
+        return None
+    if isinstance(annotation, type):
+        return str(annotation.__name__)
+    else:
+        return str(annotation)
+
+
+#The built-in types only have serializers, so the inputs of these types are passed to the functions as strings like before.
+for _type_names, _serializer in [
+    (['bytes'], _serialize_bytes),
+    (['JSON', 'dict', 'list'], _serialize_json),
+    (['NumPyArray', 'ndarray'], _serialize_numpy_array),
+    (['ApacheParquet', 'DataFrame'], _serialize_parquet),
+]:
+    for _type_name in _type_names:
+        register_serializer(_type_name, _serializer)
+
+
 #TODO: Replace this image name with another name once people decide what to replace it with.
 _default_base_image='tensorflow/tensorflow:1.11.0-py3'
 
@@ -45,6 +152,100 @@ def _python_function_name_to_component_name(name):
     return re.sub(' +', ' ', name.replace('_', ' ')).strip(' ').capitalize()
 
 
+def _parameter_name_to_port_name(name):
+    for suffix in ['_path', '_file']:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _make_parent_dirs_and_return_path(file_path: str):
+    import os
+    if os.path.dirname(file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    return file_path
+
+
+def _write_input_file(text: str):
+    import tempfile
+    fd, file_path = tempfile.mkstemp()
+    with open(fd, 'w') as f:
+        f.write(text)
+    return file_path
+
+
+def _get_function_source_definition(func):
+    import inspect
+    #Source code can include decorators line @python_op. Remove them
+    (func_code_lines, _) = inspect.getsourcelines(func)
+    while func_code_lines[0].lstrip().startswith('@'): #decorator
+        del func_code_lines[0]
+
+    #Function might be defined in some indented scope (e.g. in another function).
+    #We need to handle this and properly dedent the function source code
+    first_line = func_code_lines[0]
+    indent = len(first_line) - len(first_line.lstrip())
+    func_code_lines = [line[indent:] for line in func_code_lines]
+
+    return ''.join(func_code_lines) #Lines retain their \n endings
+
+
+def _strip_parameter_annotations(func_code, parameter_names):
+    '''Removes the annotations of the named parameters from the function source code.
+    InputPath and OutputPath annotations cannot be evaluated in the component program since kfp is not installed there.
+    '''
+    import io
+    import tokenize
+
+    spans = []
+    depth = 0
+    expecting_parameter = False
+    parameter_name = None
+    annotation_start = None
+    for token in tokenize.generate_tokens(io.StringIO(func_code).readline):
+        if token.type not in (tokenize.OP, tokenize.NAME):
+            continue
+        if token.string in ('(', '[', '{'):
+            depth += 1
+            expecting_parameter = expecting_parameter or (depth == 1 and token.string == '(')
+            continue
+        if token.string in (')', ']', '}'):
+            depth -= 1
+            if depth == 0: #End of the parameter list
+                if annotation_start is not None:
+                    spans.append((annotation_start, token.start))
+                break
+            continue
+        if depth != 1:
+            continue
+        if annotation_start is None:
+            if token.type == tokenize.NAME and expecting_parameter:
+                parameter_name = token.string
+                expecting_parameter = False
+            elif token.string == ':' and parameter_name in parameter_names:
+                annotation_start = token.start
+            elif token.string == ',':
+                expecting_parameter = True
+                parameter_name = None
+            elif token.string == '=':
+                parameter_name = None
+        elif token.string in (',', '='):
+            spans.append((annotation_start, token.start))
+            annotation_start = None
+            expecting_parameter = token.string == ','
+            parameter_name = None
+
+    lines = func_code.splitlines(keepends=True)
+    line_offsets = [0]
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line))
+    for (start_row, start_col), (end_row, end_col) in reversed(spans):
+        start = line_offsets[start_row - 1] + start_col
+        end = line_offsets[end_row - 1] + end_col
+        func_code = func_code[:start] + func_code[end:]
+    return func_code
+
+
 def _func_to_component_spec(func, extra_code='', base_image=_default_base_image) -> ComponentSpec:
     '''Takes a self-contained python function and converts it to component
 
@@ -73,57 +274,81 @@ def _func_to_component_spec(func, extra_code='', base_image=_default_base_image)
 
     signature = inspect.signature(func)
     parameters = list(signature.parameters.values())
-    parameter_to_type_name = OrderedDict()
     inputs = []
     outputs = []
-    extra_output_names = []
     arguments = []
+    #Python expressions which produce the function arguments from the program arguments
+    input_args_parsing_code_lines = []
+    #Functions whose source code is added to the program
+    helper_funcs = OrderedDict()
 
-    def annotation_to_type_struct(annotation):
-        if not annotation or annotation == inspect.Parameter.empty:
-            return None
-        if isinstance(annotation, type):
-            return str(annotation.__name__)
-        else:
-            return str(annotation)
+    def add_argument(placeholder):
+        arguments.append(placeholder)
+        return 'sys.argv[{}]'.format(len(arguments))
+
+    def add_output(name, type_struct):
+        if name in [output.name for output in outputs]:
+            raise ValueError('Output "{}" is declared more than once in function {}'.format(name, func.__name__))
+        outputs.append(OutputSpec(name=name, type=type_struct))
+        return add_argument(OutputPathPlaceholder(name))
+
+    def use_helper_func(helper_func):
+        helper_funcs[helper_func.__name__] = helper_func
+        return helper_func.__name__
 
     for parameter in parameters:
-        type_struct = annotation_to_type_struct(parameter.annotation)
-        parameter_to_type_name[parameter.name] = str(type_struct)
+        annotation = parameter.annotation
+        if isinstance(annotation, OutputPath):
+            argv_code = add_output(_parameter_name_to_port_name(parameter.name), _annotation_to_type_struct(annotation.type))
+            input_args_parsing_code_lines.append("    '{}': {}({}),".format(parameter.name, use_helper_func(_make_parent_dirs_and_return_path), argv_code))
+            continue
+
+        input_name = parameter.name
+        if isinstance(annotation, InputPath):
+            input_name = _parameter_name_to_port_name(parameter.name)
+            type_struct = _annotation_to_type_struct(annotation.type)
+        else:
+            type_struct = _annotation_to_type_struct(annotation)
         #TODO: Humanize the input/output names
-        arguments.append(InputValuePlaceholder(parameter.name))
-
         input_spec = InputSpec(
-            name=parameter.name,
+            name=input_name,
             type=type_struct,
             default=str(parameter.default) if parameter.default is not inspect.Parameter.empty else None,
         )
         inputs.append(input_spec)
+        argv_code = add_argument(InputValuePlaceholder(input_name))
+
+        deserializer = _serializers.get(type_struct, (None, None))[1]
+        if isinstance(annotation, InputPath):
+            if type_struct in _binary_type_names:
+                raise ValueError('Input "{}" of function {} has type {} which has a binary file format. Such inputs are not supported since ContainerOp does not support input artifacts yet.'.format(parameter.name, func.__name__, type_struct))
+            arg_code = '{}({})'.format(use_helper_func(_write_input_file), argv_code)
+        elif deserializer is not None:
+            arg_code = '{}({}({}))'.format(use_helper_func(deserializer), use_helper_func(_write_input_file), argv_code)
+        else:
+            arg_code = '{}({})'.format(type_struct if type_struct in ['int', 'float', 'bool'] else 'str', argv_code)
+        if (isinstance(annotation, InputPath) or deserializer is not None) and parameter.default is None:
+            #The default value is passed as the 'None' string
+            arg_code = "None if {} == 'None' else {}".format(argv_code, arg_code)
+        input_args_parsing_code_lines.append("    '{}': {},".format(parameter.name, arg_code))
 
     #Analyzing the return type annotations.
     return_ann = signature.return_annotation
+    output_files_parsing_code_lines = []
+    output_serializer_names = []
+    return_type_structs = []
     if hasattr(return_ann, '_fields'): #NamedTuple
         for field_name in return_ann._fields:
             type_struct = None
             if hasattr(return_ann, '_field_types'):
-                type_struct = annotation_to_type_struct(return_ann._field_types.get(field_name, None))
-
-            output_spec = OutputSpec(
-                name=field_name,
-                type=type_struct,
-            )
-            outputs.append(output_spec)
-            extra_output_names.append(field_name)
-            arguments.append(OutputPathPlaceholder(field_name))
+                type_struct = _annotation_to_type_struct(return_ann._field_types.get(field_name, None))
+            return_type_structs.append((field_name, type_struct))
     elif signature.return_annotation is not None and signature.return_annotation != inspect.Parameter.empty:
-        type_struct = annotation_to_type_struct(signature.return_annotation)
-        output_spec = OutputSpec(
-            name=single_output_name_const,
-            type=type_struct,
-        )
-        outputs.append(output_spec)
-        extra_output_names.append(single_output_pythonic_name_const)
-        arguments.append(OutputPathPlaceholder(single_output_name_const))
+        return_type_structs.append((single_output_name_const, _annotation_to_type_struct(signature.return_annotation)))
+    for output_name, type_struct in return_type_structs:
+        output_files_parsing_code_lines.append('    {},'.format(add_output(output_name, type_struct)))
+        serializer = _serializers[type_struct][0] if type_struct in _serializers else _serialize_str
+        output_serializer_names.append('    {},'.format(use_helper_func(serializer)))
 
     func_name=func.__name__
 
@@ -133,34 +358,14 @@ def _func_to_component_spec(func, extra_code='', base_image=_default_base_image)
     if hasattr(return_ann, '_fields'): #NamedTuple
         func_type_declarations_code = func_type_declarations_code + '\n' + 'from typing import NamedTuple'
 
-    #Source code can include decorators line @python_op. Remove them
-    (func_code_lines, _) = inspect.getsourcelines(func) 
-    while func_code_lines[0].lstrip().startswith('@'): #decorator
-        del func_code_lines[0]
-        
-    #Function might be defined in some indented scope (e.g. in another function).
-    #We need to handle this and properly dedent the function source code
-    first_line = func_code_lines[0]
-    indent = len(first_line) - len(first_line.lstrip())
-    func_code_lines = [line[indent:] for line in func_code_lines]
-    
-    func_code = ''.join(func_code_lines) #Lines retain their \n endings
-
-    extra_output_external_names = [name + '_file' for name in extra_output_names]
-
-    input_args_parsing_code_lines =(
-        "    '{arg_name}': {arg_type}(sys.argv[{arg_idx}]),".format(
-            arg_name=name_type[0],
-            arg_type=name_type[1] if name_type[1] in ['int', 'float', 'bool'] else 'str',
-            arg_idx=idx + 1
-        )
-        for idx, name_type in enumerate(parameter_to_type_name.items())
-    )
+    func_code = _get_function_source_definition(func)
+    path_parameter_names = [parameter.name for parameter in parameters if isinstance(parameter.annotation, (InputPath, OutputPath))]
+    if path_parameter_names:
+        func_code = _strip_parameter_annotations(func_code, path_parameter_names)
+    helper_funcs_code = '\n\n'.join(_get_function_source_definition(helper_func) for helper_func in helper_funcs.values())
 
-    output_files_parsing_code_lines = (
-        '    sys.argv[{}],'.format(idx + len(parameter_to_type_name) + 1)
-        for idx in range(len(extra_output_external_names))
-    )
+    #A function with a single output can return any value, including sequences
+    outputs_wrapping_code = '_outputs = [_outputs]' if len(return_type_structs) == 1 and not hasattr(return_ann, '_fields') else ''
 
     full_source = \
 '''\
@@ -168,6 +373,8 @@ def _func_to_component_spec(func, extra_code='', base_image=_default_base_image)
 
 {func_type_declarations_code}
 
+{helper_funcs_code}
+
 {func_code}
 
 import sys
@@ -177,24 +384,29 @@ _args = {{
 _output_files = [
 {output_files_parsing_code}
 ]
+_output_serializers = [
+{output_serializers_code}
+]
 
 _outputs = {func_name}(**_args)
 
-if not hasattr(_outputs, '__getitem__') or isinstance(_outputs, str):
-    _outputs = [_outputs]
+{outputs_wrapping_code}
 
-from pathlib import Path
+import os
 for idx, filename in enumerate(_output_files):
-    _output_path = Path(filename)
-    _output_path.parent.mkdir(parents=True, exist_ok=True)
-    _output_path.write_text(str(_outputs[idx]))
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    _output_serializers[idx](_outputs[idx], filename)
 '''.format(
         func_name=func_name,
         func_code=func_code,
         func_type_declarations_code=func_type_declarations_code,
         extra_code=extra_code,
+        helper_funcs_code=helper_funcs_code,
         input_args_parsing_code='\n'.join(input_args_parsing_code_lines),
         output_files_parsing_code='\n'.join(output_files_parsing_code_lines),
+        output_serializers_code='\n'.join(output_serializer_names),
+        outputs_wrapping_code=outputs_wrapping_code,
     )
 
     #Removing consecutive blank lines
@@ -293,6 +505,14 @@ def func_to_container_op(func, output_component_file=None, base_image=_default_b
             """Returns sum and product of two arguments"""
             return (a + b, a * b)
 
+    To pass data in files, annotate the parameters with InputPath or OutputPath. The function gets the file paths instead of the values:
+
+        def train(data_path: InputPath('CSV'), model_path: OutputPath('TFModel'), epochs: int = 10):
+            ...
+
+    Return values of the types with registered serializers (bytes, JSON, dict, list, NumPyArray, ApacheParquet and others added with register_serializer) are written to the output files with these serializers.
+    Inputs are only deserialized for the types registered with a deserializer. Other inputs are passed as strings, or as int, float or bool values.
+
     Args:
         func: The python function to convert
         base_image: Optional. Specify a custom Docker container image to use in the component. For lightweight components, the image needs to have python 3.5+. Default is tensorflow/tensorflow:1.11.0-py3
@@ -14,43 +14,55 @@
 import yaml
 from collections import OrderedDict
 
+#The libyaml based classes are many times faster, but libyaml is not always installed
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def _construct_ordered_mapping(loader, node):
+    loader.flatten_mapping(node)
+    return OrderedDict(loader.construct_pairs(node))
+
+
+def _make_ordered_loader(base_loader):
+    #See https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts/21912744#21912744
+    class OrderedLoader(base_loader):
+        pass
+    OrderedLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _construct_ordered_mapping)
+    return OrderedLoader
+
+
+def _represent_ordered_dict(dumper, data):
+    return dumper.represent_mapping(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, data.items())
+
+
+def _represent_str_or_text(dumper, data):
+    #Hack to force the code (multi-line string) to be output using the '|' style.
+    style = None
+    if data.find('\n') >= 0: #Multiple lines
+        style = '|'
+    return dumper.represent_scalar(u'tag:yaml.org,2002:str', data, style)
+
+
+def _make_ordered_dumper(base_dumper):
+    class OrderedDumper(base_dumper):
+        pass
+    OrderedDumper.add_representer(OrderedDict, _represent_ordered_dict)
+    OrderedDumper.add_representer(str, _represent_str_or_text)
+    #The safe dumpers cannot represent tuples. They are dumped as lists which load back everywhere, instead of the python specific tags.
+    OrderedDumper.add_representer(tuple, base_dumper.represent_list)
+    return OrderedDumper
+
+
+#The classes are created once, not on every call
+_OrderedLoader = _make_ordered_loader(_SafeLoader)
+_OrderedDumper = _make_ordered_dumper(_SafeDumper)
+
+
 def load_yaml(stream):
     #!!! Yaml should only be loaded using this function. Otherwise the dict ordering may be broken in Python versions prior to 3.6
-    #See https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts/21912744#21912744
+    return yaml.load(stream, _OrderedLoader)
 
-    def ordered_load(stream, Loader=yaml.Loader, object_pairs_hook=OrderedDict):
-        class OrderedLoader(Loader):
-            pass
-        def construct_mapping(loader, node):
-            loader.flatten_mapping(node)
-            return object_pairs_hook(loader.construct_pairs(node))
-        OrderedLoader.add_constructor(
-            yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-            construct_mapping)
-        return yaml.load(stream, OrderedLoader)
-    return ordered_load(stream)
 
 def dump_yaml(data):
-    #See https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts/21912744#21912744
-
-    def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
-        class OrderedDumper(Dumper):
-            pass
-        def _dict_representer(dumper, data):
-            return dumper.represent_mapping(
-                yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-                data.items())
-        OrderedDumper.add_representer(OrderedDict, _dict_representer)
-
-        #Hack to force the code (multi-line string) to be output using the '|' style.
-        def represent_str_or_text(self, data):
-            style = None
-            if data.find('\n') >= 0: #Multiple lines
-                #print('Switching style for multiline text:' + data)
-                style = '|'
-            return self.represent_scalar(u'tag:yaml.org,2002:str', data, style)
-    
-        OrderedDumper.add_representer(str, represent_str_or_text)   
-        
-        return yaml.dump(data, stream, OrderedDumper, **kwds)
-    return ordered_dump(data)
+    return yaml.dump(data, Dumper=_OrderedDumper)
@@ -23,9 +23,78 @@ from typing import Any, Callable, Dict, List, Mapping, MutableMapping, MutableSe
 
 T = TypeVar('T')
 
+_LIST_GENERIC_TYPES = [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence]
+_DICT_GENERIC_TYPES = [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict]
+
+
+def _memoize_by_type(compile_func):
+    '''Caches the functions compiled for every type. The types from the typing package are hashable.'''
+    cache = {}
+    def get_func(typ):
+        try:
+            return cache[typ]
+        except KeyError:
+            func = cache[typ] = compile_func(typ)
+            return func
+        except TypeError: #Unhashable type
+            return compile_func(typ)
+    return get_func
+
+
+def _can_use_isinstance(typ) -> bool:
+    try: #isinstance can fail for generics
+        isinstance(None, typ)
+        return True
+    except:
+        return False
+
+
+@_memoize_by_type
+def _get_type_checker(typ) -> Callable[[Any], bool]:
+    '''Compiles a function which returns whether an object is compatible with the type.
+    It has the same semantics as verify_object_against_type, without the exceptions and the error messages.
+    '''
+    if typ is type(None):
+        return lambda x: x is None
+
+    if typ is Any or type(typ) is TypeVar:
+        return lambda x: True
+
+    if not hasattr(typ, '__origin__'):
+        if _can_use_isinstance(typ):
+            return lambda x: isinstance(x, typ)
+        return lambda x: False
+
+    if typ.__origin__ is Union:
+        member_checkers = [_get_type_checker(possible_type) for possible_type in typ.__args__]
+        return lambda x: any(check(x) for check in member_checkers)
+
+    generic_type = typ.__origin__ or getattr(typ, '__extra__', None)
+    type_args = getattr(typ, '__args__', None) or (Any, Any) #Bare generics have no __args__ in Python >=3.9 and None in Python <3.7
+    if generic_type in _LIST_GENERIC_TYPES:
+        check_item = _get_type_checker(type_args[0])
+        check_generic = lambda x: x is not None and type(x) is not str and isinstance(x, generic_type) and all(check_item(item) for item in x)
+    elif generic_type in _DICT_GENERIC_TYPES:
+        check_key = _get_type_checker(type_args[0])
+        check_value = _get_type_checker(type_args[1])
+        check_generic = lambda x: x is not None and isinstance(x, generic_type) and all(check_key(k) and check_value(v) for k, v in x.items())
+    else:
+        check_generic = lambda x: False
+
+    if _can_use_isinstance(typ):
+        return lambda x: isinstance(x, typ) or check_generic(x)
+    return check_generic
+
 
 def verify_object_against_type(x: Any, typ: Type[T]) -> T:
     '''Verifies that the object is compatible to the specified type (types from the typing package can be used).'''
+    if _get_type_checker(typ)(x):
+        return x
+    #Incompatible object. Going through the types again to build the error message.
+    return _verify_object_against_type_with_errors(x, typ)
+
+
+def _verify_object_against_type_with_errors(x: Any, typ: Type[T]) -> T:
     #TODO: Merge with parse_object_from_struct_based_on_type which has almost the same code
     if typ is type(None):
         if x is None:
@@ -69,7 +138,7 @@ def verify_object_against_type(x: Any, typ: Type[T]) -> T:
         if generic_type in [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence] and type(x) is not str: #! str is also Sequence
             if not isinstance(x, generic_type):
                 raise TypeError('Error: Object "{}" is incompatible with type "{}"'.format(x, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
+            type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python >=3.9 (where bare generics have no __args__)
             inner_type = type_args[0]
             for item in x:
                 verify_object_against_type(item, inner_type)
@@ -78,7 +147,7 @@ def verify_object_against_type(x: Any, typ: Type[T]) -> T:
         elif generic_type in [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict]:
             if not isinstance(x, generic_type):
                 raise TypeError('Error: Object "{}" is incompatible with type "{}"'.format(x, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
+            type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python >=3.9 (where bare generics have no __args__)
             inner_key_type = type_args[0]
             inner_value_type = type_args[1]
             for k, v in x.items():
@@ -130,12 +199,14 @@ def parse_object_from_struct_based_on_type(struct: Any, typ: Type[T]) -> T:
             #Hack for Python <3.7 which for some reason "simplifies" Union[bool, int, ...] to just Union[int, ...]
             if int in possible_types:
                 possible_types = possible_types + [bool]
+            #Only the types which can match the structure (e.g. the classes which have all its keys) are tried
             for possible_type in possible_types:
+                if not _get_struct_filter(possible_type)(struct):
+                    continue
                 try:
                     obj = parse_object_from_struct_based_on_type(struct, possible_type)
                     results[possible_type] = obj
                 except Exception as ex:
-                    exception_map[possible_type] = ex
                     pass
 
             #Single successful parsing.
@@ -145,6 +216,13 @@ def parse_object_from_struct_based_on_type(struct: Any, typ: Type[T]) -> T:
             if len(results) > 1:
                 raise TypeError('Error: Structure "{}" is ambiguous. It can be parsed to multiple types: {}.'.format(struct, list(results.keys())))
 
+            #Incompatible structure. Trying all the types to report all the errors.
+            for possible_type in possible_types:
+                try:
+                    parse_object_from_struct_based_on_type(struct, possible_type)
+                except Exception as ex:
+                    exception_map[possible_type] = ex
+
             exception_lines = [str(e) for t, e in exception_map.items()]
             exception_lines.append('Error: Structure "{}" is incompatible with type "{}" - none of the types in Union are compatible.'.format(struct, typ))
             raise TypeError('\n'.join(exception_lines))
@@ -157,14 +235,14 @@ def parse_object_from_struct_based_on_type(struct: Any, typ: Type[T]) -> T:
         if generic_type in [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence] and type(struct) is not str: #! str is also Sequence
             if not isinstance(struct, generic_type):
                 raise TypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have list type.'.format(struct, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
+            type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python >=3.9 (where bare generics have no __args__)
             inner_type = type_args[0]
             return [parse_object_from_struct_based_on_type(item, inner_type) for item in struct]
 
         elif generic_type in [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict]: #in Python <3.7 there is a difference between abc.Mapping and typing.Mapping
             if not isinstance(struct, generic_type):
                 raise TypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have dict type.'.format(struct, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
+            type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python >=3.9 (where bare generics have no __args__)
             inner_key_type = type_args[0]
             inner_value_type = type_args[1]
             return {parse_object_from_struct_based_on_type(k, inner_key_type): parse_object_from_struct_based_on_type(v, inner_value_type) for k, v in struct.items()}
@@ -175,15 +253,93 @@ def parse_object_from_struct_based_on_type(struct: Any, typ: Type[T]) -> T:
     raise TypeError('Error: Structure "{}" is incompatible with type "{}". Structure is not the instance of the type, the type does not have .from_struct method and is not generic.'.format(struct, typ))
 
 
+@_memoize_by_type
+def _get_struct_filter(typ) -> Callable[[Any], bool]:
+    '''Compiles a function which quickly rules out the structures which parse_object_from_struct_based_on_type cannot parse to the type.
+    It is used to dispatch the Union members on the structure keys instead of trying to parse every member.
+    The function can return True for structures which cannot be parsed, but never returns False for the structures which can.
+    '''
+    if typ is type(None):
+        return lambda struct: struct is None
+
+    if typ is Any or type(typ) is TypeVar:
+        return lambda struct: True
+
+    if isinstance(typ, type) and issubclass(typ, ModelBase):
+        def check_keys(struct):
+            if type(struct) is typ:
+                return True
+            if not isinstance(struct, abc.Mapping):
+                return hasattr(struct, 'items')
+            schema = _get_class_schema(typ)
+            if schema.has_var_keyword:
+                return True
+            return all(key in schema.allowed_struct_keys for key in struct) and all(key in struct for key in schema.required_struct_keys)
+        return check_keys
+
+    if hasattr(typ, 'from_struct'):
+        return lambda struct: True
+
+    if hasattr(typ, '__origin__'):
+        if typ.__origin__ is Union:
+            return lambda struct: True
+        generic_type = typ.__origin__ or getattr(typ, '__extra__', None)
+        if generic_type in _LIST_GENERIC_TYPES:
+            return lambda struct: type(struct) is not str and _isinstance_or_true(struct, generic_type)
+        if generic_type in _DICT_GENERIC_TYPES:
+            return lambda struct: _isinstance_or_true(struct, generic_type)
+        return lambda struct: True
+
+    #Classes without .from_struct only accept their instances
+    return lambda struct: type(struct) is typ
+
+
+def _isinstance_or_true(x, typ) -> bool:
+    try:
+        return isinstance(x, typ)
+    except:
+        return True
+
+
+class _ClassSchema:
+    '''The fields of a ModelBase class, computed once from its __init__ signature and type hints.'''
+    def __init__(self, cls):
+        signature = inspect.signature(cls.__init__)
+        parameters = list(signature.parameters.values())[1:] #Skipping self
+        self.field_names = [parameter.name for parameter in parameters]
+        self.defaults = {parameter.name: parameter.default for parameter in parameters}
+        self.has_var_keyword = any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters)
+        self.parameter_types = get_type_hints(cls.__init__) #Properlty resolves forward references
+
+        serialized_names = cls._serialized_names
+        self.serialized_names = serialized_names
+        self.serialized_names_to_pythonic = {v: k for k, v in serialized_names.items()}
+        self.forbidden_struct_keys = set(self.serialized_names_to_pythonic.values()).difference(self.serialized_names_to_pythonic.keys())
+        self.allowed_struct_keys = set(serialized_names.get(name, name) for name in self.field_names)
+        self.required_struct_keys = [serialized_names.get(parameter.name, parameter.name) for parameter in parameters
+            if parameter.default is inspect.Parameter.empty and parameter.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)]
+
+
+_class_schemas = {}
+
+
+def _get_class_schema(cls) -> _ClassSchema:
+    #Every class has its own schema since the derived classes can change the _serialized_names
+    schema = _class_schemas.get(cls)
+    if schema is None:
+        schema = _class_schemas[cls] = _ClassSchema(cls)
+    return schema
+
+
 def convert_object_to_struct(obj, serialized_names: Mapping[str, str] = {}):
     '''Converts an object to structure (usually a dict).
     Serializes all properties that do not start with underscores.
     If the type of some property is a class that has .to_struct class method, that method is used for conversion.
     Used by the ModelBase class.
     '''
-    signature = inspect.signature(obj.__init__) #Needed for default values
+    schema = _get_class_schema(obj.__class__) #Needed for default values
     result = {}
-    for python_name in signature.parameters: #TODO: Make it possible to specify the field ordering regardless of the presence of default values
+    for python_name in schema.field_names: #TODO: Make it possible to specify the field ordering regardless of the presence of default values
         value = getattr(obj, python_name)
         if python_name.startswith('_'):
             continue
@@ -195,8 +351,8 @@ def convert_object_to_struct(obj, serialized_names: Mapping[str, str] = {}):
         elif isinstance(value, dict):
             result[attr_name] = {k: (v.to_struct() if hasattr(v, 'to_struct') else v) for k, v in value.items()}
         else:
-            param = signature.parameters.get(python_name, None)
-            if param is None or param.default == inspect.Parameter.empty or value != param.default:
+            default = schema.defaults[python_name]
+            if default is inspect.Parameter.empty or value != default:
                 result[attr_name] = value
 
     return result
@@ -211,11 +367,16 @@ def parse_object_from_struct_based_on_class_init(cls : Type[T], struct: Mapping,
 
     serialized_names: specifies the mapping between __init__ parameter names and the structure key names for cases where these names are different (due to language syntax clashes or style differences).
     '''
-    parameter_types = get_type_hints(cls.__init__) #Properlty resolves forward references
-
-    serialized_names_to_pythonic = {v: k for k, v in serialized_names.items()}
-    #If a pythonic name has a different original name, we forbid the pythonic name in the structure. Otherwise, this function would accept "python-styled" structures that should be invalid
-    forbidden_struct_keys = set(serialized_names_to_pythonic.values()).difference(serialized_names_to_pythonic.keys())
+    schema = _get_class_schema(cls)
+    parameter_types = schema.parameter_types
+
+    if serialized_names is schema.serialized_names:
+        serialized_names_to_pythonic = schema.serialized_names_to_pythonic
+        forbidden_struct_keys = schema.forbidden_struct_keys
+    else:
+        serialized_names_to_pythonic = {v: k for k, v in serialized_names.items()}
+        #If a pythonic name has a different original name, we forbid the pythonic name in the structure. Otherwise, this function would accept "python-styled" structures that should be invalid
+        forbidden_struct_keys = set(serialized_names_to_pythonic.values()).difference(serialized_names_to_pythonic.keys())
     args = {}
     for original_name, value in struct.items():
         if original_name in forbidden_struct_keys:
@@ -257,7 +418,7 @@ class ModelBase:
     '''
     _serialized_names = {}
     def __init__(self, args):
-        parameter_types = get_type_hints(self.__class__.__init__)
+        parameter_types = _get_class_schema(self.__class__).parameter_types
         field_values = {k: v for k, v in args.items() if k != 'self' and not k.startswith('_')}
         for k, v in field_values.items():
             parameter_type = parameter_types.get(k, None)
@@ -276,7 +437,7 @@ class ModelBase:
         return convert_object_to_struct(self, serialized_names=self._serialized_names)
     
     def _get_field_names(self):
-        return list(inspect.signature(self.__init__).parameters)
+        return _get_class_schema(self.__class__).field_names
 
     def __repr__(self):
         return self.__class__.__name__ + '(' + ', '.join(param + '=' + repr(getattr(self, param)) for param in self._get_field_names()) + ')'
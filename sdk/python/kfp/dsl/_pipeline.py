@@ -16,7 +16,7 @@
 from . import _container_op
 from ._metadata import  PipelineMeta, ParameterMeta, TypeMeta, _annotation_to_typemeta
 from . import _ops_group
-from ..components._naming import _make_name_unique_by_adding_index
+from ..components._naming import _UniqueNameRegistry
 import sys
 
 
@@ -69,6 +69,10 @@ class PipelineConf():
   """
   def __init__(self):
     self.image_pull_secrets = []
+    self.deduplicate_templates = False
+    self.size_budget = None
+    self.offload_literals_min_size = None
+    self.parallelism = None
 
   def set_image_pull_secrets(self, image_pull_secrets):
     """ configure the pipeline level imagepullsecret
@@ -80,6 +84,60 @@ class PipelineConf():
     """
     self.image_pull_secrets = image_pull_secrets
 
+  def set_deduplicate_templates(self, deduplicate_templates: bool):
+    """ configure whether structurally identical ops share one argo template
+
+    Ops which only differ in their names, immediate input values and literal arguments are
+    compiled into a single template. Each task passes its own values as arguments. This keeps
+    the workflow small for pipelines with large fan-outs.
+
+    Args:
+      deduplicate_templates: whether to deduplicate the op templates. Default: False.
+    """
+    self.deduplicate_templates = deduplicate_templates
+
+  def set_size_budget(self, size_budget: int):
+    """ configure the size budget of the compiled workflow
+
+    The compiler logs a warning with a breakdown of the workflow size by template, field and
+    inlined literal when the workflow is larger than the budget. The check serializes the
+    workflow once more, so it is off by default. Kubernetes objects are stored in etcd, which
+    limits the request size to 1.5MB by default, and the workflow status also grows while it
+    runs, so a budget of about 1MB leaves some headroom.
+
+    Args:
+      size_budget: the budget in bytes of the json serialized workflow. None disables the check.
+        Default: None.
+    """
+    self.size_budget = size_budget
+
+  def set_offload_large_literals(self, min_size: int = 1024):
+    """ configure emitting large repeated literals only once
+
+    Large strings which are repeated in the container commands or arguments of several ops,
+    such as the source code of lightweight python components, are moved to workflow level
+    parameters and referenced from the templates.
+
+    Note: the workflow parameters are shown as run parameters named inline-literal-<hash>,
+    next to the pipeline parameters, and they can be overridden when a run is created.
+    Overriding one replaces the literal in all the ops which reference it.
+
+    Args:
+      min_size: only strings of at least this many characters are moved. None disables it.
+    """
+    self.offload_literals_min_size = min_size
+
+  def set_parallelism(self, max_num_pods: int):
+    """ configure the maximum number of pods running at the same time in the pipeline
+
+    kfp.compiler.analyze_pipeline estimates the peak parallelism and resource needs of a
+    pipeline, which helps choosing the limit.
+
+    Args:
+      max_num_pods: the maximum number of pods. None means no limit.
+    """
+    self.parallelism = max_num_pods
+
 def get_pipeline_conf():
   """Configure the pipeline level setting to the current pipeline
     Note: call the function inside the user defined pipeline function.
@@ -132,6 +190,8 @@ class Pipeline():
     """
     self.name = name
     self.ops = {}
+    # Names of all the ops added to the pipeline.
+    self._op_names = _UniqueNameRegistry(' ')
     # Add the root group.
     self.groups = [_ops_group.OpsGroup('pipeline', name=name)]
     self.group_id = 0
@@ -159,7 +219,7 @@ class Pipeline():
     """
 
     #If there is an existing op with this name then generate a new name.
-    op_name = _make_name_unique_by_adding_index(op.human_name, list(self.ops.keys()), ' ')
+    op_name = self._op_names.make_unique(op.human_name)
 
     self.ops[op_name] = op
     if not define_only:
@@ -14,7 +14,7 @@
 
 
 import re
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from ._metadata import TypeMeta
 
 
@@ -34,6 +34,35 @@ def _match_serialized_pipelineparam(payload: str):
     match = re.findall(r'{{pipelineparam:op=([\w\s_-]*);name=([\w\s_-]+);value=(.*?)}}', payload)
   return match
 
+# Matches both the typed and the untyped serialization of PipelineParam.
+_SERIALIZED_PIPELINEPARAM_REGEX = re.compile(
+    r'{{pipelineparam:op=([\w\s_-]*);name=([\w\s_-]+);value=(.*?)(?:;type=(.*?);)?}}')
+
+# A serialized PipelineParam found in a string. All fields are strings; missing ones are ''.
+# pattern is the matched serialized string itself.
+SerializedPipelineParam = namedtuple('SerializedPipelineParam', 'op_name name value type pattern')
+
+def _split_serialized_pipelineparams(payload: str):
+  """_split_serialized_pipelineparams scans the payload once and splits it into literal
+  strings and serialized pipelineparams.
+
+  Args:
+    payload (str): a string that may contain serialized pipelineparams.
+
+  Returns:
+    List of segments. Each segment is either a literal str or a SerializedPipelineParam.
+  """
+  segments = []
+  position = 0
+  for match in _SERIALIZED_PIPELINEPARAM_REGEX.finditer(payload):
+    if match.start() > position:
+      segments.append(payload[position:match.start()])
+    segments.append(SerializedPipelineParam(*match.groups(default=''), pattern=match.group(0)))
+    position = match.end()
+  if position < len(payload):
+    segments.append(payload[position:])
+  return segments
+
 def _extract_pipelineparams(payloads: str or list[str]):
   """_extract_pipelineparam extract a list of PipelineParam instances from the payload string.
   Note: this function removes all duplicate matches.
@@ -45,15 +74,17 @@ def _extract_pipelineparams(payloads: str or list[str]):
   """
   if isinstance(payloads, str):
     payloads = [payloads]
-  matches = []
+  matches = OrderedDict()
   for payload in payloads:
-    matches += _match_serialized_pipelineparam(payload)
+    for segment in _split_serialized_pipelineparams(payload):
+      if isinstance(segment, SerializedPipelineParam):
+        matches[segment[:4]] = segment
   pipeline_params = []
-  for x in list(set(matches)):
-    if len(x) == 3 or (len(x) == 4 and x[3] == ''):
-      pipeline_params.append(PipelineParam(x[1], x[0], x[2]))
-    elif len(x) == 4:
-      pipeline_params.append(PipelineParam(x[1], x[0], x[2], TypeMeta.from_dict_or_str(x[3])))
+  for x in matches.values():
+    if x.type == '':
+      pipeline_params.append(PipelineParam(x.name, x.op_name, x.value))
+    else:
+      pipeline_params.append(PipelineParam(x.name, x.op_name, x.value, TypeMeta.from_dict_or_str(x.type)))
   return pipeline_params
 
 class PipelineParam(object):
@@ -73,6 +73,7 @@ setup(
     entry_points = {
       'console_scripts': [ 
         'dsl-compile = kfp.compiler.main:main',
+        'kfp-build-component-bundle = kfp.components._component_bundle:main',
       ]
     }
 )
@@ -0,0 +1,145 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+from kfp._artifacts import ArtifactDownloader, resolve_artifacts
+from kfp._fake_s3_server import FakeS3Server
+
+
+def _make_tgz(files):
+  data = io.BytesIO()
+  with tarfile.open(fileobj=data, mode='w:gz') as tar:
+    for name, content in files.items():
+      info = tarfile.TarInfo(name)
+      info.size = len(content)
+      tar.addfile(info, io.BytesIO(content))
+  return data.getvalue()
+
+
+def _node(name, artifacts):
+  return {
+    'name': 'workflow.' + name,
+    'displayName': name,
+    'outputs': {'artifacts': [
+      {'name': artifact_name, 's3': {
+        'endpoint': 'minio-service.kubeflow:9000',
+        'bucket': 'mlpipeline',
+        'key': 'artifacts/workflow/%s/%s.tgz' % (name, artifact_name),
+      }} for artifact_name in artifacts
+    ]},
+  }
+
+
+class TestArtifacts(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.workflow = {'status': {'nodes': {
+      'workflow': {'name': 'workflow', 'displayName': 'workflow'},
+      'workflow-1': _node('train', ['model', 'mlpipeline-ui-metadata']),
+      'workflow-2': _node('predict', ['predictions']),
+    }}}
+    self.contents = {
+      'model': _make_tgz({'model': os.urandom(100000)}),
+      'mlpipeline-ui-metadata': _make_tgz({'data': b'{}'}),
+      'predictions': _make_tgz({'data': b'1,2,3'}),
+    }
+
+  def tearDown(self):
+    shutil.rmtree(self.tmpdir)
+
+  def _put_objects(self, server, artifacts):
+    for artifact in artifacts:
+      server.put_object(artifact.bucket, artifact.key, self.contents[artifact.name])
+
+  def test_resolve_artifacts(self):
+    artifacts = resolve_artifacts(self.workflow)
+    self.assertEqual([('predict', 'predictions'), ('train', 'mlpipeline-ui-metadata'), ('train', 'model')],
+                     [(x.step_name, x.name) for x in artifacts])
+    self.assertEqual('workflow-1', artifacts[-1].node_id)
+    self.assertEqual('artifacts/workflow/train/model.tgz', artifacts[-1].key)
+    self.assertEqual([], resolve_artifacts({'status': {}}))
+
+  def test_download(self):
+    artifacts = resolve_artifacts(self.workflow)
+    with FakeS3Server() as server:
+      self._put_objects(server, artifacts)
+      downloader = ArtifactDownloader(endpoint=server.endpoint, part_size=30000)
+      paths = downloader.download(artifacts, self.tmpdir)
+      # The model is downloaded in parts, with range requests.
+      model_ranges = [x[2] for x in server.requests if x[0] == 'GET' and x[1].endswith('model.tgz')]
+    for artifact in artifacts:
+      with open(paths[artifact], 'rb') as f:
+        self.assertEqual(self.contents[artifact.name], f.read())
+    self.assertEqual(os.path.join(self.tmpdir, 'train', 'model.tgz'), paths[artifacts[-1]])
+    self.assertEqual(-(-len(self.contents['model']) // 30000), len(model_ranges))
+    self.assertIn('bytes=0-29999', model_ranges)
+
+  def test_download_untar(self):
+    artifacts = resolve_artifacts(self.workflow)
+    with FakeS3Server() as server:
+      self._put_objects(server, artifacts)
+      downloader = ArtifactDownloader(endpoint=server.endpoint, part_size=30000)
+      paths = downloader.download(artifacts, self.tmpdir, untar=True)
+    self.assertEqual(os.path.join(self.tmpdir, 'predict', 'predictions'), paths[artifacts[0]])
+    with open(os.path.join(paths[artifacts[0]], 'data'), 'rb') as f:
+      self.assertEqual(b'1,2,3', f.read())
+    with tarfile.open(fileobj=io.BytesIO(self.contents['model'])) as tar:
+      model = tar.extractfile('model').read()
+    with open(os.path.join(paths[artifacts[-1]], 'model'), 'rb') as f:
+      self.assertEqual(model, f.read())
+    # The temporary archives of the artifacts downloaded in parts are removed.
+    self.assertEqual(['predict', 'train'], sorted(os.listdir(self.tmpdir)))
+
+  def test_download_untar_rejects_members_outside_output_dir(self):
+    artifact = resolve_artifacts(self.workflow)[0]
+    output_dir = os.path.join(self.tmpdir, 'output')
+    for part_size in [30000, 10]:
+      with FakeS3Server() as server:
+        server.put_object(artifact.bucket, artifact.key, _make_tgz({'../../../evil': b'evil'}))
+        downloader = ArtifactDownloader(endpoint=server.endpoint, part_size=part_size)
+        with self.assertRaisesRegex(ValueError, 'outside'):
+          downloader.download([artifact], output_dir, untar=True)
+    self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'evil')))
+
+  def test_download_empty_artifact(self):
+    artifact = resolve_artifacts(self.workflow)[0]
+    with FakeS3Server() as server:
+      server.put_object(artifact.bucket, artifact.key, b'')
+      downloader = ArtifactDownloader(endpoint=server.endpoint)
+      untar_paths = downloader.download([artifact], os.path.join(self.tmpdir, 'untar'), untar=True)
+      paths = downloader.download([artifact], os.path.join(self.tmpdir, 'tgz'))
+    self.assertEqual([], os.listdir(untar_paths[artifact]))
+    self.assertEqual(0, os.path.getsize(paths[artifact]))
+
+  def test_read(self):
+    artifact = resolve_artifacts(self.workflow)[0]
+    with FakeS3Server() as server:
+      self._put_objects(server, [artifact])
+      downloader = ArtifactDownloader(endpoint=server.endpoint)
+      content = self.contents['predictions']
+      self.assertEqual(len(content), downloader.get_size(artifact))
+      self.assertEqual(content, downloader.read(artifact))
+      self.assertEqual(content[10:21], downloader.read(artifact, 10, 20))
+      self.assertEqual(content[10:], downloader.read(artifact, start=10))
+      with self.assertRaisesRegex(RuntimeError, '403'):
+        ArtifactDownloader(endpoint=server.endpoint, secret_key='wrong').read(artifact)
+      with self.assertRaisesRegex(RuntimeError, '404'):
+        downloader.read(artifact._replace(key='unknown'))
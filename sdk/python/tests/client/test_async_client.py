@@ -0,0 +1,116 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import kfp
+import kfp.compiler as compiler
+import kfp.dsl as dsl
+from kfp._async_client import ApiException
+from kfp._fake_api_server import FakeApiServer
+
+
+@dsl.pipeline(name='Echo', description='')
+def echo_pipeline(message='hello'):
+  dsl.ContainerOp(name='echo', image='library/bash', command=['echo', message])
+
+
+class TestAsyncClient(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.package_path = os.path.join(self.tmpdir, 'echo.tar.gz')
+    compiler.Compiler().compile(echo_pipeline, self.package_path)
+    self.loop = asyncio.new_event_loop()
+
+  def tearDown(self):
+    self.loop.close()
+    shutil.rmtree(self.tmpdir)
+
+  def test_experiments(self):
+    async def _test(client):
+      experiment = await client.create_experiment('my experiment')
+      self.assertEqual(experiment, await client.create_experiment('my experiment'))
+      self.assertEqual(experiment, await client.get_experiment(experiment_id=experiment['id']))
+      self.assertEqual(experiment, await client.get_experiment(experiment_name='my experiment'))
+      with self.assertRaises(ValueError):
+        await client.get_experiment(experiment_name='unknown')
+      with self.assertRaises(ApiException) as context:
+        await client.get_experiment(experiment_id='unknown')
+      self.assertEqual(404, context.exception.status)
+
+    with FakeApiServer() as server:
+      client = kfp.AsyncClient(server.host)
+      self.loop.run_until_complete(_test(client))
+      client.close()
+      self.assertEqual(1, len(server.experiments))
+
+  def test_get_experiment_without_list_filter_support(self):
+    async def _test(client):
+      self.assertEqual('id-120', (await client.get_experiment(experiment_name='experiment 120'))['id'])
+      self.assertFalse(client._supports_list_filter)
+      with self.assertRaises(ValueError):
+        await client.get_experiment(experiment_name='unknown')
+
+    with FakeApiServer(supports_list_filter=False) as server:
+      server.experiments.extend({'id': 'id-%d' % i, 'name': 'experiment %d' % i}
+                                for i in range(150))
+      client = kfp.AsyncClient(server.host)
+      self.loop.run_until_complete(_test(client))
+      client.close()
+      # The rejected filtered request, then two pages of 100 experiments for each lookup.
+      self.assertEqual(5, len([x for x in server.requests if x[1].endswith('/experiments')]))
+
+  def test_runs(self):
+    async def _test(client):
+      experiments = await asyncio.gather(client.create_experiment('a'),
+                                         client.create_experiment('b'))
+      runs = await asyncio.gather(*[
+          client.run_pipeline(experiments[i % 2]['id'], 'run-%d' % i, self.package_path,
+                              {'message': str(i)})
+          for i in range(25)])
+      self.assertEqual(25, len(set(run['id'] for run in runs)))
+
+      # Paginate the runs of both experiments concurrently.
+      async def _list_all_runs(experiment_id):
+        run_ids = []
+        next_page_token = ''
+        while True:
+          response = await client.list_runs(page_token=next_page_token, page_size=5,
+                                            experiment_id=experiment_id)
+          run_ids.extend(run['id'] for run in response['runs'])
+          next_page_token = response.get('next_page_token')
+          if not next_page_token:
+            return run_ids
+      run_ids = await asyncio.gather(*[_list_all_runs(x['id']) for x in experiments])
+      self.assertEqual([13, 12], [len(x) for x in run_ids])
+      self.assertEqual(set(run['id'] for run in runs), set(run_ids[0] + run_ids[1]))
+
+      run_detail = await client.wait_for_run_completion(runs[3]['id'], timeout=10,
+                                                        poll_interval=0.1)
+      self.assertEqual('Succeeded', run_detail['run']['status'])
+      self.assertEqual([{'name': 'message', 'value': '3'}],
+                       run_detail['run']['pipeline_spec']['parameters'])
+      workflow = json.loads(run_detail['pipeline_runtime']['workflow_manifest'])
+      self.assertEqual('echo', workflow['spec']['entrypoint'])
+
+    with FakeApiServer(run_duration=0.3) as server:
+      client = kfp.AsyncClient(server.host, max_connections=4)
+      self.loop.run_until_complete(_test(client))
+      client.close()
@@ -0,0 +1,306 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import kfp
+import kfp.compiler as compiler
+import kfp.dsl as dsl
+from kfp._fake_api_server import FakeApiServer
+
+try:
+  import kfp_run
+except ImportError:
+  # The API clients are generated by build.sh.
+  kfp_run = None
+
+
+@dsl.pipeline(name='Echo', description='')
+def echo_pipeline(message='hello'):
+  dsl.ContainerOp(name='echo', image='library/bash', command=['echo', message])
+
+
+def _wait_until(condition, timeout=10):
+  start_time = time.time()
+  while not condition():
+    if time.time() - start_time > timeout:
+      raise TimeoutError()
+    time.sleep(0.01)
+
+
+class _PagedList(object):
+  """List function which returns pages of numbers and records the page tokens.
+
+  The requests of the pages after the first one set requested, and are blocked until
+  unblocked is set.
+  """
+
+  def __init__(self, item_count):
+    self.item_count = item_count
+    self.page_tokens = []
+    self.returned_page_tokens = []
+    self.requested = threading.Event()
+    self.unblocked = threading.Event()
+
+  def __call__(self, page_token, page_size):
+    self.page_tokens.append(page_token)
+    if page_token:
+      self.requested.set()
+      self.unblocked.wait(10)
+    start = int(page_token or 0)
+    end = min(start + page_size, self.item_count)
+    self.returned_page_tokens.append(page_token)
+    return SimpleNamespace(items=list(range(start, end)),
+                           next_page_token=str(end) if end < self.item_count else '')
+
+
+@unittest.skipIf(kfp_run is None, 'requires the generated API clients')
+class TestClient(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.package_path = os.path.join(self.tmpdir, 'echo.tar.gz')
+    compiler.Compiler().compile(echo_pipeline, self.package_path)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmpdir)
+
+  def _count_requests(self, server, method, path):
+    return sum(1 for x in server.requests if x == (method, '/apis/v1beta1' + path))
+
+  def test_get_experiment_by_name_uses_cache(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('my experiment')
+      # create_experiment remembers the id of the new experiment.
+      self.assertEqual(1, self._count_requests(server, 'GET', '/experiments'))
+      self.assertEqual(experiment.id, client.get_experiment(experiment_name='my experiment').id)
+      self.assertEqual(1, self._count_requests(server, 'GET', '/experiments'))
+      self.assertEqual(1, self._count_requests(server, 'GET', '/experiments/' + experiment.id))
+
+      # Another client finds the experiment by listing them, and then uses its cache.
+      client = kfp.Client('http://' + server.host)
+      for _ in range(2):
+        self.assertEqual(experiment.id, client.get_experiment(experiment_name='my experiment').id)
+      self.assertEqual(2, self._count_requests(server, 'GET', '/experiments'))
+      with self.assertRaises(ValueError):
+        client.get_experiment(experiment_name='unknown')
+
+  def test_get_experiment_by_name_after_cached_experiment_is_deleted(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      old_experiment = client.create_experiment('my experiment')
+      del server.experiments[:]
+      new_experiment = kfp.Client('http://' + server.host).create_experiment('my experiment')
+
+      # The cached id is not found, so the experiment is looked up by name again.
+      experiment = client.get_experiment(experiment_name='my experiment')
+      self.assertEqual(new_experiment.id, experiment.id)
+      self.assertNotEqual(old_experiment.id, experiment.id)
+      self.assertEqual(1, self._count_requests(server, 'GET', '/experiments/' + old_experiment.id))
+      self.assertEqual(experiment.id, client.get_experiment(experiment_name='my experiment').id)
+      self.assertEqual(1, self._count_requests(server, 'GET', '/experiments/' + old_experiment.id))
+
+  def test_get_experiment_by_name_without_list_filter_support(self):
+    with FakeApiServer(supports_list_filter=False) as server:
+      server.experiments.extend({'id': 'id-%d' % i, 'name': 'experiment %d' % i}
+                                for i in range(150))
+      client = kfp.Client('http://' + server.host)
+      self.assertTrue(client._supports_list_filter)
+      self.assertEqual('id-120', client.get_experiment(experiment_name='experiment 120').id)
+      self.assertFalse(client._supports_list_filter)
+      # The rejected filtered request, then two pages of 100 experiments.
+      self.assertEqual(3, self._count_requests(server, 'GET', '/experiments'))
+
+      # The filter is not sent again.
+      with self.assertRaises(ValueError):
+        client.get_experiment(experiment_name='unknown')
+      self.assertEqual(5, self._count_requests(server, 'GET', '/experiments'))
+
+  def test_iter_experiments(self):
+    with FakeApiServer() as server:
+      server.experiments.extend({'id': 'id-%d' % i, 'name': 'experiment %d' % i}
+                                for i in range(25))
+      client = kfp.Client('http://' + server.host)
+      experiments = list(client.iter_experiments(page_size=10))
+      self.assertEqual(['id-%d' % i for i in range(25)], [x.id for x in experiments])
+      self.assertEqual(3, self._count_requests(server, 'GET', '/experiments'))
+
+      experiments = list(client.iter_experiments(page_size=10,
+                                                 stop_when=lambda x: x.id == 'id-12'))
+      self.assertEqual(['id-%d' % i for i in range(12)], [x.id for x in experiments])
+
+  def test_iter_pages_prefetches_one_page(self):
+    client = kfp.Client('http://localhost:1')
+    list_func = _PagedList(25)
+    items = client._iter_pages(list_func, 'items', 10, None)
+    self.assertEqual(0, next(items))
+    # The second page is requested while the first one is consumed, but not the third one.
+    self.assertTrue(list_func.requested.wait(10))
+    self.assertEqual(list(range(1, 10)), [next(items) for _ in range(9)])
+    self.assertEqual(['', '10'], list_func.page_tokens)
+    list_func.unblocked.set()
+    self.assertEqual(list(range(10, 25)), list(items))
+    self.assertEqual(['', '10', '20'], list_func.page_tokens)
+
+  def test_iter_pages_stop_when(self):
+    client = kfp.Client('http://localhost:1')
+    list_func = _PagedList(25)
+    # The iteration stops before the item, while the request of the second page is blocked.
+    items = client._iter_pages(list_func, 'items', 10,
+                               lambda x: x == 5 and list_func.requested.wait(10))
+    self.assertEqual(list(range(5)), list(items))
+    # The prefetched page was not waited for, and no other page is requested.
+    self.assertEqual([''], list_func.returned_page_tokens)
+    list_func.unblocked.set()
+    self.assertEqual(['', '10'], list_func.page_tokens)
+
+  def test_run_pipeline_batch(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('sweep')
+      runs = [('run-%d' % i, {'message': str(i)}) for i in range(5)] + [('', {})]
+      results = client.run_pipeline_batch(experiment.id, self.package_path, runs, max_workers=3)
+      # The runs are created without consuming the results.
+      _wait_until(lambda: self._count_requests(server, 'POST', '/runs') == 6)
+      results = list(results)
+
+    self.assertEqual(sorted(runs), sorted((x.job_name, x.params) for x in results))
+    for result in results:
+      if result.job_name:
+        self.assertIsNone(result.error)
+        self.assertEqual(result.job_name, result.run.name)
+        self.assertEqual([result.params['message']],
+                         [x.value for x in result.run.pipeline_spec.parameters])
+      else:
+        # The error of a run is returned instead of being raised.
+        self.assertIsNone(result.run)
+        self.assertEqual(400, result.error.status)
+
+  def test_run_pipeline_batch_rate_limit(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('sweep')
+      start_time = time.time()
+      results = list(client.run_pipeline_batch(
+          experiment.id, self.package_path, [('run-%d' % i, {}) for i in range(5)],
+          max_runs_per_second=20))
+      # The requests are spaced by 1/20 second, even with enough workers to send them at once.
+      self.assertGreaterEqual(time.time() - start_time, 0.2)
+      self.assertEqual([None] * 5, [x.error for x in results])
+
+  def test_run_pipeline_batch_requires_package_or_pipeline_id(self):
+    client = kfp.Client('http://localhost:1')
+    with self.assertRaises(ValueError):
+      client.run_pipeline_batch('experiment', None, [('run', {})])
+    with self.assertRaises(ValueError):
+      client.run_pipeline_batch('experiment', self.package_path, [('run', {})],
+                                pipeline_id='pipeline')
+
+  def test_wait_for_runs(self):
+    with FakeApiServer(run_duration=0.5) as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('sweep')
+      first_run = client.run_pipeline(experiment.id, 'first', self.package_path)
+      time.sleep(0.3)
+      second_run = client.run_pipeline(experiment.id, 'second', self.package_path)
+      run_ids = [second_run.id, first_run.id]
+
+      # The runs are generated in the order they complete, without getting their details.
+      runs = list(client.wait_for_runs(run_ids, timeout=10, initial_interval=0.05,
+                                       max_interval=0.1))
+      self.assertEqual([first_run.id, second_run.id], [x.id for x in runs])
+      self.assertEqual(['Succeeded'] * 2, [x.status for x in runs])
+      self.assertEqual(0, self._count_requests(server, 'GET', '/runs/' + first_run.id))
+
+      run_details = list(client.wait_for_runs(run_ids, timeout=10, experiment_id=experiment.id,
+                                              include_manifest=True))
+      self.assertEqual(sorted(run_ids), sorted(x.run.id for x in run_details))
+      self.assertIsNotNone(run_details[0].pipeline_runtime.workflow_manifest)
+
+  def test_wait_for_runs_backoff_and_timeout(self):
+    clock = [0]
+    sleeps = []
+    def _sleep(seconds):
+      sleeps.append(seconds)
+      clock[0] += seconds
+    fake_time = mock.Mock(time=lambda: clock[0], sleep=_sleep)
+    # Without jitter, every sleep is the whole polling interval.
+    fake_random = mock.Mock(uniform=lambda a, b: b)
+
+    with FakeApiServer(run_duration=1000) as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('sweep')
+      run = client.run_pipeline(experiment.id, 'run', self.package_path)
+      with mock.patch('kfp._client.time', fake_time), mock.patch('kfp._client.random', fake_random):
+        with self.assertRaisesRegex(TimeoutError, run.id):
+          list(client.wait_for_runs([run.id], timeout=19.5, initial_interval=1, max_interval=8))
+    # The interval doubles up to max_interval, and the last sleep ends at the timeout.
+    self.assertEqual([1, 2, 4, 8, 4.5], sleeps)
+
+  def test_upload_pipeline(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      pipeline = client.upload_pipeline(self.package_path)
+      self.assertTrue(pipeline.name.startswith('echo-'))
+      # The same workflow is uploaded once, even if the package is compiled again.
+      compiler.Compiler().compile(echo_pipeline, self.package_path)
+      self.assertEqual(pipeline.id, client.upload_pipeline(self.package_path).id)
+      self.assertEqual(1, self._count_requests(server, 'POST', '/pipelines/upload'))
+      self.assertEqual(1, self._count_requests(server, 'GET', '/pipelines'))
+      self.assertEqual(1, self._count_requests(server, 'GET', '/pipelines/' + pipeline.id))
+
+      # The same workflow with another name is another pipeline.
+      other_pipeline = client.upload_pipeline(self.package_path, name='other')
+      self.assertNotEqual(pipeline.id, other_pipeline.id)
+      self.assertEqual(2, len(server.pipelines))
+
+      # Another client finds the uploaded pipeline by its name.
+      self.assertEqual(pipeline.id, kfp.Client('http://' + server.host).upload_pipeline(
+          self.package_path).id)
+      self.assertEqual(2, self._count_requests(server, 'POST', '/pipelines/upload'))
+
+  def test_upload_pipeline_after_pipeline_is_deleted(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      pipeline = client.upload_pipeline(self.package_path)
+      del server.pipelines[:]
+      new_pipeline = client.upload_pipeline(self.package_path)
+      self.assertNotEqual(pipeline.id, new_pipeline.id)
+      self.assertEqual(pipeline.name, new_pipeline.name)
+      self.assertEqual([new_pipeline.id], [x['id'] for x in server.pipelines])
+
+  def test_run_pipeline_with_pipeline_id(self):
+    with FakeApiServer() as server:
+      client = kfp.Client('http://' + server.host)
+      experiment = client.create_experiment('experiment')
+      pipeline = client.upload_pipeline(self.package_path)
+      run = client.run_pipeline(experiment.id, 'run', pipeline_id=pipeline.id,
+                                params={'message': 'hi'})
+      self.assertEqual(pipeline.id, run.pipeline_spec.pipeline_id)
+      # The workflow is not sent with the run.
+      self.assertIsNone(server.runs[0]['pipeline_runtime']['workflow_manifest'])
+      with self.assertRaises(ValueError):
+        client.run_pipeline(experiment.id, 'run', self.package_path, pipeline_id=pipeline.id)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,56 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks'))
+import benchmark_utils
+
+
+class TestBenchmarkUtils(unittest.TestCase):
+
+  def test_compare_results(self):
+    """Test detecting regressions of several metrics against a baseline."""
+    baseline = {'results': [
+      {'benchmark': 'chain', 'stage': 'compile', 'wall_time_seconds': 1.0, 'peak_memory_bytes': 100},
+      {'benchmark': 'chain', 'stage': 'yaml_dump', 'wall_time_seconds': 1.0, 'peak_memory_bytes': 100},
+    ]}
+    current = {'results': [
+      {'benchmark': 'chain', 'stage': 'compile', 'wall_time_seconds': 1.1, 'peak_memory_bytes': 100},
+      {'benchmark': 'chain', 'stage': 'yaml_dump', 'wall_time_seconds': 1.0, 'peak_memory_bytes': 200},
+      {'benchmark': 'fan_out', 'stage': 'compile', 'wall_time_seconds': 5.0, 'peak_memory_bytes': 500},
+    ]}
+    regressions = benchmark_utils.compare_results(
+        baseline, current, 0.2, metrics=['wall_time_seconds', 'peak_memory_bytes'])
+    self.assertEqual(1, len(regressions))
+    self.assertIn('chain/yaml_dump: peak_memory_bytes', regressions[0])
+    # Only the wall time is compared by default.
+    self.assertEqual([], benchmark_utils.compare_results(baseline, current, 0.2))
+
+  def test_compare_results_without_stages_and_with_min_deltas(self):
+    """Test ignoring regressions which are below the noise threshold."""
+    baseline = {'results': [
+      {'benchmark': 'kfp', 'wall_time_seconds': 0.1},
+      {'benchmark': 'kfp.dsl', 'wall_time_seconds': 0.001},
+    ]}
+    current = {'results': [
+      {'benchmark': 'kfp', 'wall_time_seconds': 0.5},
+      {'benchmark': 'kfp.dsl', 'wall_time_seconds': 0.002},
+    ]}
+    regressions = benchmark_utils.compare_results(
+        baseline, current, 0.2, min_deltas={'wall_time_seconds': 0.01})
+    self.assertEqual(1, len(regressions))
+    self.assertIn('kfp: wall_time_seconds regressed', regressions[0])
@@ -0,0 +1,37 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks'))
+import compiler_benchmark
+
+
+class TestCompilerBenchmark(unittest.TestCase):
+
+  def test_run_benchmarks(self):
+    """Test running all the benchmarks on tiny pipelines."""
+    results = compiler_benchmark.run_benchmarks(scale=0.01, repeats=1)
+    benchmark_names = [x[0] for x in compiler_benchmark.BENCHMARKS]
+    self.assertEqual(len(benchmark_names) * 5, len(results['results']))
+    for result in results['results']:
+      self.assertIn(result['benchmark'], benchmark_names)
+      if result['stage'] == 'package_size':
+        self.assertGreater(result['workflow_size_bytes'], 0)
+      else:
+        self.assertIn(result['stage'], ['compile', 'yaml_dump', 'json_dump', 'write_package'])
+        self.assertGreater(result['wall_time_seconds'], 0)
+        self.assertGreater(result['peak_memory_bytes'], 0)
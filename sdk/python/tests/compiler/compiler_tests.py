@@ -14,6 +14,7 @@
 
 import kfp.compiler as compiler
 import kfp.dsl as dsl
+import json
 import os
 import shutil
 import subprocess
@@ -22,6 +23,7 @@ import tarfile
 import tempfile
 import unittest
 import yaml
+from unittest import mock
 
 from kfp.dsl._component import component
 from kfp.dsl import ContainerOp, pipeline
@@ -118,6 +120,25 @@ class TestCompiler(unittest.TestCase):
     self.maxDiff = None
     self.assertEqual(golden_output, compiler.Compiler()._op_to_template(op))
 
+  def test_process_args(self):
+    """Test replacing serialized pipeline params in the arguments."""
+    msg1 = dsl.PipelineParam('msg_1', op_name='Producer op')
+    msg2 = dsl.PipelineParam('msg2', value='a+b|c')
+    msg3 = dsl.PipelineParam('msg3')
+    arguments = ['--a', msg1, 'echo %s %s %s' % (msg1, msg2, msg1), 3]
+    # argument_inputs are sanitized by the compiler before the templates are created.
+    argument_inputs = [dsl.PipelineParam('msg-1', op_name='producer-op'), msg2]
+
+    processed_args = compiler.Compiler()._process_args(arguments, argument_inputs)
+    self.assertEqual([
+        '--a',
+        '{{inputs.parameters.producer-op-msg-1}}',
+        'echo {{inputs.parameters.producer-op-msg-1}} {{inputs.parameters.msg2}} {{inputs.parameters.producer-op-msg-1}}',
+        '3',
+      ], processed_args)
+    # Params which are not inputs of the op are left intact.
+    self.assertEqual(['x' + str(msg3)], compiler.Compiler()._process_args(['x' + str(msg3)], argument_inputs))
+
   def _get_yaml_from_tar(self, tar_file):
     with tarfile.open(tar_file, 'r:gz') as tar:
       return yaml.load(tar.extractfile(tar.getmembers()[0]))
@@ -144,6 +165,38 @@ class TestCompiler(unittest.TestCase):
       shutil.rmtree(tmpdir)
       # print(tmpdir)
 
+  def test_basic_workflow_json_format(self):
+    """Test compiling a basic workflow into a package with json workflow."""
+
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    sys.path.append(test_data_dir)
+    import basic
+    tmpdir = tempfile.mkdtemp()
+    package_path = os.path.join(tmpdir, 'workflow.tar.gz')
+    try:
+      compiler.Compiler().compile(basic.save_most_frequent_word, package_path, output_format='json')
+      with open(os.path.join(test_data_dir, 'basic.yaml'), 'r') as f:
+        golden = yaml.load(f)
+      with tarfile.open(package_path, 'r:gz') as tar:
+        self.assertEqual(['pipeline.yaml'], tar.getnames())
+        compiled = json.loads(tar.extractfile('pipeline.yaml').read().decode('utf-8'))
+
+      self.maxDiff = None
+      self.assertEqual(golden, compiled)
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_dump_workflow(self):
+    """Test serializing workflows with shared and ordered values."""
+    from collections import OrderedDict
+    shared = {'key': 'value'}
+    workflow = {'a': shared, 'b': shared, 'c': OrderedDict([('y', 1), ('x', 2)])}
+    yaml_text = compiler.Compiler()._dump_workflow(workflow)
+    self.assertNotIn('&', yaml_text)
+    self.assertEqual({'a': shared, 'b': shared, 'c': {'x': 2, 'y': 1}}, yaml.safe_load(yaml_text))
+    with self.assertRaises(ValueError):
+      compiler.Compiler()._dump_workflow(workflow, output_format='xml')
+
   def test_composing_workflow(self):
     """Test compiling a simple workflow, and a bigger one composed from the simple one."""
 
@@ -241,6 +294,31 @@ class TestCompiler(unittest.TestCase):
     """Test pipeline imagepullsecret."""
     self._test_py_compile('imagepullsecret')
 
+  def test_py_compile_output_dir(self):
+    """Test compiling multiple py files in parallel into a directory."""
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    tmpdir = tempfile.mkdtemp()
+    try:
+      command = ['dsl-compile', '--py', os.path.join(test_data_dir, 'basic.py'),
+                 '--py', os.path.join(test_data_dir, 'coin.py'),
+                 '--output-dir', tmpdir, '--workers', '2']
+      output = subprocess.check_output(command).decode()
+      self.assertEqual(2, output.count('compiled'))
+      self.maxDiff = None
+      for file_base_name in ['basic', 'coin']:
+        with open(os.path.join(test_data_dir, file_base_name + '.yaml'), 'r') as f:
+          golden = yaml.load(f)
+        compiled = self._get_yaml_from_tar(os.path.join(tmpdir, file_base_name + '.tar.gz'))
+        self.assertEqual(golden, compiled)
+
+      # Unchanged files are not compiled again.
+      output = subprocess.check_output(command).decode()
+      self.assertEqual(2, output.count('unchanged'))
+      output = subprocess.check_output(command + ['--force']).decode()
+      self.assertEqual(2, output.count('compiled'))
+    finally:
+      shutil.rmtree(tmpdir)
+
   def test_type_checking_with_consistent_types(self):
     """Test type check pipeline parameters against component metadata."""
     @component
@@ -316,3 +394,282 @@ class TestCompiler(unittest.TestCase):
       task2 = op().after(task1)
     
     compiler.Compiler()._compile(pipeline)
+
+  def test_deduplicate_templates(self):
+    """Test structurally identical ops sharing one template."""
+    @dsl.pipeline(name='Fan out', description='')
+    def fan_out_pipeline():
+      dsl.get_pipeline_conf().set_deduplicate_templates(True)
+      producer = dsl.ContainerOp(name='producer', image='image', file_outputs={'data': '/data.txt'})
+      trainers = []
+      for i in range(3):
+        trainers.append(dsl.ContainerOp(
+            name='train', image='image',
+            arguments=['--seed', str(i), '--data', producer.output, '--verbose'],
+            file_outputs={'model': '/model.txt'}))
+      dsl.ContainerOp(name='evaluate', image='image', arguments=[trainers[1].output])
+
+    workflow = compiler.Compiler()._compile(fan_out_pipeline)
+    templates = {t['name']: t for t in workflow['spec']['templates']}
+    self.assertEqual(['evaluate', 'fan-out', 'producer', 'train'], sorted(templates))
+    self.assertEqual(['--seed', '{{inputs.parameters.argument-1}}', '--data',
+                      '{{inputs.parameters.producer-data}}', '--verbose'],
+                     templates['train']['container']['args'])
+    self.assertEqual([{'name': 'argument-1'}, {'name': 'producer-data'}],
+                     templates['train']['inputs']['parameters'])
+
+    tasks = {t['name']: t for t in templates['fan-out']['dag']['tasks']}
+    for i, task_name in enumerate(['train', 'train-2', 'train-3']):
+      self.assertEqual('train', tasks[task_name]['template'])
+      self.assertEqual([
+          {'name': 'argument-1', 'value': str(i)},
+          {'name': 'producer-data', 'value': '{{tasks.producer.outputs.parameters.producer-data}}'},
+        ], tasks[task_name]['arguments']['parameters'])
+    self.assertEqual([{'name': 'train-2-model', 'value': '{{tasks.train-2.outputs.parameters.train-model}}'}],
+                     tasks['evaluate']['arguments']['parameters'])
+
+  def _large_command_pipeline(self, offload_min_size=None, size_budget=None):
+    source = 'print("' + 'x' * 2000 + '")'
+    @dsl.pipeline(name='Large literals', description='')
+    def large_literals_pipeline():
+      dsl.get_pipeline_conf().set_offload_large_literals(offload_min_size)
+      dsl.get_pipeline_conf().set_size_budget(size_budget)
+      for i in range(3):
+        dsl.ContainerOp(name='python', image='python:3.5', command=['python3', '-c', source],
+                        arguments=[str(i)])
+      dsl.ContainerOp(name='unique', image='python:3.5', command=['python3', '-c', source + ' '])
+    return large_literals_pipeline, source
+
+  def test_workflow_size_report(self):
+    """Test breaking down the workflow size."""
+    pipeline_func, source = self._large_command_pipeline()
+    workflow = compiler.Compiler()._compile(pipeline_func)
+    report = compiler.analyze_workflow_size(workflow)
+
+    self.assertEqual(len(json.dumps(workflow, separators=(',', ':'))), report.total_size)
+    self.assertEqual(5, len(report.template_sizes))
+    self.assertEqual('container.command', list(report.field_sizes.keys())[0])
+    self.assertEqual(2, len(report.large_literals))
+    self.assertEqual(source, report.large_literals[0].value)
+    self.assertEqual(3, len(report.large_literals[0].locations))
+    self.assertIn('templates[python].container.command[2]', report.large_literals[0].locations)
+    self.assertIn('Largest inlined literals:', str(report))
+
+  def test_workflow_size_budget(self):
+    """Test warning about workflows larger than the budget."""
+    pipeline_func, _ = self._large_command_pipeline(size_budget=1000)
+    with self.assertLogs(level='WARNING') as logs:
+      compiler.Compiler()._compile(pipeline_func)
+    self.assertIn('exceeds the budget of 1000 bytes', logs.output[0])
+
+  def test_offload_large_literals(self):
+    """Test emitting repeated large literals once."""
+    pipeline_func, source = self._large_command_pipeline(offload_min_size=1024)
+    workflow = compiler.Compiler()._compile(pipeline_func)
+
+    parameters = workflow['spec']['arguments']['parameters']
+    self.assertEqual(1, len(parameters))
+    self.assertEqual(source, parameters[0]['value'])
+    reference = '{{workflow.parameters.%s}}' % parameters[0]['name']
+    templates = {t['name']: t for t in workflow['spec']['templates']}
+    for name in ['python', 'python-2', 'python-3']:
+      self.assertEqual(['python3', '-c', reference], templates[name]['container']['command'])
+    # Literals used only once stay inline.
+    self.assertEqual(source + ' ', templates['unique']['container']['command'][2])
+
+  def _template_cache_pipeline(self, last_image):
+    from kubernetes import client as k8s_client
+
+    @dsl.pipeline(name='Template cache', description='')
+    def pipeline(message='message'):
+      env_var = k8s_client.V1EnvVar(name='ENV', value='value')
+      op = ContainerOp(name='producer', image='library/bash', command=['echo', message],
+                       file_outputs={'out': '/tmp/out.txt'})
+      for i in range(10):
+        op = ContainerOp(name='consumer', image='library/bash', command=['echo', op.output],
+                         file_outputs={'out': '/tmp/out.txt'}).add_env_variable(env_var)
+      ContainerOp(name='last', image=last_image, command=['echo', op.output])
+    return pipeline
+
+  def test_template_cache(self):
+    """Test reusing the templates of unchanged ops."""
+    expected_workflow = compiler.Compiler()._compile(self._template_cache_pipeline('library/bash'))
+    cache = compiler.InMemoryTemplateCache()
+    workflow = compiler.Compiler(template_cache=cache)._compile(
+        self._template_cache_pipeline('library/bash'))
+    self.assertEqual(expected_workflow, workflow)
+    self.assertEqual((0, 12), (cache.hits, cache.misses))
+
+    # The cached templates are copies, so the compiled workflow can be modified.
+    workflow['spec']['templates'][0]['name'] = 'modified'
+    workflow = compiler.Compiler(template_cache=cache)._compile(
+        self._template_cache_pipeline('library/bash'))
+    self.assertEqual(expected_workflow, workflow)
+    self.assertEqual((12, 12), (cache.hits, cache.misses))
+
+    workflow = compiler.Compiler(template_cache=cache)._compile(
+        self._template_cache_pipeline('library/python'))
+    self.assertEqual((23, 13), (cache.hits, cache.misses))
+    templates = {t['name']: t for t in workflow['spec']['templates']}
+    self.assertEqual('library/python', templates['last']['container']['image'])
+
+    # The least recently used templates are evicted.
+    cache = compiler.InMemoryTemplateCache(max_size=cache.size // 2)
+    compiler.Compiler(template_cache=cache)._compile(self._template_cache_pipeline('library/bash'))
+    self.assertLessEqual(cache.size, cache.max_size)
+    self.assertLess(len(cache), 12)
+
+  def test_template_cache_key_includes_param_types(self):
+    """Test that ops with inputs of different types have different template cache keys."""
+    from kfp.compiler._template_cache import _OpHasher
+    from kfp.dsl._metadata import TypeMeta
+
+    def _make_op(type_name):
+      with dsl.Pipeline('pipeline'):
+        param = dsl.PipelineParam('message', param_type=TypeMeta('String'))
+        op = ContainerOp(name='echo', image='library/bash', command=['echo', param])
+      # Only the type of the input differs, not its placeholder in the command.
+      op.inputs[0].param_type = TypeMeta(type_name)
+      return op
+
+    hasher = _OpHasher()
+    self.assertEqual(hasher.hash_op(_make_op('String')), hasher.hash_op(_make_op('String')))
+    self.assertNotEqual(hasher.hash_op(_make_op('String')), hasher.hash_op(_make_op('Integer')))
+
+  def test_disk_template_cache(self):
+    """Test reusing the templates from a cache directory."""
+    expected_workflow = compiler.Compiler()._compile(self._template_cache_pipeline('library/bash'))
+    tmpdir = tempfile.mkdtemp()
+    try:
+      cache = compiler.DiskTemplateCache(tmpdir)
+      compiler.Compiler(template_cache=cache)._compile(self._template_cache_pipeline('library/bash'))
+      self.assertEqual(12, len(cache))
+
+      cache = compiler.DiskTemplateCache(tmpdir)
+      workflow = compiler.Compiler(template_cache=cache)._compile(
+          self._template_cache_pipeline('library/bash'))
+      self.assertEqual(expected_workflow, workflow)
+      self.assertEqual((12, 0), (cache.hits, cache.misses))
+
+      cache = compiler.DiskTemplateCache(tmpdir, max_size=cache.size // 2)
+      self.assertEqual(12, len(cache))
+      compiler.Compiler(template_cache=cache)._compile(self._template_cache_pipeline('library/python'))
+      self.assertLessEqual(cache.size, cache.max_size)
+      self.assertEqual(len(cache), len(os.listdir(tmpdir)))
+      self.assertEqual(sum(os.path.getsize(os.path.join(tmpdir, x)) for x in os.listdir(tmpdir)),
+                       cache.size)
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_analyze_pipeline(self):
+    """Test the critical path and parallelism analysis."""
+    @dsl.pipeline(name='Analysis', description='')
+    def analysis_pipeline(flag='on'):
+      exit_op = ContainerOp(name='cleanup', image='image')
+      with dsl.ExitHandler(exit_op):
+        producer = ContainerOp(name='producer', image='image').set_cpu_request('1')
+        train = ContainerOp(name='train', image='image').after(producer)
+        train.set_cpu_request('500m').set_memory_request('2Gi')
+        with dsl.Condition(flag == 'on'):
+          evaluate = ContainerOp(name='evaluate', image='image').after(producer)
+          evaluate.set_cpu_request('2').set_memory_request('1Gi')
+        ContainerOp(name='deploy', image='image').after(train).after(evaluate)
+      dsl.get_pipeline_conf().set_parallelism(2)
+
+    workflow = compiler.Compiler()._compile(analysis_pipeline)
+    self.assertEqual(2, workflow['spec']['parallelism'])
+
+    analysis = compiler.analyze_pipeline(analysis_pipeline)
+    self.assertEqual({
+        'producer': [], 'train': ['producer'], 'evaluate': ['producer'],
+        'deploy': ['evaluate', 'train'], 'cleanup': ['deploy']}, dict(analysis.dependencies))
+    self.assertEqual([1, 2, 1, 1], analysis.level_widths)
+    self.assertEqual(2, analysis.max_width)
+    self.assertEqual(4, analysis.makespan)
+    self.assertEqual(2, analysis.peak_parallelism)
+    self.assertEqual(2.5, analysis.peak_cpu)
+    self.assertEqual(3 * 2 ** 30, analysis.peak_memory)
+
+    analysis = compiler.analyze_pipeline(
+        workflow,
+        durations={'producer': 10, 'train': 100, 'evaluate': 20, 'deploy': 5, 'cleanup': 1},
+        resources={'evaluate': {'memory': '4Gi'}})
+    self.assertEqual(['producer', 'train', 'deploy', 'cleanup'], analysis.critical_path)
+    self.assertEqual(116, analysis.makespan)
+    self.assertEqual(110, analysis.start_times['deploy'])
+    self.assertEqual(6 * 2 ** 30, analysis.peak_memory)
+
+    # Ops without durations take the mean duration.
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    analysis = compiler.analyze_pipeline(os.path.join(test_data_dir, 'coin.yaml'),
+                                         durations={'flip': 10, 'flip-again': 20, 'print1': 3})
+    self.assertEqual(['flip', 'flip-again', 'print1', 'print2'], analysis.critical_path)
+    self.assertEqual(11, analysis.durations['print2'])
+    self.assertEqual(44, analysis.makespan)
+
+  def test_group_tree_uncommon_ancestors(self):
+    """Test the group tree index used by the compiler passes."""
+    from kfp.compiler._group_tree import GroupTree
+
+    with dsl.Pipeline('somename') as p:
+      flag = dsl.PipelineParam('flag')
+      with dsl.Condition(flag == 'a') as g1:
+        with dsl.Condition(flag == 'b') as g2:
+          op1 = dsl.ContainerOp(name='op1', image='image')
+        with dsl.Condition(flag == 'c') as g3:
+          op2 = dsl.ContainerOp(name='op2', image='image')
+      op3 = dsl.ContainerOp(name='op3', image='image')
+
+    group_tree = GroupTree(p.groups[0])
+    self.assertEqual(['somename', g1.name, g2.name, g3.name],
+                     [g.name for g in group_tree.groups])
+    self.assertEqual(('somename', g1.name, g3.name, 'op2'), group_tree.ancestors['op2'])
+    self.assertEqual(3, group_tree.depths['op1'])
+    self.assertEqual(((g2.name, 'op1'), (g3.name, 'op2')),
+                     group_tree.get_uncommon_ancestors('op1', 'op2'))
+    self.assertEqual(((g1.name, g2.name, 'op1'), ('op3',)),
+                     group_tree.get_uncommon_ancestors('op1', 'op3'))
+    self.assertEqual(2, len(group_tree.get_condition_params('op1')))
+    self.assertEqual(0, len(group_tree.get_condition_params('op3')))
+
+  def _build_nested_pipeline(self, num_ops, width=100):
+    """Builds a chain of nested conditions, each one holding a fan-out of ops."""
+    with dsl.Pipeline('somename') as p:
+      flag = dsl.PipelineParam('flag')
+      upstream_op = None
+      for i in range(num_ops // width):
+        with dsl.Condition(flag == 'a'):
+          with dsl.Condition(flag == 'b'):
+            for j in range(width):
+              op = dsl.ContainerOp(
+                  name='op-%d-%d' % (i, j), image='image',
+                  arguments=[upstream_op.output] if upstream_op else [],
+                  file_outputs={'out': '/out.txt'})
+            upstream_op = op
+    return p
+
+  def _count_common_ancestor_walks(self, pipeline):
+    """Creates the templates and returns how many times the group tree was walked up."""
+    from kfp.compiler._group_tree import GroupTree
+    group_trees = []
+
+    class _RecordingGroupTree(GroupTree):
+      def __init__(self, root_group):
+        super(_RecordingGroupTree, self).__init__(root_group)
+        group_trees.append(self)
+
+    with mock.patch('kfp.compiler.compiler.GroupTree', _RecordingGroupTree):
+      compiler.Compiler()._create_templates(pipeline)
+    # The tree is indexed once and shared by all the passes.
+    self.assertEqual(1, len(group_trees))
+    # Every walk to the lowest common ancestor of two groups is memoized.
+    return len(group_trees[0]._common_depths)
+
+  def test_group_passes_walk_tree_per_group_pair(self):
+    """Test that the group passes walk the group tree per pair of groups, not per pair of ops."""
+    # Both pipelines have 100 levels of nested conditions, with 5 and 50 ops in each level.
+    few_ops_walks = self._count_common_ancestor_walks(self._build_nested_pipeline(500, width=5))
+    many_ops_walks = self._count_common_ancestor_walks(self._build_nested_pipeline(5000, width=50))
+    self.assertEqual(few_ops_walks, many_ops_walks)
+    # One dependency between the conditions of each pair of consecutive levels.
+    self.assertEqual(99, many_ops_walks)
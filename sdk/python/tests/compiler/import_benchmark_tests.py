@@ -0,0 +1,54 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks'))
+import import_benchmark
+
+
+class TestImportBenchmark(unittest.TestCase):
+
+  def test_run_benchmarks(self):
+    """Test that no heavy dependency is imported eagerly."""
+    results = import_benchmark.run_benchmarks(repeats=1)
+    self.assertEqual(len(import_benchmark.BENCHMARKS), len(results['results']))
+    for result in results['results']:
+      self.assertGreater(result['wall_time_seconds'], 0)
+      self.assertEqual([], result['eagerly_imported_modules'], result['benchmark'])
+    self.assertEqual([], import_benchmark.check_results(results))
+
+  def test_lazy_attributes(self):
+    """Test that the lazily imported attributes are the same as the eager ones."""
+    import kfp
+    import kfp.compiler
+    import kfp.components
+    from kfp.compiler.compiler import Compiler
+    from kfp.components._component_store import ComponentStore
+    self.assertIs(Compiler, kfp.compiler.Compiler)
+    self.assertIs(ComponentStore, kfp.components.ComponentStore)
+    self.assertIs(kfp.compiler, kfp.__dict__['compiler'])
+    self.assertIn('Client', dir(kfp))
+    with self.assertRaises(AttributeError):
+      kfp.compiler.NoSuchCompiler
+
+  def test_check_results(self):
+    """Test detecting eager imports, whatever the import times."""
+    results = {'results': [
+      {'benchmark': 'kfp', 'wall_time_seconds': 0.002, 'eagerly_imported_modules': ['kubernetes']},
+      {'benchmark': 'kfp.dsl', 'wall_time_seconds': 5, 'eagerly_imported_modules': []},
+    ]}
+    self.assertEqual(['kfp: eagerly imports kubernetes'], import_benchmark.check_results(results))
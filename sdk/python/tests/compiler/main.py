@@ -16,15 +16,21 @@
 import sys
 import unittest
 
+import benchmark_utils_tests
 import compiler_tests
+import compiler_benchmark_tests
 import component_builder_test
+import import_benchmark_tests
 import k8s_helper_tests
 
 
 if __name__ == '__main__':
   suite = unittest.TestSuite()
+  suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(benchmark_utils_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(compiler_tests))
+  suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(compiler_benchmark_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(component_builder_test))
+  suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(import_benchmark_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(k8s_helper_tests))
   runner = unittest.TextTestRunner()
   if not runner.run(suite).wasSuccessful():
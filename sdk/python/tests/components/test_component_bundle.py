@@ -0,0 +1,85 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, __file__ + '/../../../')
+
+from kfp.components import ComponentBundle, ComponentStore, build_component_bundle
+
+
+class ComponentBundleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.components_dir = self.temp_dir.joinpath('components')
+        self.bundle_path = str(self.temp_dir.joinpath('components.bundle'))
+        component_path = Path(__file__).parent.joinpath('test_data', 'python_add.component.yaml')
+        self.component = component_path.read_bytes()
+        self.component_v2 = self.component.replace(b'name: Add', b'name: Add v2')
+        self.digest = hashlib.sha256(self.component).hexdigest()
+        files = {
+            'math/add/component.yaml': self.component_v2,
+            'math/add/versions/sha256/' + self.digest: self.component,
+            'math/add/versions/tags/v1': self.component,
+            'other/component.yaml': self.component,
+            'broken/component.yaml': b'name: Broken\nimplementation: 42\n',
+            'README.md': b'Not a component',
+        }
+        for path, content in files.items():
+            file_path = self.components_dir.joinpath(path)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(content)
+
+    def tearDown(self):
+        shutil.rmtree(str(self.temp_dir))
+
+    def test_build_and_load_bundle(self):
+        names = build_component_bundle(str(self.components_dir), self.bundle_path)
+        self.assertEqual(names, ['math/add', 'other'])
+        with ComponentBundle(self.bundle_path) as bundle:
+            self.assertEqual(len(bundle), 2)
+            self.assertIn('math/add', bundle)
+            self.assertNotIn('broken', bundle)
+            self.assertEqual(bundle.get_component_spec('math/add').name, 'Add v2')
+            self.assertEqual(bundle.get_component_spec('math/add', tag='v1').name, 'Add')
+            self.assertEqual(bundle.load_component('math/add', digest=self.digest)(1, 2).human_name, 'Add')
+            self.assertEqual(bundle.load_component('other')(1, 2).arguments[:2], ['1', '2'])
+            self.assertIsNone(bundle.find_digest('math/add', tag='v2'))
+            with self.assertRaises(KeyError):
+                bundle.load_component('math/subtract')
+
+    def test_load_bundle_with_component_store(self):
+        build_component_bundle(str(self.components_dir), self.bundle_path)
+        store = ComponentStore(local_search_paths=[str(self.temp_dir)], bundle_paths=[self.bundle_path])
+        self.assertEqual(store.load_component('math/add')(1, 2).human_name, 'Add v2')
+        self.assertEqual(store.load_component('math/add', digest=self.digest)(1, 2).human_name, 'Add')
+        add_op, other_op = store.load_components(['math/add', 'other'])
+        self.assertEqual([add_op(1, 2).human_name, other_op(1, 2).human_name], ['Add v2', 'Add'])
+        with self.assertRaisesRegex(RuntimeError, 'components.bundle:broken/component.yaml'):
+            store.load_component('broken')
+
+    def test_open_invalid_bundle(self):
+        invalid_bundle_path = self.temp_dir.joinpath('invalid.bundle')
+        invalid_bundle_path.write_bytes(self.component)
+        with self.assertRaises(ValueError):
+            ComponentBundle(str(invalid_bundle_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+
+sys.path.insert(0, __file__ + '/../../../')
+
+from kfp.components import ComponentCache, ComponentStore
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ComponentServer:
+    '''Serves files from a dict of path to content, with ETag validation.'''
+    def __init__(self, files, delay=0):
+        self.files = files
+        self.requests = []
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(delay)
+                content = server.files.get(self.path)
+                etag = '"{}"'.format(hashlib.md5(content).hexdigest()) if content is not None else None
+                if content is None:
+                    status, content = 404, b''
+                elif self.headers.get('If-None-Match') == etag:
+                    status, content = 304, b''
+                else:
+                    status = 200
+                server.requests.append((self.path, status))
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        self._server = _ThreadingHTTPServer(('localhost', 0), _Handler)
+        self.url = 'http://localhost:{}/'.format(self._server.server_address[1])
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class ComponentStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        component_path = Path(__file__).parent.joinpath('test_data', 'python_add.component.yaml')
+        self.component = component_path.read_bytes()
+        self.digest = hashlib.sha256(self.component).hexdigest()
+        self.files = {
+            '/add/component.yaml': self.component,
+            '/add/versions/sha256/' + self.digest: self.component,
+            '/add/versions/tags/v1': self.component,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_load_component_without_cache(self):
+        with _ComponentServer(self.files) as server:
+            store = ComponentStore(local_search_paths=[self.cache_dir], url_search_prefixes=[server.url])
+            self.assertEqual(store.load_component('add')(1, 2).human_name, 'Add')
+            self.assertEqual(store.load_component_from_url(server.url + 'add/versions/tags/v1')(1, 2).human_name, 'Add')
+            with self.assertRaises(RuntimeError):
+                store.load_component('subtract')
+
+    def test_load_component_with_cache(self):
+        with _ComponentServer(self.files) as server:
+            store = ComponentStore(url_search_prefixes=[server.url], cache=ComponentCache(self.cache_dir))
+            for _ in range(2):
+                store.load_component('add')
+                store.load_component('add', tag='v1')
+                store.load_component('add', digest=self.digest)
+            # The files are shared by content. The files loaded by name and tag are revalidated and the file loaded by digest is never downloaded again.
+            self.assertEqual(len(store.cache), 1)
+            self.assertEqual(server.requests, [
+                ('/add/component.yaml', 200),
+                ('/add/versions/tags/v1', 200),
+                ('/add/component.yaml', 304),
+                ('/add/versions/tags/v1', 304),
+            ])
+            self.assertEqual(store.cache.revalidations, 2)
+
+            # An updated file is downloaded again
+            self.files['/add/versions/tags/v1'] = self.component.replace(b'name: Add', b'name: Add v2')
+            self.assertEqual(store.load_component('add', tag='v1')(1, 2).human_name, 'Add v2')
+            self.assertEqual(len(store.cache), 2)
+
+        # The cached files can be loaded without the network
+        offline_store = ComponentStore(url_search_prefixes=[server.url], cache=ComponentCache(self.cache_dir, offline=True))
+        self.assertEqual(offline_store.load_component('add', tag='v1')(1, 2).human_name, 'Add v2')
+        self.assertEqual(offline_store.load_component('add', digest=self.digest)(1, 2).human_name, 'Add')
+        with self.assertRaises(RuntimeError):
+            offline_store.load_component('add', tag='v2')
+
+    def test_load_components(self):
+        files = {'/op{}/component.yaml'.format(i): self.component.replace(b'name: Add', 'name: Op {}'.format(i).encode()) for i in range(8)}
+        other_files = {'/op0/component.yaml': self.component, '/other/component.yaml': self.component}
+        with _ComponentServer(files, delay=0.5) as server, _ComponentServer(other_files) as other_server:
+            store = ComponentStore(local_search_paths=[self.cache_dir], url_search_prefixes=[server.url, other_server.url])
+            start_time = time.time()
+            task_factories = store.load_components(['op{}'.format(i) for i in range(8)] + [{'name': 'other'}])
+            # The components are downloaded at the same time
+            self.assertLess(time.time() - start_time, 2)
+            # The first URL prefix which has a component wins
+            self.assertEqual([x(1, 2).human_name for x in task_factories], ['Op {}'.format(i) for i in range(8)] + ['Add'])
+            with self.assertRaisesRegex(RuntimeError, 'Component unknown was not found'):
+                store.load_components(['op0', 'unknown'])
+
+    def test_cache_eviction(self):
+        cache = ComponentCache(self.cache_dir, max_size=25)
+        digest1 = cache.put(b'1' * 10)
+        digest2 = cache.put(b'2' * 10)
+        self.assertEqual(cache.get_by_digest(digest1), b'1' * 10)
+        digest3 = cache.put(b'3' * 10)
+        # The least recently used file is evicted
+        self.assertIsNone(cache.get_by_digest(digest2))
+        self.assertEqual(cache.size, 20)
+        reopened_cache = ComponentCache(self.cache_dir, max_size=25)
+        self.assertEqual(sorted(reopened_cache._blob_sizes), sorted([digest1, digest3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -52,6 +52,24 @@ class LoadComponentTestCase(unittest.TestCase):
         component_path = _test_data_dir.joinpath('python_add.component.zip')
         self._test_load_component_from_file(str(component_path))
 
+    def test_load_component_from_file_uses_task_factory_cache(self):
+        component_path = str(Path(__file__).resolve().parent.joinpath('test_data', 'python_add.component.yaml'))
+        comp.clear_task_factory_cache()
+        task_factory1 = comp.load_component_from_file(component_path)
+        task_factory2 = comp.load_component_from_file(component_path)
+        self.assertIs(task_factory1, task_factory2)
+        cache_info = comp.get_task_factory_cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses, cache_info.size), (1, 1, 1))
+
+        # The cache is keyed by content, so a changed text gets a new task factory
+        component_text = Path(component_path).read_text()
+        self.assertIs(comp.load_component_from_text(component_text), comp.load_component_from_text(component_text))
+        task_factory3 = comp.load_component_from_text(component_text.replace('name: Add', 'name: Add 2'))
+        self.assertEqual(task_factory3(1, 2).human_name, 'Add 2')
+        self.assertEqual(task_factory1(1, 2).human_name, 'Add')
+        cache_info = comp.get_task_factory_cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses, cache_info.size), (2, 3, 3))
+
     @unittest.skip
     @unittest.expectedFailure #The repo is non-public and will change soon. TODO: Update the URL and enable the test once we move to a public repo
     def test_load_component_from_url(self):
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import subprocess
 import tempfile
 import unittest
@@ -193,6 +194,93 @@ class PythonOpTestCase(unittest.TestCase):
         self.assertEqual(component_spec.inputs[0].default, '3')
         self.assertEqual(component_spec.inputs[1].default, '5')
 
+    def test_func_to_container_op_with_input_and_output_paths(self):
+        def split_words(text_path: comp.InputPath('Text'), words_path: comp.OutputPath('JSON'), separator: str = ',') -> dict:
+            '''Splits text into words'''
+            import json
+            with open(text_path) as f:
+                words = f.read().split(separator)
+            with open(words_path, 'w') as f:
+                json.dump(words, f)
+            return {'count': len(words)}
+
+        op = comp.func_to_container_op(split_words)
+        component_spec = comp._python_op._func_to_component_spec(split_words)
+        self.assertEqual([input.name for input in component_spec.inputs], ['text', 'separator'])
+        self.assertEqual([(output.name, output.type) for output in component_spec.outputs], [('words', 'JSON'), ('Output', 'dict')])
+
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            with components_local_output_dir_context(temp_dir_name):
+                task = op(text='a,b,c')
+
+            subprocess.run(task.command + task.arguments, check=True)
+
+            self.assertEqual(json.loads(Path(task.file_outputs['words']).read_text()), ['a', 'b', 'c'])
+            self.assertEqual(json.loads(Path(task.file_outputs['output']).read_text()), {'count': 3})
+
+    def test_func_to_container_op_with_output_paths_in_current_dir(self):
+        def write_text(text: str, text_path: comp.OutputPath('Text')) -> str:
+            with open(text_path, 'w') as f:
+                f.write(text)
+            return text.upper()
+
+        op = comp.func_to_container_op(write_text)
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            with components_local_output_dir_context(temp_dir_name):
+                task = op('abc')
+
+            #Replacing the output paths with bare file names, which have no directory part
+            file_names = {path: name for name, path in task.file_outputs.items()}
+            arguments = [file_names.get(argument, argument) for argument in task.arguments]
+            subprocess.run(task.command + arguments, check=True, cwd=temp_dir_name)
+
+            self.assertEqual(Path(temp_dir_name, 'text').read_text(), 'abc')
+            self.assertEqual(Path(temp_dir_name, 'output').read_text(), 'ABC')
+
+    def test_func_to_container_op_passes_builtin_collection_inputs_as_strings(self):
+        def describe_config(config: dict = None, items: list = None) -> str:
+            return '{} {}'.format(repr(config), repr(items))
+
+        op = comp.func_to_container_op(describe_config)
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            with components_local_output_dir_context(temp_dir_name):
+                task = op(items="['a', 1]")
+
+            subprocess.run(task.command + task.arguments, check=True)
+
+            self.assertEqual(Path(task.file_outputs['output']).read_text(), "'None' \"['a', 1]\"")
+
+    def test_func_to_container_op_rejects_binary_input_paths(self):
+        def sum_array(array_path: comp.InputPath('NumPyArray')) -> float:
+            import numpy
+            return float(numpy.load(array_path).sum())
+
+        with self.assertRaisesRegex(ValueError, 'binary file format'):
+            comp.func_to_container_op(sum_array)
+
+    def test_func_to_container_op_with_registered_serializer(self):
+        def _serialize_upper_text(obj, file_path):
+            with open(file_path, 'w') as f:
+                f.write(obj.upper())
+
+        def _deserialize_upper_text(file_path):
+            with open(file_path) as f:
+                return f.read().lower()
+
+        comp.register_serializer('UpperText', _serialize_upper_text, _deserialize_upper_text)
+
+        def repeat_text(text: 'UpperText', times: int, suffix: 'UpperText' = None) -> 'UpperText':
+            return text * times + (suffix or '')
+
+        op = comp.func_to_container_op(repeat_text)
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            with components_local_output_dir_context(temp_dir_name):
+                task = op('AB', 2)
+
+            subprocess.run(task.command + task.arguments, check=True)
+
+            self.assertEqual(Path(task.file_outputs['output']).read_text(), 'ABAB')
+
     def test_end_to_end_python_component_pipeline_compilation(self):
         import kfp.components as comp
 
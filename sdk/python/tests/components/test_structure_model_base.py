@@ -39,6 +39,28 @@ class TestModel1(ModelBase):
         super().__init__(locals())
 
 
+class TestBinaryPredicate(ModelBase): #abstract base type
+    def __init__(self,
+        operands: List[str],
+    ):
+        super().__init__(locals())
+
+
+class TestEqualsPredicate(TestBinaryPredicate):
+    _serialized_names = {'operands': '=='}
+
+
+class TestNotEqualsPredicate(TestBinaryPredicate):
+    _serialized_names = {'operands': '!='}
+
+
+class TestModel2(ModelBase):
+    def __init__(self,
+        predicate: Union[str, TestEqualsPredicate, TestNotEqualsPredicate],
+    ):
+        super().__init__(locals())
+
+
 class StructureModelBaseTestCase(unittest.TestCase):
     def test_handle_type_check_for_simple_builtin(self):
         self.assertEqual(TestModel1(prop_0='value 0').prop_0, 'value 0')
@@ -76,6 +98,17 @@ class StructureModelBaseTestCase(unittest.TestCase):
         with self.assertRaises(TypeError):
             TestModel1(prop_0='', prop_2=TestModel1(prop_0='', prop_2='value 2'))
 
+    def test_handle_type_check_for_bare_generics(self):
+        from kfp.components.modelbase import verify_object_against_type
+        self.assertEqual(verify_object_against_type({'a': 1}, Dict), {'a': 1})
+        self.assertEqual(verify_object_against_type(['a', 1], List), ['a', 1])
+
+        with self.assertRaises(TypeError):
+            verify_object_against_type(['a'], Dict)
+
+        with self.assertRaises(TypeError):
+            verify_object_against_type('a', List)
+
     def test_handle_type_check_for_class(self):
         val3 = TestModel1(prop_0='value 0')
         self.assertEqual(TestModel1(prop_0='', prop_3=val3).prop_3, val3)
@@ -229,6 +262,23 @@ class StructureModelBaseTestCase(unittest.TestCase):
         with self.assertRaises(TypeError):
             TestModel1.from_struct({'prop_0': '', 'prop_5': [val5.to_struct(), None]})
 
+    def test_handle_from_to_struct_for_union_dispatched_on_keys(self):
+        struct1 = {'predicate': {'!=': ['a', 'b']}}
+        obj1 = TestModel2.from_struct(struct1)
+        self.assertIs(type(obj1.predicate), TestNotEqualsPredicate)
+        self.assertDictEqual(obj1.to_struct(), struct1)
+
+        struct2 = {'predicate': {'==': ['a', 'b']}}
+        self.assertIs(type(TestModel2.from_struct(struct2).predicate), TestEqualsPredicate)
+        self.assertEqual(TestModel2.from_struct({'predicate': 'a'}).predicate, 'a')
+
+        #The error lists the incompatibilities with all the Union types
+        with self.assertRaisesRegex(TypeError, 'TestEqualsPredicate.from_struct.*\n(.*\n)*.*TestNotEqualsPredicate.from_struct'):
+            TestModel2.from_struct({'predicate': {'<': ['a', 'b']}})
+
+        with self.assertRaises(TypeError):
+            TestModel2.from_struct({'predicate': {'==': ['a', 1]}})
+
 
 if __name__ == '__main__':
     unittest.main()
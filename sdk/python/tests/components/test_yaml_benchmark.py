@@ -0,0 +1,37 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks'))
+import yaml_benchmark
+
+
+class YamlBenchmarkTestCase(unittest.TestCase):
+    def test_run_benchmarks(self):
+        test_data_dir = os.path.join(os.path.dirname(__file__), 'test_data')
+        component_files = yaml_benchmark.find_component_files(test_data_dir)
+        self.assertEqual(1, len(component_files))
+        results = yaml_benchmark.run_benchmarks(component_files, repeats=1)
+        self.assertEqual(1, results['num_files'])
+        self.assertEqual(len(yaml_benchmark.BENCHMARKS) * 2, len(results['results']))
+        for result in results['results']:
+            self.assertIn(result['stage'], ['load', 'dump'])
+            self.assertGreater(result['wall_time_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
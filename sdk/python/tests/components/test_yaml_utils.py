@@ -0,0 +1,76 @@
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, __file__ + '/../../../')
+
+from kfp.components._structures import ComponentSpec
+from kfp.components._yaml_utils import load_yaml, dump_yaml, _make_ordered_loader, _make_ordered_dumper
+
+
+_REPO_ROOT = Path(__file__).resolve().parents[4]
+
+#The pure python loader and dumper which were used before the libyaml based ones
+_PythonOrderedLoader = _make_ordered_loader(yaml.Loader)
+_PythonOrderedDumper = _make_ordered_dumper(yaml.Dumper)
+
+
+def _find_component_files():
+    return sorted(
+        list(_REPO_ROOT.joinpath('components').glob('**/component.yaml')) +
+        list(_REPO_ROOT.joinpath('sdk', 'python', 'tests').glob('**/*.component.yaml'))
+    )
+
+
+class YamlUtilsTestCase(unittest.TestCase):
+    def test_load_and_dump_ordered(self):
+        text = 'b: 1\na:\n  d: [1, 2]\n  c: |\n    line 1\n    line 2\n'
+        data = load_yaml(text)
+        self.assertIsInstance(data, OrderedDict)
+        self.assertEqual(list(data), ['b', 'a'])
+        self.assertEqual(list(data['a']), ['d', 'c'])
+        self.assertEqual(dump_yaml(data), 'b: 1\na:\n  d:\n  - 1\n  - 2\n  c: |\n    line 1\n    line 2\n')
+        self.assertEqual(dump_yaml({'a': (1, 2)}), 'a:\n- 1\n- 2\n')
+
+    def test_load_rejects_python_tags(self):
+        with self.assertRaises(yaml.YAMLError):
+            load_yaml('a: !!python/object/apply:os.getcwd []')
+
+    def test_parity_with_pure_python_yaml_for_all_component_files(self):
+        component_files = _find_component_files()
+        if not component_files:
+            self.skipTest('The component files of the repository are not available.')
+        for component_file in component_files:
+            with self.subTest(component_file=str(component_file)):
+                text = component_file.read_text()
+                data = load_yaml(text)
+                expected_data = yaml.load(text, _PythonOrderedLoader)
+                self.assertEqual(data, expected_data)
+                self.assertEqual(list(data), list(expected_data))
+                self.assertEqual(dump_yaml(data), yaml.dump(expected_data, Dumper=_PythonOrderedDumper))
+                try:
+                    struct = ComponentSpec.from_struct(data).to_struct()
+                except Exception: #Some component files are out of date
+                    continue
+                self.assertEqual(dump_yaml(struct), yaml.dump(struct, Dumper=_PythonOrderedDumper))
+
+
+if __name__ == '__main__':
+    unittest.main()
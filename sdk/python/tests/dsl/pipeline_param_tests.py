@@ -14,7 +14,7 @@
 
 
 from kfp.dsl import PipelineParam
-from kfp.dsl._pipeline_param import _extract_pipelineparams
+from kfp.dsl._pipeline_param import _extract_pipelineparams, _split_serialized_pipelineparams
 import unittest
 
 
@@ -51,4 +51,25 @@ class TestPipelineParam(unittest.TestCase):
     params = _extract_pipelineparams(payload)
     self.assertListEqual([p1, p2, p3], params)
 
+  def test_split_serialized_pipelineparams(self):
+    """Test _split_serialized_pipelineparams."""
+
+    p1 = PipelineParam(name='param1', op_name='op1')
+    p2 = PipelineParam(name='param2', value='a+b')
+    payload = 'echo ' + str(p1) + str(p2) + ' end'
+    segments = _split_serialized_pipelineparams(payload)
+    self.assertEqual(4, len(segments))
+    self.assertEqual('echo ', segments[0])
+    self.assertEqual(('op1', 'param1', '', ''), segments[1][:4])
+    self.assertEqual(str(p1), segments[1].pattern)
+    self.assertEqual(('', 'param2', 'a+b', ''), segments[2][:4])
+    self.assertEqual(' end', segments[3])
+    self.assertEqual(payload, ''.join(x if isinstance(x, str) else x.pattern for x in segments))
+
+    untyped_payload = '{{pipelineparam:op=op1;name=param1;value=}}'
+    segments = _split_serialized_pipelineparams(untyped_payload)
+    self.assertEqual(('op1', 'param1', '', ''), segments[0][:4])
+
+    self.assertEqual(['no params'], _split_serialized_pipelineparams('no params'))
+
   #TODO: add more unit tests to cover real type instances
\ No newline at end of file
@@ -32,6 +32,26 @@ class TestPipeline(unittest.TestCase):
     self.assertEqual(p.ops['op1'].name, 'op1')
     self.assertEqual(p.ops['op2'].name, 'op2')
 
+  def test_unique_op_names(self):
+    """Test ops with the same name get unique names."""
+    with Pipeline('somename') as p:
+      op1 = ContainerOp(name='op', image='image')
+      op2 = ContainerOp(name='op 2', image='image')
+      op3 = ContainerOp(name='op', image='image')
+      op4 = ContainerOp(name='op', image='image')
+
+    self.assertEqual(['op', 'op 2', 'op 3', 'op 4'], [op1.name, op2.name, op3.name, op4.name])
+    self.assertEqual(4, len(p.ops))
+
+  def test_many_same_named_ops(self):
+    """Test adding a large fan-out of ops sharing a name."""
+    with Pipeline('somename') as p:
+      for _ in range(20000):
+        op = ContainerOp(name='op', image='image')
+
+    self.assertEqual(20000, len(p.ops))
+    self.assertEqual('op 20000', op.name)
+
   def test_nested_pipelines(self):
     """Test nested pipelines"""
     with self.assertRaises(Exception):